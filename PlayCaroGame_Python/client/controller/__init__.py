@@ -4,5 +4,6 @@ Client controller package
 
 from .client import Client
 from .socket_handle import SocketHandle
+from .ai_worker import AIWorker
 
-__all__ = ['Client', 'SocketHandle']
+__all__ = ['Client', 'SocketHandle', 'AIWorker']
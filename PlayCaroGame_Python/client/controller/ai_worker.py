@@ -0,0 +1,142 @@
+"""
+AI worker - computes AI moves off the Tk main thread
+"""
+
+import threading
+import time
+import tkinter as tk
+from shared.game_state import GameState
+from shared.utils import log
+
+class AIRequest:
+    """One pending AI move"""
+    
+    def __init__(self, callback):
+        self.callback = callback
+        # Set to make the engine return its best move so far
+        self.stop_event = threading.Event()
+        # Set (on the Tk thread) to drop the result
+        self.cancelled = False
+        self.timer = None
+
+class AIWorker:
+    """
+    Runs an engine in a background thread and posts its moves to Tk
+    
+    The engine searches a snapshot of the board, so the window stays
+    responsive and the game state can change under it. The move is passed
+    to the callback on the Tk thread with after(). cancel() stops the
+    running search at once and drops its result.
+    """
+    
+    def __init__(self, widget, engine):
+        """
+        Initialize worker
+        
+        Args:
+            widget: Tk widget whose after() delivers results
+            engine: Object with get_best_move(board, ai_player, human_player)
+                and, optionally, a stop_event attribute
+        """
+        self.widget = widget
+        self.engine = engine
+        self.request = None
+        self.reset_pending = False
+        self.last_elapsed = 0.0
+        # Only one thread uses the engine at a time
+        self.engine_lock = threading.Lock()
+    
+    def request_move(self, board, ai_player, human_player, callback, min_delay_ms=0, timeout_ms=None):
+        """
+        Start computing a move
+        
+        Any search still running is cancelled first.
+        
+        Args:
+            board: 2D array, BitBoard or GameState representing the game board
+            ai_player: AI's player marker (1 or 2)
+            human_player: Human's player marker (1 or 2)
+            callback: Called on the Tk thread with the Point, or None if
+                the board is full or the search failed
+            min_delay_ms: Shortest time before the move is shown
+            timeout_ms: Stop the search after this long and play its best
+                move so far, or None
+        """
+        self.cancel()
+        snapshot = board.copy() if isinstance(board, GameState) else GameState.from_grid(board)
+        request = AIRequest(callback)
+        if timeout_ms is not None:
+            request.timer = threading.Timer(timeout_ms / 1000, request.stop_event.set)
+            request.timer.daemon = True
+            request.timer.start()
+        self.request = request
+        threading.Thread(
+            target=self._run,
+            args=(request, snapshot, ai_player, human_player, min_delay_ms),
+            daemon=True
+        ).start()
+    
+    def _run(self, request, state, ai_player, human_player, min_delay_ms):
+        """Search in the worker thread and post the move back"""
+        start = time.perf_counter()
+        move = None
+        with self.engine_lock:
+            if request.cancelled:
+                return
+            try:
+                if self.reset_pending and hasattr(self.engine, "new_game"):
+                    self.engine.new_game()
+                self.reset_pending = False
+                if hasattr(self.engine, "stop_event"):
+                    self.engine.stop_event = request.stop_event
+                move = self.engine.get_best_move(state, ai_player, human_player)
+            except Exception as e:
+                if request.cancelled:
+                    return
+                # Still answer, or the game would wait for the move forever
+                log(f"AI search error: {e}", "ERROR")
+            finally:
+                if request.timer is not None:
+                    request.timer.cancel()
+        
+        elapsed = time.perf_counter() - start
+        delay = max(0, int(min_delay_ms - elapsed * 1000))
+        try:
+            self.widget.after(delay, lambda: self._deliver(request, move, elapsed))
+        except (RuntimeError, tk.TclError):
+            # Window already closed
+            pass
+    
+    def _deliver(self, request, move, elapsed):
+        """Hand the move to the callback unless the request was cancelled"""
+        if request.cancelled:
+            return
+        self.request = None
+        self.last_elapsed = elapsed
+        request.callback(move)
+    
+    def is_busy(self):
+        """Check whether a move is being computed"""
+        return self.request is not None
+    
+    def cancel(self):
+        """Stop the running search, if any, and drop its result"""
+        request = self.request
+        if request is None:
+            return
+        request.cancelled = True
+        request.stop_event.set()
+        if request.timer is not None:
+            request.timer.cancel()
+        self.request = None
+    
+    def new_game(self):
+        """Cancel any search and clear the engine's memory before the next one"""
+        self.cancel()
+        self.reset_pending = True
+    
+    def shutdown(self):
+        """Cancel any search and release the engine's resources"""
+        self.cancel()
+        if hasattr(self.engine, "shutdown"):
+            self.engine.shutdown()
@@ -231,6 +231,24 @@ class Client:
         if cls.room_list_frm:
             cls.room_list_frm.update_room_list(rooms, passwords)
     
+    @classmethod
+    def on_room_page(cls, rooms, next_cursor):
+        """Handle a page of the room list"""
+        if cls.room_list_frm:
+            cls.room_list_frm.add_room_page(rooms, next_cursor)
+    
+    @classmethod
+    def on_room_added(cls, room):
+        """Handle a room opening"""
+        if cls.room_list_frm:
+            cls.room_list_frm.add_room(room)
+    
+    @classmethod
+    def on_room_removed(cls, room_id):
+        """Handle a room closing"""
+        if cls.room_list_frm:
+            cls.room_list_frm.remove_room(room_id)
+    
     @classmethod
     def on_room_created(cls, room_id, password):
         """Handle room created"""
@@ -272,6 +290,15 @@ class Client:
         cls.open_homepage()
         messagebox.showwarning("Thông báo", "Mật khẩu phòng không đúng!")
     
+    @classmethod
+    def on_bot_unavailable(cls):
+        """Handle no free bot seat on the server"""
+        from tkinter import messagebox
+        from shared.constants import MSG_BOT_UNAVAILABLE
+        cls.close_all_views()
+        cls.open_homepage()
+        messagebox.showwarning("Thông báo", MSG_BOT_UNAVAILABLE)
+    
     @classmethod
     def on_rank_list(cls, users):
         """Handle rank list response"""
@@ -5,6 +5,7 @@ Socket handler for client - handles server communication
 import socket
 import threading
 from shared.user import User
+from shared.framing import FrameDecoder, FrameTooLargeError, encode_frame
 from shared.utils import log, create_message
 from shared.constants import *
 
@@ -63,7 +64,7 @@ class SocketHandle(threading.Thread):
         """
         try:
             if self.socket:
-                self.socket.send((message + '\n').encode(ENCODING))
+                self.socket.send(encode_frame(message))
         except Exception as e:
             log(f"Send error: {e}", "ERROR")
     
@@ -126,27 +127,23 @@ class SocketHandle(threading.Thread):
     
     def run(self):
         """Main message receiving loop"""
-        buffer = ""  # Buffer for incomplete messages
+        decoder = FrameDecoder()  # Buffers incomplete messages
         
         while self.running:
             try:
-                data = self.socket.recv(BUFFER_SIZE).decode(ENCODING)
+                data = self.socket.recv(BUFFER_SIZE)
                 if not data:
                     break
                 
-                # Add to buffer
-                buffer += data
-                
-                # Process complete messages (separated by newlines)
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    line = line.strip()
-                    if line:
-                        # Handle each message separately
-                        self.handle_message(line)
+                # Handle each complete message separately
+                for message in decoder.feed(data):
+                    self.handle_message(message)
             
             except socket.timeout:
                 continue
+            except FrameTooLargeError as e:
+                log(f"Receive error: {e}", "ERROR")
+                break
             except Exception as e:
                 if self.running:
                     log(f"Receive error: {e}", "ERROR")
@@ -201,6 +198,15 @@ class SocketHandle(threading.Thread):
             elif command == PROTOCOL_ROOM_LIST:
                 self.handle_room_list(parts)
             
+            elif command == PROTOCOL_ROOM_PAGE:
+                self.handle_room_page(parts)
+            
+            elif command == PROTOCOL_ROOM_ADDED:
+                self.handle_room_added(parts)
+            
+            elif command == PROTOCOL_ROOM_REMOVED:
+                self.handle_room_removed(parts)
+            
             elif command == PROTOCOL_YOUR_CREATED_ROOM:
                 self.handle_your_created_room(parts)
             
@@ -216,6 +222,9 @@ class SocketHandle(threading.Thread):
             elif command == PROTOCOL_ROOM_WRONG_PASSWORD:
                 self.handle_room_wrong_password()
             
+            elif command == PROTOCOL_BOT_UNAVAILABLE:
+                self.handle_bot_unavailable()
+            
             # Rank
             elif command == PROTOCOL_RETURN_GET_RANK_CHARTS:
                 self.handle_return_get_rank_charts(parts)
@@ -343,6 +352,32 @@ class SocketHandle(threading.Thread):
         if hasattr(self.client, 'on_room_list'):
             self.client.on_room_list(rooms, passwords)
     
+    def parse_room(self, fields):
+        """Parse the ID, locked flag and creator's mark of a room"""
+        return {
+            "id": fields[0],
+            "locked": fields[1] == "1",
+            "mark": int(fields[2])
+        }
+    
+    def handle_room_page(self, parts):
+        """Handle a page of the room list"""
+        next_cursor = int(parts[1])
+        rooms = [self.parse_room(parts[i:i + 3]) for i in range(2, len(parts) - 2, 3)]
+        
+        if hasattr(self.client, 'on_room_page'):
+            self.client.on_room_page(rooms, next_cursor)
+    
+    def handle_room_added(self, parts):
+        """Handle a room opening while subscribed to the room list"""
+        if len(parts) >= 4 and hasattr(self.client, 'on_room_added'):
+            self.client.on_room_added(self.parse_room(parts[1:4]))
+    
+    def handle_room_removed(self, parts):
+        """Handle a room closing while subscribed to the room list"""
+        if len(parts) >= 2 and hasattr(self.client, 'on_room_removed'):
+            self.client.on_room_removed(parts[1])
+    
     def handle_your_created_room(self, parts):
         """Handle room created response"""
         if len(parts) >= 2 and hasattr(self.client, 'on_room_created'):
@@ -374,6 +409,11 @@ class SocketHandle(threading.Thread):
         if hasattr(self.client, 'on_room_wrong_password'):
             self.client.on_room_wrong_password()
     
+    def handle_bot_unavailable(self):
+        """Handle no free bot seat on the server"""
+        if hasattr(self.client, 'on_bot_unavailable'):
+            self.client.on_bot_unavailable()
+    
     def handle_return_get_rank_charts(self, parts):
         """Handle rank list response"""
         users = self.get_list_rank(parts)
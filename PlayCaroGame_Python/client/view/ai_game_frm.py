@@ -5,12 +5,14 @@ AI Game Form - Play against AI
 import tkinter as tk
 from tkinter import messagebox
 from client.controller.client import Client
+from client.controller.ai_worker import AIWorker
 from shared.user import User
 from shared.constants import *
-from shared.game_logic import GameLogic, SimpleAI
+from shared.config import Config
+from shared.ai_engine import create_ai_engine
+from shared.game_state import GameState
+from shared.game_logic import SimpleAI
 from shared.point import Point
-import threading
-import time
 
 class AIGameFrm:
     """AI game form for single-player practice"""
@@ -24,7 +26,10 @@ class AIGameFrm:
         self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
         
         # Game state
-        self.board = [[0 for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        self.game_state = GameState()
+        self.difficulty = Config.AI_DIFFICULTY
+        self.ai_engine = create_ai_engine(Config.get_ai_profile(self.difficulty))
+        self.ai_worker = AIWorker(self.window, self.ai_engine)
         self.buttons = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
         self.my_turn = True  # Player starts first
         self.game_started = True
@@ -216,6 +221,40 @@ class AIGameFrm:
         )
         self.moves_label.pack(anchor=tk.W, pady=3)
         
+        # Difficulty selector
+        difficulty_frame = tk.Frame(info_frame, bg=COLOR_LIGHT)
+        difficulty_frame.pack(anchor=tk.W, pady=3)
+        
+        tk.Label(
+            difficulty_frame,
+            text="Độ khó:",
+            font=("Arial", 9),
+            bg=COLOR_LIGHT
+        ).pack(side=tk.LEFT)
+        
+        labels = [profile["label"] for profile in Config.AI_PROFILES.values()]
+        self.difficulty_var = tk.StringVar(value=Config.get_ai_profile(self.difficulty)["label"])
+        difficulty_menu = tk.OptionMenu(
+            difficulty_frame,
+            self.difficulty_var,
+            *labels,
+            command=self.change_difficulty
+        )
+        difficulty_menu.config(font=("Arial", 9), width=10)
+        difficulty_menu.pack(side=tk.LEFT, padx=5)
+        
+        # Thinking stats of the AI's last move
+        self.ai_stats_label = tk.Label(
+            info_frame,
+            text="AI: chưa đi",
+            font=("Arial", 8),
+            bg=COLOR_LIGHT,
+            fg="gray",
+            justify=tk.LEFT,
+            wraplength=230
+        )
+        self.ai_stats_label.pack(anchor=tk.W, pady=3)
+        
         # Instructions - smaller
         instructions = tk.LabelFrame(
             parent,
@@ -252,12 +291,12 @@ class AIGameFrm:
             messagebox.showwarning("Cảnh báo", "Chưa đến lượt của bạn!")
             return
         
-        if self.board[x][y] != 0:
+        if not self.game_state.is_empty(x, y):
             messagebox.showwarning("Cảnh báo", "Ô này đã được đánh!")
             return
         
         # Make move
-        self.board[x][y] = self.player_marker
+        won = self.game_state.play(x, y, self.player_marker)
         self.buttons[x][y].config(
             text="X",
             fg=COLOR_PRIMARY,
@@ -268,12 +307,12 @@ class AIGameFrm:
         self.moves_label.config(text=f"Số nước đã đi: {self.moves_count}")
         
         # Check win
-        if GameLogic.check_win(self.board, x, y, self.player_marker):
+        if won:
             self.handle_win(True)
             return
         
         # Check draw
-        if GameLogic.is_board_full(self.board):
+        if self.game_state.is_full():
             self.handle_draw()
             return
         
@@ -282,28 +321,29 @@ class AIGameFrm:
         self.status_label.config(text="Lượt của AI", fg=COLOR_DANGER)
         self.stop_timer()
         
-        # AI makes move after delay
-        threading.Thread(target=self.ai_move, daemon=True).start()
+        self.request_ai_move()
     
-    def ai_move(self):
-        """AI makes a move"""
-        time.sleep(0.5)  # Small delay for better UX
-        
-        # Get best move from AI
-        move = SimpleAI.get_best_move(self.board, self.ai_marker, self.player_marker)
-        
-        if move:
-            x, y = move.x, move.y
-            
-            # Make move on main thread
-            self.window.after(0, lambda: self.apply_ai_move(x, y))
+    def request_ai_move(self):
+        """Start computing the AI's move in the background"""
+        # Small delay for better UX, less the time spent thinking
+        self.ai_worker.request_move(self.game_state, self.ai_marker, self.player_marker, self.apply_ai_move,
+                                    min_delay_ms=500, timeout_ms=TURN_TIME_LIMIT * 1000)
     
-    def apply_ai_move(self, x, y):
+    def apply_ai_move(self, move):
         """Apply AI move to board (called on main thread)"""
         if self.game_ended:
             return
+        if not move:
+            # Fall back to the simple AI rather than stall the game
+            if self.game_state.is_full():
+                return
+            move = SimpleAI.get_best_move(self.game_state, self.ai_marker, self.player_marker)
+            if not move:
+                return
         
-        self.board[x][y] = self.ai_marker
+        self.update_ai_stats()
+        x, y = move.get_x(), move.get_y()
+        won = self.game_state.play(x, y, self.ai_marker)
         self.buttons[x][y].config(
             text="O",
             fg=COLOR_DANGER,
@@ -314,12 +354,12 @@ class AIGameFrm:
         self.moves_label.config(text=f"Số nước đã đi: {self.moves_count}")
         
         # Check win
-        if GameLogic.check_win(self.board, x, y, self.ai_marker):
+        if won:
             self.handle_win(False)
             return
         
         # Check draw
-        if GameLogic.is_board_full(self.board):
+        if self.game_state.is_full():
             self.handle_draw()
             return
         
@@ -328,6 +368,36 @@ class AIGameFrm:
         self.status_label.config(text="Lượt của bạn", fg=COLOR_SUCCESS)
         self.start_timer()
     
+    def update_ai_stats(self):
+        """Show how long and how deep the AI thought about its last move"""
+        text = f"AI nghĩ {self.ai_worker.last_elapsed:.2f}s"
+        if hasattr(self.ai_engine, "get_stats_string"):
+            stats = self.ai_engine.get_stats_string()
+            if stats:
+                text += f"\n{stats}"
+        self.ai_stats_label.config(text=text)
+    
+    def change_difficulty(self, label):
+        """
+        Switch to another difficulty profile
+        
+        Args:
+            label: Label of the chosen profile
+        """
+        name = next(key for key, profile in Config.AI_PROFILES.items() if profile["label"] == label)
+        if name == self.difficulty:
+            return
+        
+        # A move being computed is restarted with the new engine
+        thinking = self.ai_worker.is_busy()
+        self.ai_worker.shutdown()
+        self.difficulty = name
+        Config.set_ai_difficulty(name)
+        self.ai_engine = create_ai_engine(Config.get_ai_profile(name))
+        self.ai_worker = AIWorker(self.window, self.ai_engine)
+        if thinking and not self.game_ended:
+            self.request_ai_move()
+    
     def handle_win(self, player_won):
         """Handle game win"""
         self.game_ended = True
@@ -374,6 +444,7 @@ class AIGameFrm:
     def handle_timeout(self):
         """Handle timer timeout"""
         self.stop_timer()
+        self.ai_worker.cancel()
         if not self.game_ended:
             messagebox.showwarning("Hết giờ", "Bạn đã hết thời gian!")
             self.handle_win(False)
@@ -385,7 +456,8 @@ class AIGameFrm:
                 return
         
         # Reset game state
-        self.board = [[0 for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        self.game_state = GameState()
+        self.ai_worker.new_game()
         self.my_turn = True
         self.game_started = True
         self.game_ended = False
@@ -402,6 +474,7 @@ class AIGameFrm:
         
         self.status_label.config(text="Lượt của bạn", fg=COLOR_SUCCESS)
         self.moves_label.config(text="Số nước đã đi: 0")
+        self.ai_stats_label.config(text="AI: chưa đi")
         self.start_timer()
     
     def on_closing(self):
@@ -409,7 +482,9 @@ class AIGameFrm:
         if not self.game_ended:
             if messagebox.askyesno("Xác nhận", "Bạn có chắc muốn thoát?"):
                 self.stop_timer()
+                self.ai_worker.shutdown()
                 self.window.destroy()
         else:
             self.stop_timer()
+            self.ai_worker.shutdown()
             self.window.destroy()
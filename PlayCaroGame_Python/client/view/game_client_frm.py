@@ -5,9 +5,13 @@ Game Client Form - Complete game implementation
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
 from client.controller.client import Client
+from client.controller.ai_worker import AIWorker
 from shared.utils import create_message, log, get_asset_path
 from shared.constants import *
-from shared.game_logic import GameLogic, SimpleAI
+from shared.config import Config
+from shared.ai_engine import create_ai_engine
+from shared.game_state import GameState
+from shared.game_logic import SimpleAI
 from shared.point import Point
 from PIL import Image, ImageTk
 import time
@@ -46,7 +50,7 @@ class GameClientFrm:
         self.game_ended = False
         
         # Board state
-        self.board = [[0 for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        self.game_state = GameState()
         self.buttons = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
         
         # Timer
@@ -55,6 +59,12 @@ class GameClientFrm:
         
         # AI mode
         self.is_ai_mode = (competitor.get_nickname() == "AI")
+        self.difficulty = Config.AI_DIFFICULTY
+        self.ai_engine = None
+        self.ai_worker = None
+        if self.is_ai_mode:
+            self.ai_engine = create_ai_engine(Config.get_ai_profile(self.difficulty))
+            self.ai_worker = AIWorker(self.window, self.ai_engine)
         
         # Avatar images storage
         self.avatar_images = []
@@ -203,6 +213,39 @@ class GameClientFrm:
             fg="gray"
         ).pack()
         
+        if self.is_ai_mode:
+            # Difficulty selector
+            difficulty_frame = tk.Frame(info_frame)
+            difficulty_frame.pack(pady=(5, 0))
+            
+            tk.Label(
+                difficulty_frame,
+                text="Độ khó:",
+                font=("Arial", 9)
+            ).pack(side=tk.LEFT)
+            
+            labels = [profile["label"] for profile in Config.AI_PROFILES.values()]
+            self.difficulty_var = tk.StringVar(value=Config.get_ai_profile(self.difficulty)["label"])
+            difficulty_menu = tk.OptionMenu(
+                difficulty_frame,
+                self.difficulty_var,
+                *labels,
+                command=self.change_difficulty
+            )
+            difficulty_menu.config(font=("Arial", 9), width=10)
+            difficulty_menu.pack(side=tk.LEFT, padx=5)
+            
+            # Thinking stats of the AI's last move
+            self.ai_stats_label = tk.Label(
+                info_frame,
+                text="AI: chưa đi",
+                font=("Arial", 8),
+                fg="gray",
+                justify=tk.LEFT,
+                wraplength=230
+            )
+            self.ai_stats_label.pack(pady=(3, 0))
+        
         # Chat box - more compact
         chat_frame = tk.LabelFrame(right_panel, text="Chat", font=("Arial", 9, "bold"), padx=8, pady=8)
         chat_frame.pack(fill=tk.BOTH, expand=True)
@@ -273,17 +316,17 @@ class GameClientFrm:
             return
         
         # Check if cell is empty
-        if self.board[row][col] != 0:
+        if not self.game_state.is_empty(row, col):
             messagebox.showwarning("Cảnh báo", "Ô này đã được đánh!")
             return
         
         # Make move
-        self.make_move(row, col, 1)  # 1 = my piece
+        won = self.make_move(row, col, 1)  # 1 = my piece
         
         # Disable all buttons while waiting for opponent
         for i in range(BOARD_SIZE):
             for j in range(BOARD_SIZE):
-                if self.board[i][j] == 0:  # Only disable empty cells
+                if self.game_state.is_empty(i, j):  # Only disable empty cells
                     self.buttons[i][j].config(state=tk.DISABLED)
         
         # Stop my timer
@@ -298,18 +341,18 @@ class GameClientFrm:
             Client.socket_handle.write(create_message(PROTOCOL_CARO, row, col))
         
         # Check win
-        if GameLogic.check_win(self.board, row, col, 1):
+        if won:
             self.on_game_win(row, col)
             return
         
         # Check draw
-        if GameLogic.is_board_full(self.board):
+        if self.game_state.is_full():
             self.on_game_draw()
             return
         
         # AI's turn (if AI mode)
         if self.is_ai_mode:
-            self.window.after(500, self.ai_make_move)
+            self.ai_make_move()
             return
         
         # Switch turn
@@ -322,7 +365,7 @@ class GameClientFrm:
         
         # AI's turn
         if self.is_ai_mode:
-            self.window.after(500, self.ai_make_move)
+            self.ai_make_move()
     
     def make_move(self, row, col, player):
         """
@@ -331,8 +374,11 @@ class GameClientFrm:
         Args:
             row, col: Position
             player: 1 for me, 2 for opponent
+        
+        Returns:
+            True if this move wins the game
         """
-        self.board[row][col] = player
+        won = self.game_state.play(row, col, player)
         
         # Determine symbol based on numberOfMatch and player
         # Java logic:
@@ -358,33 +404,98 @@ class GameClientFrm:
             relief=tk.FLAT,  # Flat instead of SUNKEN to keep size
             disabledforeground=color  # Show color even when disabled
         )
+        
+        return won
     
     def ai_make_move(self):
-        """AI makes a move"""
+        """Start computing the AI's move in the background"""
         if self.game_ended:
             return
         
-        # Get AI's best move
-        move = SimpleAI.get_best_move(self.board, 2, 1)
+        # Thinking time is part of the 500 ms pause before the AI moves
+        self.ai_worker.request_move(self.game_state, 2, 1, self.apply_ai_move, min_delay_ms=500,
+                                    timeout_ms=TURN_TIME_LIMIT * 1000)
+    
+    def apply_ai_move(self, move):
+        """
+        Play the AI's move (called on main thread)
         
-        if move:
-            row, col = move.get_x(), move.get_y()
-            self.make_move(row, col, 2)
-            
-            # Check win
-            if GameLogic.check_win(self.board, row, col, 2):
-                self.on_game_loss()
+        Args:
+            move: Point chosen by the AI, or None if the board is full or
+                the search failed
+        """
+        if self.game_ended:
+            return
+        if not move:
+            # Fall back to the simple AI rather than stall the game
+            if self.game_state.is_full():
                 return
-            
-            # Check draw
-            if GameLogic.is_board_full(self.board):
-                self.on_game_draw()
+            move = SimpleAI.get_best_move(self.game_state, 2, 1)
+            if not move:
                 return
-            
-            # Switch turn back to player
-            self.my_turn = True
-            self.start_timer()
-            self.update_status("Lượt của bạn!")
+        
+        self.update_ai_stats()
+        won = self.make_move(move.get_x(), move.get_y(), 2)
+        
+        # Check win
+        if won:
+            self.on_game_loss()
+            return
+        
+        # Check draw
+        if self.game_state.is_full():
+            self.on_game_draw()
+            return
+        
+        # Switch turn back to player
+        self.my_turn = True
+        self.start_timer()
+        self.update_status("Lượt của bạn!")
+    
+    def update_ai_stats(self):
+        """Show how long and how deep the AI thought about its last move"""
+        text = f"AI nghĩ {self.ai_worker.last_elapsed:.2f}s"
+        if hasattr(self.ai_engine, "get_stats_string"):
+            stats = self.ai_engine.get_stats_string()
+            if stats:
+                text += f"\n{stats}"
+        self.ai_stats_label.config(text=text)
+    
+    def change_difficulty(self, label):
+        """
+        Switch to another difficulty profile
+        
+        Args:
+            label: Label of the chosen profile
+        """
+        name = next(key for key, profile in Config.AI_PROFILES.items() if profile["label"] == label)
+        if name == self.difficulty:
+            return
+        
+        # A move being computed is restarted with the new engine
+        thinking = self.ai_worker.is_busy()
+        self.ai_worker.shutdown()
+        self.difficulty = name
+        Config.set_ai_difficulty(name)
+        self.ai_engine = create_ai_engine(Config.get_ai_profile(name))
+        self.ai_worker = AIWorker(self.window, self.ai_engine)
+        if thinking and not self.game_ended:
+            self.ai_make_move()
+    
+    def is_playable(self, row, col):
+        """
+        Check that a move received from the server can be played
+        
+        Args:
+            row, col: Position of the move
+        
+        Returns:
+            True if the cell is on the board and empty
+        """
+        if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE) or not self.game_state.is_empty(row, col):
+            log(f"Ignored move on unavailable cell ({row}, {col})", "WARNING")
+            return False
+        return True
     
     def receive_move(self, row, col):
         """
@@ -393,18 +504,18 @@ class GameClientFrm:
         Args:
             row, col: Position of opponent's move
         """
-        if self.game_ended:
+        if self.game_ended or not self.is_playable(row, col):
             return
         
-        self.make_move(row, col, 2)
+        won = self.make_move(row, col, 2)
         
         # Check win
-        if GameLogic.check_win(self.board, row, col, 2):
+        if won:
             self.on_game_loss()
             return
         
         # Check draw
-        if GameLogic.is_board_full(self.board):
+        if self.game_state.is_full():
             self.on_game_draw()
             return
         
@@ -422,16 +533,20 @@ class GameClientFrm:
         Args:
             row, col: Position of competitor's move
         """
+        # A duplicated or replayed packet must not end the game
+        if not self.is_playable(row, col):
+            return
+        
         # Mark opponent's move on board
-        self.make_move(row, col, 2)  # 2 = opponent
+        won = self.make_move(row, col, 2)  # 2 = opponent
         
         # Check if opponent won
-        if GameLogic.check_win(self.board, row, col, 2):
+        if won:
             self.on_game_loss()
             return
         
         # Check for draw
-        if GameLogic.is_board_full(self.board):
+        if self.game_state.is_full():
             self.on_game_draw()
             return
         
@@ -446,7 +561,7 @@ class GameClientFrm:
         # Enable all empty buttons for clicking
         for i in range(BOARD_SIZE):
             for j in range(BOARD_SIZE):
-                if self.board[i][j] == 0:  # Empty cell
+                if self.game_state.is_empty(i, j):  # Empty cell
                     self.buttons[i][j].config(state=tk.NORMAL)
     
     def start_game(self):
@@ -503,6 +618,7 @@ class GameClientFrm:
         self.stop_timer()
         
         if self.is_ai_mode:
+            self.ai_worker.cancel()
             messagebox.showwarning("Hết giờ", "Bạn đã hết thời gian!")
             self.on_game_loss()
         else:
@@ -583,7 +699,10 @@ class GameClientFrm:
         # Reset game state
         self.game_ended = False
         self.game_started = True
-        self.board = [[0 for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        self.game_state = GameState()
+        if self.ai_worker:
+            self.ai_worker.new_game()
+            self.ai_stats_label.config(text="AI: chưa đi")
         
         # Determine turn based on new numberOfMatch
         # Java: if (numberOfMatch % 2 == 0) → current player goes first
@@ -616,6 +735,7 @@ class GameClientFrm:
         """Request draw with opponent"""
         if self.is_ai_mode:
             if messagebox.askyesno("Hòa?", "Bạn muốn hòa với AI?"):
+                self.ai_worker.cancel()
                 self.on_game_draw()
         else:
             if Client.socket_handle:
@@ -775,6 +895,8 @@ class GameClientFrm:
     def close(self):
         """Close window"""
         self.stop_timer()
+        if self.ai_worker:
+            self.ai_worker.shutdown()
         try:
             # Disable chat scrollbar to prevent TclError
             if hasattr(self, 'chat_display'):
@@ -5,6 +5,7 @@ Homepage Form - Main menu after login
 import tkinter as tk
 from tkinter import messagebox, scrolledtext
 from client.controller.client import Client
+from shared.config import Config
 from shared.utils import create_message, format_win_ratio, calculate_mark
 from shared.constants import *
 
@@ -229,6 +230,7 @@ class HomePageFrm:
             ("🏆 Bảng xếp hạng", self.rank_board, "#9C27B0", 2, 0),    # Purple
             ("🤖 Chơi với AI", self.play_ai, "#607D8B", 2, 1),         # Blue Grey
             ("🚪 Đăng xuất", self.logout, "#F44336", 3, 0),            # Red
+            ("🤖 Đấu Bot server", self.play_bot, "#795548", 3, 1),     # Brown
         ]
         
         for text, command, color, row, col in buttons:
@@ -363,6 +365,13 @@ class HomePageFrm:
         """Play with AI"""
         Client.open_ai_game()
     
+    def play_bot(self):
+        """Play against a bot hosted by the server"""
+        if Client.socket_handle:
+            Client.socket_handle.write(create_message(PROTOCOL_PLAY_BOT, Config.AI_DIFFICULTY))
+            # Server answers with PROTOCOL_GO_TO_ROOM or PROTOCOL_BOT_UNAVAILABLE
+            self.close()
+    
     def logout(self):
         """Logout"""
         if messagebox.askyesno("Xác nhận", "Bạn có chắc muốn đăng xuất?"):
@@ -5,9 +5,21 @@ Room List Form - Complete implementation
 import tkinter as tk
 from tkinter import ttk, messagebox
 from client.controller.client import Client
-from shared.utils import create_message
+from shared.utils import create_message, get_rank_name
 from shared.constants import *
 
+# Filter choices shown to the user -> protocol values
+STATUS_FILTERS = {
+    "Tất cả phòng": ROOM_FILTER_ALL,
+    "Công khai": ROOM_FILTER_OPEN,
+    "Có mật khẩu": ROOM_FILTER_LOCKED,
+}
+RANK_FILTERS = {
+    "Mọi hạng": RANK_BRONZE,
+    "Silver trở lên": RANK_SILVER,
+    "Gold trở lên": RANK_GOLD,
+}
+
 class RoomListFrm:
     """Room list form with complete table view"""
     
@@ -18,14 +30,16 @@ class RoomListFrm:
         self.window.geometry("620x460")  # Optimized from 700x500
         self.window.resizable(False, False)
         
-        self.rooms_data = []  # Store room data
+        self.rooms_data = {}  # Room ID -> room data, in table order
+        self.next_cursor = 0  # Where the next page starts, 0 if none
+        self.subscribed = False
+        self.awaiting_first_page = False
         
         self.setup_ui()
         self.center_window()
         
-        # Request room list from server
-        if Client.socket_handle:
-            Client.socket_handle.write(create_message(PROTOCOL_VIEW_ROOM_LIST))
+        # Get the first page, then room changes as they happen
+        self.subscribe()
     
     def center_window(self):
         """Center window on screen"""
@@ -62,6 +76,32 @@ class RoomListFrm:
             font=FONT_NORMAL
         ).pack(pady=(0, 10))
         
+        # Filters
+        filter_frame = tk.Frame(content_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.status_combo = ttk.Combobox(
+            filter_frame,
+            values=list(STATUS_FILTERS),
+            state="readonly",
+            font=FONT_NORMAL,
+            width=16
+        )
+        self.status_combo.current(0)
+        self.status_combo.pack(side=tk.LEFT, padx=5)
+        self.status_combo.bind('<<ComboboxSelected>>', lambda e: self.subscribe())
+        
+        self.rank_combo = ttk.Combobox(
+            filter_frame,
+            values=list(RANK_FILTERS),
+            state="readonly",
+            font=FONT_NORMAL,
+            width=16
+        )
+        self.rank_combo.current(0)
+        self.rank_combo.pack(side=tk.LEFT, padx=5)
+        self.rank_combo.bind('<<ComboboxSelected>>', lambda e: self.subscribe())
+        
         # Table frame
         table_frame = tk.Frame(content_frame)
         table_frame.pack(fill=tk.BOTH, expand=True)
@@ -73,20 +113,22 @@ class RoomListFrm:
         # Treeview (table)
         self.room_table = ttk.Treeview(
             table_frame,
-            columns=("Room", "Status", "Password"),
+            columns=("Room", "Status", "Password", "Rank"),
             show="headings",
             yscrollcommand=scrollbar.set,
-            height=12
+            height=10
         )
         
         # Configure columns
         self.room_table.heading("Room", text="Tên phòng")
         self.room_table.heading("Status", text="Trạng thái")
         self.room_table.heading("Password", text="Bảo mật")
+        self.room_table.heading("Rank", text="Hạng chủ phòng")
         
-        self.room_table.column("Room", width=200, anchor=tk.W)
-        self.room_table.column("Status", width=150, anchor=tk.CENTER)
-        self.room_table.column("Password", width=120, anchor=tk.CENTER)
+        self.room_table.column("Room", width=150, anchor=tk.W)
+        self.room_table.column("Status", width=120, anchor=tk.CENTER)
+        self.room_table.column("Password", width=110, anchor=tk.CENTER)
+        self.room_table.column("Rank", width=120, anchor=tk.CENTER)
         
         self.room_table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=self.room_table.yview)
@@ -106,6 +148,19 @@ class RoomListFrm:
             width=12
         ).pack(side=tk.LEFT, padx=5)
         
+        self.more_btn = tk.Button(
+            btn_frame,
+            text="Xem thêm",
+            font=FONT_BUTTON,
+            bg=COLOR_PRIMARY,
+            fg="white",
+            cursor="hand2",
+            command=self.load_more,
+            width=12,
+            state=tk.DISABLED
+        )
+        self.more_btn.pack(side=tk.LEFT, padx=5)
+        
         tk.Button(
             btn_frame,
             text="Vào phòng",
@@ -130,52 +185,105 @@ class RoomListFrm:
     
     def update_room_list(self, rooms, passwords):
         """
-        Update room list display
+        Update room list display from a full room list
         
         Args:
             rooms: List of room names (e.g., ["Phòng 100", "Phòng 101"])
             passwords: List of passwords (e.g., [" ", "123"])
         """
-        # Clear current items
+        self.clear_rooms()
+        for i, room_name in enumerate(rooms):
+            password = passwords[i] if i < len(passwords) else " "
+            self.add_room({
+                "id": room_name.replace("Phòng ", ""),
+                "locked": password.strip() != "",
+                "mark": RANK_BRONZE
+            })
+    
+    def add_room_page(self, rooms, next_cursor):
+        """
+        Add a page of rooms to the table
+        
+        Args:
+            rooms: List of room dicts with id, locked and mark
+            next_cursor: Cursor of the next page, 0 if this was the last
+        """
+        # The first page after subscribing replaces whatever the previous
+        # subscription sent meanwhile
+        if self.awaiting_first_page:
+            self.clear_rooms()
+            self.awaiting_first_page = False
+        for room in rooms:
+            self.add_room(room)
+        self.next_cursor = next_cursor
+        self.more_btn.config(state=tk.NORMAL if next_cursor else tk.DISABLED)
+    
+    def add_room(self, room):
+        """Add a room to the table, unless already shown"""
+        room_id = room["id"]
+        if room_id in self.rooms_data:
+            return
+        
+        room_name = f"Phòng {room_id}"
+        password_status = "Có mật khẩu" if room["locked"] else "Công khai"
+        self.room_table.insert(
+            "",
+            tk.END,
+            iid=room_id,
+            values=(room_name, "Đang chờ (1/2)", password_status, get_rank_name(room["mark"]))
+        )
+        self.rooms_data[room_id] = {
+            "id": room_id,
+            "name": room_name,
+            "has_password": room["locked"]
+        }
+    
+    def remove_room(self, room_id):
+        """Remove a room that is no longer open from the table"""
+        if self.rooms_data.pop(room_id, None) is not None:
+            self.room_table.delete(room_id)
+    
+    def clear_rooms(self):
+        """Remove all rooms from the table"""
         for item in self.room_table.get_children():
             self.room_table.delete(item)
-        
-        # Store data
-        self.rooms_data = []
-        
-        # Add rooms to table
-        if not rooms or len(rooms) == 0:
-            # No rooms available
-            self.room_table.insert(
-                "",
-                tk.END,
-                values=("Không có phòng nào", "-", "-")
-            )
-        else:
-            for i, room_name in enumerate(rooms):
-                # Extract room ID from name (e.g., "Phòng 100" -> "100")
-                room_id = room_name.replace("Phòng ", "")
-                
-                # Get password status
-                password = passwords[i] if i < len(passwords) else " "
-                # Public room: password is " " (single space) or empty
-                has_password = password.strip() != ""
-                password_status = "Có mật khẩu" if has_password else "Công khai"
-                
-                # Insert into table
-                self.room_table.insert(
-                    "",
-                    tk.END,
-                    values=(room_name, "Đang chờ (1/2)", password_status)
-                )
-                
-                # Store data for joining
-                self.rooms_data.append({
-                    "id": room_id,
-                    "name": room_name,
-                    "password": password,
-                    "has_password": has_password
-                })
+        self.rooms_data = {}
+    
+    def get_filters(self):
+        """Get the selected room filter and minimum mark"""
+        return STATUS_FILTERS[self.status_combo.get()], RANK_FILTERS[self.rank_combo.get()]
+    
+    def subscribe(self):
+        """Show the first page of rooms and follow room changes"""
+        room_filter, min_mark = self.get_filters()
+        if Client.socket_handle:
+            Client.socket_handle.write(create_message(
+                PROTOCOL_SUBSCRIBE_ROOM_LIST,
+                ROOM_PAGE_SIZE,
+                room_filter,
+                min_mark
+            ))
+            self.subscribed = True
+            self.awaiting_first_page = True
+    
+    def unsubscribe(self):
+        """Stop following room changes"""
+        if self.subscribed and Client.socket_handle:
+            Client.socket_handle.write(create_message(PROTOCOL_UNSUBSCRIBE_ROOM_LIST))
+        self.subscribed = False
+    
+    def load_more(self):
+        """Request the next page of rooms"""
+        if not self.next_cursor or not Client.socket_handle:
+            return
+        room_filter, min_mark = self.get_filters()
+        Client.socket_handle.write(create_message(
+            PROTOCOL_VIEW_ROOM_PAGE,
+            self.next_cursor,
+            ROOM_PAGE_SIZE,
+            room_filter,
+            min_mark
+        ))
     
     def join_room(self):
         """Join selected room"""
@@ -184,15 +292,11 @@ class RoomListFrm:
             messagebox.showwarning("Cảnh báo", "Vui lòng chọn phòng!")
             return
         
-        # Get selected index
-        selected_item = self.room_table.selection()[0]
-        index = self.room_table.index(selected_item)
-        
-        if index >= len(self.rooms_data):
+        room_data = self.rooms_data.get(selected[0])
+        if room_data is None:
             messagebox.showwarning("Cảnh báo", "Không thể vào phòng này!")
             return
         
-        room_data = self.rooms_data[index]
         room_id = room_data["id"]
         
         # Check if room requires password
@@ -293,8 +397,7 @@ class RoomListFrm:
     
     def refresh_rooms(self):
         """Refresh room list"""
-        if Client.socket_handle:
-            Client.socket_handle.write(create_message(PROTOCOL_VIEW_ROOM_LIST))
+        self.subscribe()
     
     def back(self):
         """Go back to homepage"""
@@ -307,6 +410,7 @@ class RoomListFrm:
     
     def close(self):
         """Close window"""
+        self.unsubscribe()
         try:
             self.window.destroy()
         except:
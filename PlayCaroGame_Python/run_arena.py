@@ -0,0 +1,80 @@
+"""
+Headless arena - play AI engines against each other and benchmark them
+
+Examples:
+    python run_arena.py alphabeta simple --games 20 --time 500
+    python run_arena.py --scaling 4
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from shared.constants import AI_TIME_BUDGET_MS
+from shared.arena import ENGINE_NAMES, run_arena, benchmark_scaling, write_results
+
+RESULTS_DIR = "arena_results"
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Play AI engines against each other")
+    parser.add_argument("engine", choices=ENGINE_NAMES, nargs="?", help="Engine under test")
+    parser.add_argument("opponent", choices=ENGINE_NAMES, nargs="?", default="simple",
+                        help="Reference engine (default: simple)")
+    parser.add_argument("--games", type=int, default=20, help="Number of games (default: 20)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument("--time", type=int, default=AI_TIME_BUDGET_MS, help="Thinking time per move in ms")
+    parser.add_argument("--seed", type=int, default=0, help="Base random seed")
+    parser.add_argument("--output", default=None, help="JSON results file")
+    parser.add_argument("--scaling", type=int, metavar="DEPTH", default=None,
+                        help="Time the parallel engine to DEPTH on 1, 2 and 4 workers instead")
+    args = parser.parse_args()
+
+    if args.scaling is not None:
+        run_scaling(args.scaling)
+        return
+    if args.engine is None:
+        parser.error("an engine is required")
+
+    print("=" * 60)
+    print(f"ARENA: {args.engine} vs {args.opponent}, {args.games} games, {args.time} ms/move")
+    print("=" * 60)
+
+    summary = run_arena(args.engine, args.opponent, args.games, args.workers, args.time, args.seed)
+
+    low, high = summary["confidence_interval"]
+    print(f"Result: +{summary['wins']} -{summary['losses']} ={summary['draws']}")
+    print(f"Score: {summary['score_rate']:.1%} (95% CI {low:.1%} - {high:.1%})")
+    for name, stats in ((args.engine, summary["engine_stats"]), (args.opponent, summary["opponent_stats"])):
+        print(f"  {name:10} {stats['avg_move_ms']:8.1f} ms/move (max {stats['max_move_ms']:.0f}), "
+              f"{stats['nodes_per_second']} nodes/s")
+    if summary["peak_memory_mb"] is not None:
+        print(f"Peak memory per worker: {summary['peak_memory_mb']} MB")
+    print(f"Elapsed: {summary['elapsed']} s on {summary['workers']} workers")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{args.engine}_vs_{args.opponent}.json")
+    write_results(summary, output)
+    print(f"Results written to {output}")
+
+
+def run_scaling(depth):
+    """Print the parallel engine's time to depth for 1, 2 and 4 workers"""
+    print("=" * 60)
+    print(f"SCALING: parallel alpha-beta to depth {depth}")
+    print("=" * 60)
+
+    summary = benchmark_scaling(depth=depth)
+    for run in summary["runs"]:
+        print(f"  {run['workers']} workers: {run['seconds']:7.2f} s, {run['nodes']} nodes, "
+              f"speedup {run['speedup']}x")
+    print(f"{summary['positions']} positions on {summary['cpu_count']} cores")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ import threading
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from server.controller.server import Server
+from server.controller.async_server import AsyncServer
+from shared.config import Config
 from server.view.admin import Admin
 
 
@@ -23,8 +25,10 @@ def main():
     # Create root window
     root = tk.Tk()
     
-    # Create server
-    server = Server()
+    # Create server; "--asyncio" serves all clients from one event loop
+    if "--asyncio" in sys.argv[1:]:
+        Config.SERVER_MODE = "asyncio"
+    server = AsyncServer() if Config.SERVER_MODE == "asyncio" else Server()
     
     # Create admin panel
     admin = Admin(root, server)
@@ -3,8 +3,12 @@ Server controller package
 """
 
 from .room import Room
+from .room_manager import RoomManager
+from .matchmaker import Matchmaker
+from .bot_player import BotPlayer
 from .server_thread import ServerThread
 from .server_thread_bus import ServerThreadBus
 from .server import Server
+from .async_server import AsyncServer
 
-__all__ = ['Room', 'ServerThread', 'ServerThreadBus', 'Server']
+__all__ = ['Room', 'RoomManager', 'Matchmaker', 'BotPlayer', 'ServerThread', 'ServerThreadBus', 'Server', 'AsyncServer']
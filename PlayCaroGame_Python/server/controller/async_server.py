@@ -0,0 +1,253 @@
+"""
+Asyncio server - one event loop serving every client connection
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from server.controller.client_handler import ClientHandler
+from server.controller.server_thread_bus import ServerThreadBus
+from server.controller.bot_player import get_bot_pool
+from server.dao.database import get_database
+from server.dao.stats_writer import get_stats_writer
+from server.dao.user_dao import UserDAO
+from shared.config import Config
+from shared.constants import *
+from shared.framing import FrameDecoder, FrameTooLargeError, encode_frame
+from shared.utils import log, create_message
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+class AsyncConnection(ClientHandler):
+    """
+    One client connection served by the event loop
+    
+    Reading and writing happen on the loop; commands run on a small shared
+    thread pool because the DAO calls block. Messages of one connection are
+    still handled one at a time and in order.
+    """
+    
+    def __init__(self, reader, writer, client_number, server_thread_bus, executor, admin=None):
+        """
+        Initialize connection
+        
+        Args:
+            reader: asyncio StreamReader of the client
+            writer: asyncio StreamWriter of the client
+            client_number: Unique client identifier
+            server_thread_bus: Reference to ServerThreadBus
+            executor: Thread pool running the commands
+            admin: Reference to admin panel
+        """
+        peer = writer.get_extra_info("peername")
+        super().__init__(client_number, server_thread_bus, admin, peer[0] if peer else "unknown")
+        self.reader = reader
+        self.writer = writer
+        self.executor = executor
+        self.loop = asyncio.get_running_loop()
+        self.max_pending = OUTBOUND_MAX_BYTES
+        writer.transport.set_write_buffer_limits(OUTBOUND_HIGH_WATERMARK, OUTBOUND_LOW_WATERMARK)
+    
+    async def serve(self):
+        """Read and handle messages until the client disconnects"""
+        decoder = FrameDecoder()
+        try:
+            self.write(create_message(PROTOCOL_SERVER_SEND_ID, self.client_number))
+            
+            while not self.is_closed:
+                data = await self.reader.read(BUFFER_SIZE)
+                if not data:
+                    break
+                
+                for message in decoder.feed(data):
+                    await self.loop.run_in_executor(self.executor, self.handle_message, message)
+                
+                # Backpressure: take no more requests while replies pile up
+                await self.writer.drain()
+        
+        except ConnectionError as e:
+            log(f"Client {self.client_number} receive error: {e}", "ERROR")
+        
+        except FrameTooLargeError as e:
+            log(f"Client {self.client_number} dropped: {e}", "WARNING")
+        
+        finally:
+            if not self.is_closed:
+                await self.loop.run_in_executor(self.executor, self.cleanup)
+    
+    def write(self, message):
+        """
+        Send message to client (safe from any thread)
+        
+        Args:
+            message: Message string
+        """
+        data = encode_frame(message)
+        try:
+            self.loop.call_soon_threadsafe(self._write, data)
+        except RuntimeError as e:  # Loop already closed
+            log(f"Write error to client {self.client_number}: {e}", "ERROR")
+    
+    def _write(self, data):
+        """Queue data on the transport (on the loop)"""
+        if self.writer.is_closing():
+            return
+        pending = self.writer.transport.get_write_buffer_size()
+        if pending + len(data) > self.max_pending:
+            log(f"Client {self.client_number} dropped: {pending} bytes unsent", "WARNING")
+            self.writer.transport.abort()
+            return
+        self.writer.write(data)
+    
+    def close_connection(self):
+        """Close client transport"""
+        try:
+            self.loop.call_soon_threadsafe(self.writer.close)
+        except RuntimeError:
+            pass
+
+
+class AsyncServer:
+    """Game server running every connection on one asyncio event loop"""
+    
+    def __init__(self, host=None, port=None, handler_threads=ASYNC_HANDLER_THREADS):
+        """
+        Initialize server
+        
+        Args:
+            host: Server host address
+            port: Server port
+            handler_threads: Threads running client commands
+        """
+        self.host = host or Config.SERVER_HOST
+        self.port = port or Config.SERVER_PORT
+        self.handler_threads = handler_threads
+        self.server_thread_bus = ServerThreadBus()
+        self.client_counter = 0
+        self.running = False
+        self.admin = None
+        self.loop = None
+        self.server = None
+        self.executor = None
+        
+        # Initialize database
+        db = get_database()
+        if not db.init_database():
+            log("Failed to initialize database", "ERROR")
+        
+        # Reset all users to offline status on server start
+        user_dao = UserDAO()
+        user_dao.reset_all_users_status()
+        log("Reset all users to offline status")
+    
+    def set_admin(self, admin):
+        """Set admin panel reference"""
+        self.admin = admin
+    
+    def start(self):
+        """Start server and block until it stops"""
+        raise_open_file_limit()
+        try:
+            asyncio.run(self.serve())
+        except Exception as e:
+            log(f"Server error: {e}", "ERROR")
+        finally:
+            self.running = False
+    
+    async def serve(self):
+        """Accept connections until stop() is called"""
+        self.loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.handler_threads,
+            thread_name_prefix="ClientHandler"
+        )
+        self.server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port, backlog=ASYNC_BACKLOG
+        )
+        
+        # A previous stop() stopped the shared stats writer
+        get_stats_writer().start()
+        self.running = True
+        log(f"Asyncio server started on {self.host}:{self.port}")
+        log("Waiting for connections...")
+        
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.executor.shutdown(wait=False)
+    
+    async def handle_connection(self, reader, writer):
+        """
+        Serve one client connection
+        
+        Args:
+            reader: asyncio StreamReader of the client
+            writer: asyncio StreamWriter of the client
+        """
+        log(f"New connection from {writer.get_extra_info('peername')}")
+        connection = AsyncConnection(
+            reader,
+            writer,
+            self.client_counter,
+            self.server_thread_bus,
+            self.executor,
+            self.admin
+        )
+        self.client_counter += 1
+        self.server_thread_bus.add(connection)
+        log(f"Active connections: {self.server_thread_bus.get_length()}")
+        
+        try:
+            await connection.serve()
+        finally:
+            writer.close()
+    
+    def stop(self):
+        """Stop server (safe from any thread)"""
+        self.running = False
+        
+        # Close all client connections
+        for connection in self.server_thread_bus.get_list_server_threads():
+            try:
+                connection.cleanup()
+            except Exception as e:
+                log(f"Error closing connection: {e}", "ERROR")
+        
+        # Clear thread bus
+        self.server_thread_bus = ServerThreadBus()
+        
+        # Stop bot workers
+        get_bot_pool().shutdown()
+        
+        # Write game results still pending
+        get_stats_writer().stop()
+        
+        if self.loop and self.server:
+            try:
+                self.loop.call_soon_threadsafe(self.server.close)
+            except RuntimeError:
+                pass
+        
+        log("Server stopped")
+    
+    def get_active_connections(self):
+        """Get number of active connections"""
+        return self.server_thread_bus.get_length()
+
+
+def raise_open_file_limit():
+    """Raise the open file limit to its maximum so idle clients do not run out of descriptors"""
+    if resource is None:
+        return
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard != resource.RLIM_INFINITY and soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            log(f"Open file limit raised from {soft} to {hard}")
+    except (ValueError, OSError) as e:
+        log(f"Could not raise open file limit: {e}", "WARNING")
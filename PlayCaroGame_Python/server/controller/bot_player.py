@@ -0,0 +1,328 @@
+"""
+Bot player - server-hosted AI opponent sitting in a room
+"""
+
+import threading
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from server.controller.room_manager import get_room_manager
+from shared.config import Config
+from shared.constants import *
+from shared.user import User
+from shared.game_state import GameState
+from shared.ai_engine import create_ai_engine
+from shared.game_logic import SimpleAI
+from shared.utils import log, create_message
+
+# Engines of this worker process, one per difficulty level
+_engines = {}
+
+
+def compute_bot_move(moves, player, level):
+    """
+    Compute a bot move (runs in a BotPool worker process)
+
+    Args:
+        moves: List of (x, y, player) played so far
+        player: Player the bot moves for
+        level: Difficulty name from Config.AI_PROFILES
+
+    Returns:
+        (x, y) of the move, or None if there is none
+    """
+    engine = _engines.get(level)
+    if engine is None:
+        profile = Config.get_ai_profile(level)
+        if profile.get("engine") == "parallel":
+            # Pool workers cannot start processes of their own
+            profile = dict(profile, engine="alphabeta")
+        engine = _engines[level] = create_ai_engine(profile)
+
+    state = GameState()
+    for x, y, mover in moves:
+        state.play(x, y, mover)
+    move = engine.get_best_move(state, player, 3 - player)
+    return (move.get_x(), move.get_y()) if move else None
+
+
+class BotPool:
+    """Bounded process pool computing the moves of all bot games"""
+
+    def __init__(self, workers=BOT_WORKERS, max_games=MAX_BOT_GAMES):
+        """
+        Initialize pool
+
+        Args:
+            workers: Number of worker processes
+            max_games: Maximum number of bot games at once
+        """
+        self.workers = workers
+        self.max_games = max_games
+        self.games = 0
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Reserve a seat for a new bot game
+
+        Returns:
+            True if the game may start, False if the pool is full
+        """
+        with self.lock:
+            if self.games >= self.max_games:
+                return False
+            self.games += 1
+            return True
+
+    def release(self):
+        """Free the seat of a finished bot game"""
+        with self.lock:
+            self.games = max(0, self.games - 1)
+
+    def get_games(self):
+        return self.games
+
+    def submit(self, moves, player, level):
+        """
+        Queue a move computation
+
+        Args:
+            moves: List of (x, y, player) played so far
+            player: Player the bot moves for
+            level: Difficulty name
+
+        Returns:
+            Future resolving to the (x, y) move
+        """
+        with self.lock:
+            if self.executor is None:
+                # Spawned workers do not inherit the server's sockets and threads
+                context = multiprocessing.get_context("spawn")
+                self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            executor = self.executor
+        return executor.submit(compute_bot_move, moves, player, level)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_bot_pool = None
+_bot_pool_lock = threading.Lock()
+
+
+def get_bot_pool():
+    """Get the bot pool singleton"""
+    global _bot_pool
+    with _bot_pool_lock:
+        if _bot_pool is None:
+            _bot_pool = BotPool()
+        return _bot_pool
+
+
+class BotPlayer:
+    """
+    AI seat of a room
+
+    Stands in for a ServerThread: the room and the human's thread talk to
+    it through write(), and it answers the human with the same messages a
+    client would send through the server.
+    """
+
+    # Bots use negative client numbers so they never clash with clients
+    _client_numbers = itertools.count(-1, -1)
+
+    def __init__(self, level=None, pool=None):
+        """
+        Initialize bot
+
+        Args:
+            level: Difficulty name, Config.AI_DIFFICULTY if None
+            pool: BotPool computing the moves, the shared one if None
+        """
+        self.level = level if level in Config.AI_PROFILES else Config.AI_DIFFICULTY
+        self.pool = pool or get_bot_pool()
+        self.client_number = next(BotPlayer._client_numbers)
+        self.user = User(user_id=0, username="bot", nickname=f"Bot {Config.get_ai_profile(self.level)['label']}",
+                         avatar="0")
+        self.room = None
+        self.is_closed = False
+
+        # Game state; the human plays X first when number_of_match is even
+        self.number_of_match = 0
+        self.game_number = 0
+        self.state = GameState()
+        self.moves = []
+        self.lock = threading.RLock()
+
+    def get_client_number(self):
+        return self.client_number
+
+    def get_user(self):
+        return self.user
+
+    def get_room(self):
+        return self.room
+
+    def set_room(self, room):
+        self.room = room
+        if room is None:
+            self.close()
+
+    def get_client_ip(self):
+        return "127.0.0.1"
+
+    def get_level(self):
+        return self.level
+
+    def is_bot(self):
+        return True
+
+    def get_player(self):
+        """Get the bot's stone: O while the human starts, X otherwise"""
+        return 2 if self.number_of_match % 2 == 0 else 1
+
+    def write(self, message):
+        """
+        Receive a message meant for the bot's client
+
+        Args:
+            message: Message string
+        """
+        parts = message.split(',')
+        command = parts[0]
+
+        if command == PROTOCOL_CARO and len(parts) >= 3:
+            self.on_human_move(int(parts[1]), int(parts[2]))
+        elif command in (PROTOCOL_NEW_GAME, PROTOCOL_COMPETITOR_TIME_OUT, PROTOCOL_DRAW_GAME):
+            self.new_game()
+        elif command == PROTOCOL_DRAW_REQUEST:
+            self.send(create_message(PROTOCOL_DRAW_REFUSE))
+        elif command == PROTOCOL_LEFT_ROOM:
+            self.close()
+
+    def send(self, message):
+        """Send a message to the human in the room"""
+        room = self.room
+        human = room.get_competitor(self.client_number) if room else None
+        if human:
+            human.write(message)
+
+    def on_human_move(self, x, y):
+        """Play the human's move and start thinking"""
+        with self.lock:
+            if self.is_closed or self.state.get_winner() or not self.state.is_empty(x, y):
+                return  # Game over, or the winning move repeated by handle_win
+            self.play(x, y, 3 - self.get_player())
+            if self.state.get_winner():
+                return  # The human's client reports the win
+            if self.state.is_full():
+                self.start_match(notify=True)
+            else:
+                self.think()
+
+    def new_game(self):
+        """Reset the board for the next match"""
+        with self.lock:
+            if not self.is_closed:
+                self.start_match()
+
+    def start_match(self, notify=False):
+        """
+        Swap colours and clear the board (lock held)
+
+        Args:
+            notify: Also tell the human a new match starts, for games the
+                human's client does not report itself
+        """
+        self.number_of_match += 1
+        self.game_number += 1
+        self.state = GameState()
+        self.moves = []
+        if notify:
+            self.send(create_message(PROTOCOL_NEW_GAME))
+        if self.get_player() == 1:
+            self.think()
+
+    def play(self, x, y, player):
+        """Record a move on the bot's board (lock held)"""
+        self.state.play(x, y, player)
+        self.moves.append((x, y, player))
+
+    def think(self):
+        """Ask the pool for a move (lock held)"""
+        game_number = self.game_number
+        future = self.pool.submit(list(self.moves), self.get_player(), self.level)
+        future.add_done_callback(lambda done: self.on_move_ready(done, game_number))
+
+    def on_move_ready(self, future, game_number):
+        """Play the move computed by the pool, or a simple one if it failed"""
+        move = None
+        try:
+            move = future.result()
+        except Exception as e:
+            # Also raised when the pool cancelled the search
+            log(f"Bot {self.client_number} move error: {e!r}", "ERROR")
+
+        with self.lock:
+            if self.is_closed or game_number != self.game_number:
+                return
+            if move is None:
+                move = self.get_fallback_move()
+                if move is None:
+                    self.abandon()
+                    return
+            x, y = move
+            self.play(x, y, self.get_player())
+            self.send(create_message(PROTOCOL_CARO, x, y))
+
+            # The human's client only reports its own wins, so the bot
+            # starts the next match itself, as handle_win does
+            if self.state.get_winner() or self.state.is_full():
+                self.start_match(notify=True)
+
+    def get_fallback_move(self):
+        """
+        Get a move from the in-process SimpleAI (lock held)
+
+        Returns:
+            (x, y), or None if no move could be found
+        """
+        try:
+            point = SimpleAI.get_best_move(self.state, self.get_player(), 3 - self.get_player())
+        except Exception as e:
+            log(f"Bot {self.client_number} fallback move error: {e}", "ERROR")
+            return None
+        if point is None or not self.state.is_empty(point.get_x(), point.get_y()):
+            return None
+        log(f"Bot {self.client_number} played a fallback move", "WARNING")
+        return point.get_x(), point.get_y()
+
+    def abandon(self):
+        """End the match when the bot cannot move, as if it left (lock held)"""
+        log(f"Bot {self.client_number} cannot move, leaving room", "ERROR")
+        room = self.room
+        if room is not None:
+            room.set_users_to_not_playing()
+            human = room.get_competitor(self.client_number)
+            if human:
+                human.write(create_message(PROTOCOL_LEFT_ROOM))
+                human.set_room(None)
+            get_room_manager().remove_room(room)
+        self.close()
+
+    def close(self):
+        """Leave the room and free the pool seat"""
+        with self.lock:
+            if self.is_closed:
+                return
+            self.is_closed = True
+            self.game_number += 1
+        self.room = None
+        self.pool.release()
+        log(f"Bot {self.client_number} left")
@@ -0,0 +1,768 @@
+"""
+Client handler - protocol commands shared by the threaded and asyncio servers
+"""
+
+from abc import ABC, abstractmethod
+from server.dao.user_dao import UserDAO
+from server.controller.room_manager import get_room_manager, get_host_mark, is_locked
+from server.controller.matchmaker import get_matchmaker
+from server.controller.bot_player import BotPlayer, get_bot_pool
+from shared.user import User
+from shared.utils import log, create_message, safe_int
+from shared.constants import *
+
+class ClientHandler(ABC):
+    """
+    Protocol state and commands of one client connection
+    
+    Subclasses own the connection: they feed each received message to
+    handle_message() and implement write() and close_connection().
+    """
+    
+    def __init__(self, client_number, server_thread_bus, admin=None, client_ip="unknown"):
+        """
+        Initialize client handler
+        
+        Args:
+            client_number: Unique client identifier
+            server_thread_bus: Reference to ServerThreadBus
+            admin: Reference to admin panel
+            client_ip: Address of the client
+        """
+        self.client_number = client_number
+        self.server_thread_bus = server_thread_bus
+        self.admin = admin
+        self.client_ip = client_ip
+        
+        self.user = None
+        self.room = None
+        self.is_closed = False
+        self.user_dao = UserDAO()
+        self.room_manager = get_room_manager()
+    
+    def get_client_number(self):
+        return self.client_number
+    
+    def get_user(self):
+        return self.user
+    
+    def set_user(self, user):
+        self.server_thread_bus.set_user(self, user)
+        self.user = user
+    
+    def get_room(self):
+        return self.room
+    
+    def set_room(self, room):
+        self.room = room
+    
+    def get_client_ip(self):
+        return self.client_ip
+    
+    def is_bot(self):
+        return False
+    
+    def get_string_from_user(self, user):
+        """Convert user to string for transmission"""
+        if user:
+            return user.to_string()
+        return ""
+    
+    def go_to_own_room(self):
+        """Player 1 enters room (starts game)"""
+        try:
+            competitor = self.room.get_competitor(self.client_number)
+            if competitor:
+                # Send to self
+                msg = create_message(
+                    PROTOCOL_GO_TO_ROOM,
+                    self.room.get_id(),
+                    competitor.get_client_ip(),
+                    1,  # is_start = 1
+                    self.get_string_from_user(competitor.get_user())
+                )
+                self.write(msg)
+                
+                # Send to competitor
+                msg = create_message(
+                    PROTOCOL_GO_TO_ROOM,
+                    self.room.get_id(),
+                    self.client_ip,
+                    0,  # is_start = 0
+                    self.get_string_from_user(self.user)
+                )
+                competitor.write(msg)
+        except Exception as e:
+            log(f"go_to_own_room error: {e}", "ERROR")
+    
+    def go_to_partner_room(self):
+        """Player 2 enters room (joins game)"""
+        try:
+            competitor = self.room.get_competitor(self.client_number)
+            if competitor:
+                # Send to self
+                msg = create_message(
+                    PROTOCOL_GO_TO_ROOM,
+                    self.room.get_id(),
+                    competitor.get_client_ip(),
+                    0,  # is_start = 0
+                    self.get_string_from_user(competitor.get_user())
+                )
+                self.write(msg)
+                
+                # Send to competitor
+                msg = create_message(
+                    PROTOCOL_GO_TO_ROOM,
+                    self.room.get_id(),
+                    self.client_ip,
+                    1,  # is_start = 1
+                    self.get_string_from_user(self.user)
+                )
+                competitor.write(msg)
+        except Exception as e:
+            log(f"go_to_partner_room error: {e}", "ERROR")
+    
+    def handle_message(self, message):
+        """
+        Handle incoming message
+        
+        Args:
+            message: Message string from client
+        """
+        try:
+            parts = message.split(',')
+            if not parts:
+                return
+            
+            command = parts[0]
+            
+            # Login/Register
+            if command == PROTOCOL_CLIENT_VERIFY:
+                self.handle_login(parts)
+            
+            elif command == PROTOCOL_REGISTER:
+                self.handle_register(parts)
+            
+            elif command == PROTOCOL_OFFLINE:
+                self.handle_offline(parts)
+            
+            # Friends
+            elif command == PROTOCOL_VIEW_FRIEND_LIST:
+                self.handle_view_friend_list()
+            
+            elif command == PROTOCOL_CHECK_FRIEND:
+                self.handle_check_friend(parts)
+            
+            elif command == PROTOCOL_MAKE_FRIEND:
+                self.handle_make_friend(parts)
+            
+            elif command == PROTOCOL_MAKE_FRIEND_CONFIRM:
+                self.handle_make_friend_confirm(parts)
+            
+            # Rooms
+            elif command == PROTOCOL_CREATE_ROOM:
+                self.handle_create_room(parts)
+            
+            elif command == PROTOCOL_VIEW_ROOM_LIST:
+                self.handle_view_room_list()
+            
+            elif command == PROTOCOL_VIEW_ROOM_PAGE:
+                self.handle_view_room_page(parts)
+            
+            elif command == PROTOCOL_SUBSCRIBE_ROOM_LIST:
+                self.handle_subscribe_room_list(parts)
+            
+            elif command == PROTOCOL_UNSUBSCRIBE_ROOM_LIST:
+                self.room_manager.unsubscribe(self.client_number)
+            
+            elif command == PROTOCOL_QUICK_ROOM:
+                self.handle_quick_room()
+            
+            elif command == PROTOCOL_PLAY_BOT:
+                self.handle_play_bot(parts)
+            
+            elif command == PROTOCOL_GO_TO_ROOM:
+                self.handle_go_to_room(parts)
+            
+            elif command == PROTOCOL_JOIN_ROOM:
+                self.handle_join_room(parts)
+            
+            elif command == PROTOCOL_CANCEL_ROOM:
+                self.handle_cancel_room()
+            
+            # Game
+            elif command == PROTOCOL_CARO:
+                self.handle_caro(message)
+            
+            elif command == PROTOCOL_WIN:
+                self.handle_win(parts)
+            
+            elif command == PROTOCOL_LOSE:
+                self.handle_lose()
+            
+            elif command == PROTOCOL_DRAW_REQUEST:
+                self.handle_draw_request(message)
+            
+            elif command == PROTOCOL_DRAW_CONFIRM:
+                self.handle_draw_confirm()
+            
+            elif command == PROTOCOL_DRAW_REFUSE:
+                self.handle_draw_refuse()
+            
+            # Chat
+            elif command == PROTOCOL_CHAT_SERVER:
+                self.handle_chat_server(parts)
+            
+            elif command == PROTOCOL_CHAT:
+                self.handle_chat(message)
+            
+            # Rank
+            elif command == PROTOCOL_GET_RANK_CHARTS:
+                self.handle_get_rank_charts()
+            
+            # Duel
+            elif command == PROTOCOL_DUEL_REQUEST:
+                self.handle_duel_request(parts)
+            
+            elif command == PROTOCOL_AGREE_DUEL:
+                self.handle_agree_duel(parts)
+            
+            elif command == PROTOCOL_DISAGREE_DUEL:
+                self.handle_disagree_duel(parts)
+            
+            # Voice
+            elif command == PROTOCOL_VOICE_MESSAGE:
+                self.handle_voice_message(message)
+            
+            # Leave room
+            elif command == PROTOCOL_LEFT_ROOM:
+                self.handle_left_room()
+        
+        except Exception as e:
+            log(f"Handle message error: {e}", "ERROR")
+            log(f"Message: {message}", "ERROR")
+    
+    def handle_login(self, parts):
+        """Handle login verification"""
+        if len(parts) < 3:
+            return
+        
+        username = parts[1]
+        password = parts[2]
+        
+        user = self.user_dao.verify_user(username, password)
+        
+        if user is None:
+            self.write(create_message(PROTOCOL_WRONG_USER, username, password))
+        
+        elif self.user_dao.check_is_banned(user.get_id()):
+            self.write(create_message(PROTOCOL_BANNED_USER, username, password))
+        
+        elif user.get_is_online():
+            # User already online - try to cleanup old connection
+            log(f"User {username} already online - attempting cleanup", "WARNING")
+            
+            # Find and close old connection
+            old_thread = self.server_thread_bus.get_server_thread_by_user_id(user.get_id())
+            
+            if old_thread:
+                log(f"Forcing disconnect of old connection for {username}")
+                try:
+                    old_thread.cleanup()
+                except:
+                    pass
+                # Force database update
+                self.user_dao.update_to_offline(user.get_id())
+                self.user_dao.update_to_not_playing(user.get_id())
+            
+            # Allow new login
+            self.write(create_message(PROTOCOL_LOGIN_SUCCESS, self.get_string_from_user(user)))
+            self.set_user(user)
+            self.user_dao.update_to_online(self.user.get_id())
+            self.server_thread_bus.broadcast(
+                self.client_number,
+                create_message(PROTOCOL_CHAT_SERVER, f"{user.get_nickname()} đang online")
+            )
+            if self.admin:
+                self.admin.add_message(f"[{user.get_id()}] {user.get_nickname()} đang online")
+        
+        else:
+            # Normal login
+            self.write(create_message(PROTOCOL_LOGIN_SUCCESS, self.get_string_from_user(user)))
+            self.set_user(user)
+            self.user_dao.update_to_online(self.user.get_id())
+            self.server_thread_bus.broadcast(
+                self.client_number,
+                create_message(PROTOCOL_CHAT_SERVER, f"{user.get_nickname()} đang online")
+            )
+            if self.admin:
+                self.admin.add_message(f"[{user.get_id()}] {user.get_nickname()} đang online")
+    
+    def handle_register(self, parts):
+        """Handle user registration"""
+        if len(parts) < 5:
+            return
+        
+        username = parts[1]
+        password = parts[2]
+        nickname = parts[3]
+        avatar = parts[4]
+        
+        if self.user_dao.check_duplicated(username):
+            self.write(create_message(PROTOCOL_DUPLICATE_USERNAME))
+        else:
+            self.user_dao.add_user(username, password, nickname, avatar)
+            user = self.user_dao.verify_user(username, password)
+            if user:
+                self.set_user(user)
+                self.user_dao.update_to_online(self.user.get_id())
+                self.server_thread_bus.broadcast(
+                    self.client_number,
+                    create_message(PROTOCOL_CHAT_SERVER, f"{self.user.get_nickname()} đang online")
+                )
+                self.write(create_message(PROTOCOL_LOGIN_SUCCESS, self.get_string_from_user(self.user)))
+    
+    def handle_offline(self, parts):
+        """Handle user offline"""
+        if self.user:
+            self.user_dao.update_to_offline(self.user.get_id())
+            if self.admin:
+                self.admin.add_message(f"[{self.user.get_id()}] {self.user.get_nickname()} đã offline")
+            self.server_thread_bus.broadcast(
+                self.client_number,
+                create_message(PROTOCOL_CHAT_SERVER, f"{self.user.get_nickname()} đã offline")
+            )
+            self.set_user(None)
+    
+    def handle_view_friend_list(self):
+        """Send friend list to client"""
+        if not self.user:
+            return
+        
+        friends = self.user_dao.get_list_friend(self.user.get_id())
+        result = [PROTOCOL_RETURN_FRIEND_LIST]
+        
+        for friend in friends:
+            result.extend([
+                str(friend.get_id()),
+                friend.get_nickname(),
+                "1" if friend.get_is_online() else "0",
+                "1" if friend.get_is_playing() else "0"
+            ])
+        
+        self.write(create_message(*result))
+    
+    def handle_check_friend(self, parts):
+        """Check if two users are friends"""
+        if len(parts) < 2 or not self.user:
+            return
+        
+        friend_id = int(parts[1])
+        is_friend = self.user_dao.check_is_friend(self.user.get_id(), friend_id)
+        self.write(create_message(PROTOCOL_CHECK_FRIEND_RESPONSE, "1" if is_friend else "0"))
+    
+    def handle_make_friend(self, parts):
+        """Send friend request"""
+        if len(parts) < 2 or not self.user:
+            return
+        
+        friend_id = int(parts[1])
+        nickname = self.user_dao.get_nickname_by_id(self.user.get_id())
+        
+        self.server_thread_bus.send_message_to_user_id(
+            friend_id,
+            create_message(PROTOCOL_MAKE_FRIEND_REQUEST, self.user.get_id(), nickname)
+        )
+    
+    def handle_make_friend_confirm(self, parts):
+        """Confirm friend request"""
+        if len(parts) < 2 or not self.user:
+            return
+        
+        friend_id = int(parts[1])
+        self.user_dao.make_friend(self.user.get_id(), friend_id)
+        log(f"Friend added: {self.user.get_id()} <-> {friend_id}")
+    
+    def handle_create_room(self, parts):
+        """Create new room"""
+        if not self.user:
+            return
+        
+        if len(parts) >= 2:
+            password = parts[1]
+            self.room = self.room_manager.create_room(self, password)
+            self.write(create_message(PROTOCOL_YOUR_CREATED_ROOM, self.room.get_id(), password))
+            log(f"Room {self.room.get_id()} created with password")
+        else:
+            self.room = self.room_manager.create_room(self)
+            self.write(create_message(PROTOCOL_YOUR_CREATED_ROOM, self.room.get_id()))
+            log(f"Room {self.room.get_id()} created without password")
+        
+        self.user_dao.update_to_playing(self.user.get_id())
+    
+    def handle_view_room_list(self):
+        """Send list of available rooms"""
+        result = [PROTOCOL_ROOM_LIST]
+        
+        for room in self.room_manager.get_open_rooms(8):
+            result.extend([
+                str(room.get_id()),
+                room.get_password()
+            ])
+        
+        self.write(create_message(*result))
+    
+    def handle_view_room_page(self, parts):
+        """
+        Send one page of the open rooms
+        
+        Message: view-room-page,cursor,page_size,filter,min_mark
+        Reply: room-page,next_cursor,[room_id,locked,mark]...
+        """
+        cursor = safe_int(parts[1]) if len(parts) >= 2 else 0
+        page_size, locked, min_mark = self.parse_room_filters(parts[2:])
+        self.send_room_page(*self.room_manager.get_room_page(cursor, page_size, locked, min_mark))
+    
+    def handle_subscribe_room_list(self, parts):
+        """
+        Send the first page of open rooms, then room-added and room-removed
+        events until unsubscribed
+        
+        Message: subscribe-room-list,page_size,filter,min_mark
+        """
+        page_size, locked, min_mark = self.parse_room_filters(parts[1:])
+        self.room_manager.subscribe(
+            self.client_number, self.on_room_event, self.send_room_page, page_size, locked, min_mark
+        )
+    
+    def send_room_page(self, rooms, next_cursor):
+        """Send a room-page message"""
+        self.write(self.create_room_page(rooms, next_cursor))
+    
+    def on_room_event(self, event, room):
+        """Forward a room list event to the client (room manager lock held)"""
+        if event == "add":
+            self.write(create_message(PROTOCOL_ROOM_ADDED, *self.describe_room(room)))
+        else:
+            self.write(create_message(PROTOCOL_ROOM_REMOVED, room.get_id()))
+    
+    def parse_room_filters(self, fields):
+        """
+        Parse the page size, filter and minimum mark of a room list request
+        
+        Args:
+            fields: [page_size, filter, min_mark], trailing fields optional
+        
+        Returns:
+            Tuple of (page_size, locked, min_mark) for RoomManager
+        """
+        page_size = safe_int(fields[0], ROOM_PAGE_SIZE) if fields else ROOM_PAGE_SIZE
+        page_size = max(1, min(page_size, MAX_ROOM_PAGE_SIZE))
+        room_filter = fields[1] if len(fields) >= 2 else ROOM_FILTER_ALL
+        locked = {ROOM_FILTER_OPEN: False, ROOM_FILTER_LOCKED: True}.get(room_filter)
+        min_mark = safe_int(fields[2]) if len(fields) >= 3 else 0
+        return page_size, locked, min_mark
+    
+    def create_room_page(self, rooms, next_cursor):
+        """Build a room-page message"""
+        result = [PROTOCOL_ROOM_PAGE, next_cursor]
+        for room in rooms:
+            result.extend(self.describe_room(room))
+        return create_message(*result)
+    
+    def describe_room(self, room):
+        """Get the room list fields of a room: ID, locked flag and creator's mark"""
+        return [room.get_id(), int(is_locked(room)), get_host_mark(room)]
+    
+    def handle_quick_room(self):
+        """Quick match - wait in a new room until the matchmaker pairs us"""
+        if not self.user:
+            return
+        
+        self.room = self.room_manager.create_room(self)
+        self.user_dao.update_to_playing(self.user.get_id())
+        log(f"Quick created room {self.room.get_id()} - waiting for opponent...")
+        # Send created room notification
+        self.write(create_message(PROTOCOL_YOUR_CREATED_ROOM, self.room.get_id()))
+        
+        # The matchmaker sends go-to-room to both players once paired
+        get_matchmaker().enqueue(self, self.room)
+    
+    def handle_play_bot(self, parts):
+        """Start a game against a server bot"""
+        if not self.user:
+            return
+        
+        pool = get_bot_pool()
+        if not pool.acquire():
+            self.write(create_message(PROTOCOL_BOT_UNAVAILABLE))
+            return
+        
+        bot = BotPlayer(parts[1] if len(parts) >= 2 else None, pool)
+        self.room = self.room_manager.create_room(self, user2_thread=bot)
+        bot.set_room(self.room)
+        self.user_dao.update_to_playing(self.user.get_id())
+        log(f"Bot game in room {self.room.get_id()} ({bot.get_level()}), {pool.get_games()} bot games")
+        
+        # The human starts as X; the bot answers through the room like a client
+        self.write(create_message(
+            PROTOCOL_GO_TO_ROOM,
+            self.room.get_id(),
+            bot.get_client_ip(),
+            0,  # is_start = 0
+            self.get_string_from_user(bot.get_user())
+        ))
+    
+    def handle_go_to_room(self, parts):
+        """Go to specific room by ID"""
+        if len(parts) < 2 or not self.user:
+            return
+        
+        room_id = int(parts[1])
+        password = parts[2] if len(parts) >= 3 else ""
+        room = self.room_manager.get_room(room_id)
+        
+        if room is None:
+            self.write(create_message(PROTOCOL_ROOM_NOT_FOUND))
+        
+        elif room.get_number_of_user() == 2:
+            self.write(create_message(PROTOCOL_ROOM_FULLY))
+        
+        elif room.get_password() != " " and room.get_password() != password:
+            self.write(create_message(PROTOCOL_ROOM_WRONG_PASSWORD))
+        
+        elif not self.room_manager.join_room(room, self):
+            self.write(create_message(PROTOCOL_ROOM_FULLY))
+        
+        else:
+            self.room = room
+            room.increase_number_of_game()
+            self.user_dao.update_to_playing(self.user.get_id())
+            self.go_to_partner_room()
+    
+    def handle_join_room(self, parts):
+        """Join room by ID"""
+        if len(parts) < 2 or not self.user:
+            return
+        
+        room_id = int(parts[1])
+        room = self.room_manager.get_room(room_id)
+        
+        if room and self.room_manager.join_room(room, self):
+            self.room = room
+            log(f"Joined room {self.room.get_id()}")
+            self.room.increase_number_of_game()
+            self.go_to_partner_room()
+            self.user_dao.update_to_playing(self.user.get_id())
+    
+    def handle_cancel_room(self):
+        """Cancel waiting room"""
+        if self.user:
+            # Refused once an opponent is seated; go-to-room follows
+            if not self.room_manager.cancel_room(self.room, self):
+                log(f"Client {self.client_number} cancel ignored, room already full")
+                return
+            self.user_dao.update_to_not_playing(self.user.get_id())
+            log("Room cancelled")
+            get_matchmaker().cancel(self.client_number)
+    
+    def handle_caro(self, message):
+        """Handle game move"""
+        if self.room:
+            competitor = self.room.get_competitor(self.client_number)
+            if competitor:
+                competitor.write(message)
+    
+    def handle_win(self, parts):
+        """Handle win condition"""
+        if not self.room:
+            return
+        
+        if self.room.is_rated():
+            self.user_dao.add_win_game(self.user.get_id())
+        self.room.increase_number_of_game()
+        
+        competitor = self.room.get_competitor(self.client_number)
+        if competitor and len(parts) >= 3:
+            competitor.write(create_message(PROTOCOL_CARO, parts[1], parts[2]))
+        
+        self.room.broadcast(create_message(PROTOCOL_NEW_GAME))
+    
+    def handle_lose(self):
+        """Handle lose/timeout"""
+        if not self.room:
+            return
+        
+        competitor = self.room.get_competitor(self.client_number)
+        if competitor:
+            if self.room.is_rated():
+                self.user_dao.add_win_game(competitor.get_user().get_id())
+            self.room.increase_number_of_game()
+            competitor.write(create_message(PROTOCOL_COMPETITOR_TIME_OUT))
+        
+        self.write(create_message(PROTOCOL_NEW_GAME))
+    
+    def handle_draw_request(self, message):
+        """Forward draw request to competitor"""
+        if self.room:
+            competitor = self.room.get_competitor(self.client_number)
+            if competitor:
+                competitor.write(message)
+    
+    def handle_draw_confirm(self):
+        """Confirm draw game"""
+        if self.room:
+            self.room.increase_number_of_draw()
+            self.room.increase_number_of_game()
+            self.room.broadcast(create_message(PROTOCOL_DRAW_GAME))
+    
+    def handle_draw_refuse(self):
+        """Refuse draw request"""
+        if self.room:
+            competitor = self.room.get_competitor(self.client_number)
+            if competitor:
+                competitor.write(create_message(PROTOCOL_DRAW_REFUSE))
+    
+    def handle_chat_server(self, parts):
+        """Broadcast chat to server"""
+        if not self.user or len(parts) < 2:
+            return
+        
+        msg = create_message(PROTOCOL_CHAT_SERVER, f"{self.user.get_nickname()} : {parts[1]}")
+        self.server_thread_bus.broadcast(self.client_number, msg)
+        
+        if self.admin:
+            self.admin.add_message(f"[{self.user.get_id()}] {self.user.get_nickname()} : {parts[1]}")
+    
+    def handle_chat(self, message):
+        """Forward chat to competitor"""
+        if self.room:
+            competitor = self.room.get_competitor(self.client_number)
+            if competitor:
+                competitor.write(message)
+    
+    def handle_get_rank_charts(self):
+        """Send ranking list"""
+        users = self.user_dao.get_user_static_rank()
+        result = [PROTOCOL_RETURN_GET_RANK_CHARTS]
+        
+        for user in users:
+            result.append(self.get_string_from_user(user))
+        
+        self.write(','.join(result))
+    
+    def handle_duel_request(self, parts):
+        """Send duel request to friend"""
+        if len(parts) < 2 or not self.user:
+            return
+        
+        friend_id = int(parts[1])
+        self.server_thread_bus.send_message_to_user_id(
+            friend_id,
+            create_message(PROTOCOL_DUEL_NOTICE, self.user.get_id(), self.user.get_nickname())
+        )
+    
+    def handle_agree_duel(self, parts):
+        """Accept duel request"""
+        if len(parts) < 2 or not self.user:
+            return
+        
+        user2_id = int(parts[1])
+        user2_thread = self.server_thread_bus.get_server_thread_by_user_id(user2_id)
+        
+        if user2_thread:
+            self.room = self.room_manager.create_room(self, user2_thread=user2_thread)
+            user2_thread.set_room(self.room)
+            self.room.increase_number_of_game()
+            self.go_to_own_room()
+            self.user_dao.update_to_playing(self.user.get_id())
+    
+    def handle_disagree_duel(self, parts):
+        """Refuse duel request"""
+        if len(parts) < 2:
+            return
+        
+        user_id = int(parts[1])
+        self.server_thread_bus.send_message_to_user_id(user_id, create_message(PROTOCOL_DISAGREE_DUEL))
+    
+    def handle_voice_message(self, message):
+        """Forward voice message"""
+        if self.room:
+            competitor = self.room.get_competitor(self.client_number)
+            if competitor:
+                competitor.write(message)
+    
+    def handle_left_room(self):
+        """Handle leaving room"""
+        if self.room:
+            self.room.set_users_to_not_playing()
+            self.room.decrease_number_of_game()
+            
+            competitor = self.room.get_competitor(self.client_number)
+            if competitor:
+                competitor.write(create_message(PROTOCOL_LEFT_ROOM))
+                competitor.set_room(None)
+            
+            self.room_manager.remove_room(self.room)
+            self.room = None
+    
+    @abstractmethod
+    def write(self, message):
+        """
+        Send message to client
+        
+        Args:
+            message: Message string
+        """
+    
+    @abstractmethod
+    def close_connection(self):
+        """Close the client connection"""
+    
+    def cleanup(self):
+        """Cleanup on disconnect"""
+        self.is_closed = True
+        
+        # Update user status in database
+        if self.user:
+            try:
+                # Force update to offline and not playing
+                self.user_dao.update_to_offline(self.user.get_id())
+                self.user_dao.update_to_not_playing(self.user.get_id())
+                log(f"User {self.user.get_nickname()} ({self.user.get_id()}) set to offline")
+                
+                # Broadcast offline status
+                self.server_thread_bus.broadcast(
+                    self.client_number,
+                    create_message(PROTOCOL_CHAT_SERVER, f"{self.user.get_nickname()} đã offline")
+                )
+                
+                if self.admin:
+                    self.admin.add_message(f"[{self.user.get_id()}] {self.user.get_nickname()} đã offline")
+            except Exception as e:
+                log(f"User cleanup error: {e}", "ERROR")
+        
+        # Clean up room
+        if self.room:
+            try:
+                competitor = self.room.get_competitor(self.client_number)
+                if competitor:
+                    self.room.decrease_number_of_game()
+                    competitor.write(create_message(PROTOCOL_LEFT_ROOM))
+                    competitor.set_room(None)
+                self.room_manager.remove_room(self.room)
+            except Exception as e:
+                log(f"Room cleanup error: {e}", "ERROR")
+        
+        self.room_manager.unsubscribe(self.client_number)
+        
+        # Remove from bus
+        try:
+            self.server_thread_bus.remove(self.client_number)
+        except Exception as e:
+            log(f"Bus removal error: {e}", "ERROR")
+        
+        # Close connection
+        self.close_connection()
+        
+        log(f"Client {self.client_number} disconnected and cleaned up")
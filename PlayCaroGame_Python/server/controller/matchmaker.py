@@ -0,0 +1,223 @@
+"""
+Matchmaker - pairs quick-match players of similar mark
+"""
+
+import bisect
+import queue
+import threading
+import time
+from server.controller.room_manager import get_room_manager
+from shared.constants import MATCH_BASE_BAND, MATCH_BAND_DOUBLING, MATCH_TICK
+from shared.utils import log, calculate_mark
+
+class MatchTicket:
+    """A player waiting in the quick-match queue with their own room"""
+    
+    def __init__(self, thread, room, mark):
+        self.thread = thread
+        self.room = room
+        self.mark = mark
+        self.client_number = thread.get_client_number()
+        self.enqueued_at = time.monotonic()
+    
+    def get_wait(self, now):
+        """Get seconds waited so far"""
+        return now - self.enqueued_at
+
+
+class Matchmaker:
+    """
+    Quick-match queue with a single owner thread
+    
+    Client threads only post requests to an inbox; the owner thread alone
+    touches the waiting players, so pairing needs no lock. A player accepts
+    opponents whose mark is within a band that doubles every band_doubling
+    seconds they wait, and a pairing is committed with
+    RoomManager.pair_rooms(), so a room joined meanwhile through the room
+    list is never seated twice.
+    """
+    
+    def __init__(self, room_manager=None, base_band=MATCH_BASE_BAND, band_doubling=MATCH_BAND_DOUBLING,
+                 tick=MATCH_TICK):
+        """
+        Initialize matchmaker
+        
+        Args:
+            room_manager: RoomManager of the rooms, the global one if None
+            base_band: Mark difference accepted at once
+            band_doubling: Seconds of waiting after which the band doubles
+            tick: Seconds between pairing passes while players wait
+        """
+        self.room_manager = room_manager or get_room_manager()
+        self.base_band = base_band
+        self.band_doubling = band_doubling
+        self.tick = tick
+        
+        self.inbox = queue.Queue()
+        self.waiting = {}  # client number -> MatchTicket, owner thread only
+        self.thread = None
+        self.start_lock = threading.Lock()
+        
+        # Metrics
+        self.matches = 0
+        self.cancelled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def enqueue(self, thread, room):
+        """
+        Queue a player waiting in their own open room
+        
+        Args:
+            thread: Player's ServerThread
+            room: Room the player created and waits in
+        """
+        user = thread.get_user()
+        mark = calculate_mark(user.get_number_of_game(), user.get_number_of_win())
+        self._post(("join", MatchTicket(thread, room, mark)))
+    
+    def cancel(self, client_number):
+        """Remove a player from the queue"""
+        self._post(("cancel", client_number))
+    
+    def stop(self):
+        """Stop the owner thread"""
+        if self.thread:
+            self.inbox.put(("stop", None))
+    
+    def get_band(self, ticket, now):
+        """Get the mark difference a ticket accepts after its wait"""
+        return self.base_band * 2 ** (ticket.get_wait(now) / self.band_doubling)
+    
+    def get_stats(self):
+        """
+        Get queue metrics
+        
+        Returns:
+            Dict with queue depth, matches made, cancellations and the
+            average and longest time to match in seconds
+        """
+        return {
+            "queue_depth": len(self.waiting),
+            "pending_requests": self.inbox.qsize(),
+            "matches": self.matches,
+            "cancelled": self.cancelled,
+            "avg_time_to_match": self.total_wait / (2 * self.matches) if self.matches else 0.0,
+            "max_time_to_match": self.max_wait,
+        }
+    
+    def _post(self, request):
+        """Send a request to the owner thread, starting it if needed"""
+        with self.start_lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="Matchmaker", daemon=True)
+                self.thread.start()
+        self.inbox.put(request)
+    
+    def run(self):
+        """Owner thread: apply requests and pair players"""
+        while True:
+            try:
+                kind, value = self.inbox.get(timeout=self.tick if self.waiting else None)
+            except queue.Empty:
+                kind = None
+            
+            if kind == "stop":
+                return
+            if kind == "join":
+                self.waiting[value.client_number] = value
+            elif kind == "cancel":
+                if self.waiting.pop(value, None):
+                    self.cancelled += 1
+            
+            try:
+                self.pair_waiting()
+            except Exception as e:
+                log(f"Matchmaker error: {e}", "ERROR")
+    
+    def pair_waiting(self):
+        """Pair every waiting player who has an acceptable opponent (owner thread)"""
+        # Drop players who left, disconnected or were joined via the room list
+        for ticket in list(self.waiting.values()):
+            if not self._is_waiting(ticket):
+                del self.waiting[ticket.client_number]
+        if len(self.waiting) < 2:
+            return
+        
+        now = time.monotonic()
+        by_mark = sorted(self.waiting.values(), key=lambda ticket: ticket.mark)
+        marks = [ticket.mark for ticket in by_mark]
+        paired = set()
+        
+        # Longest waiting players choose first
+        for ticket in sorted(by_mark, key=lambda ticket: ticket.enqueued_at):
+            if ticket.client_number in paired:
+                continue
+            opponent = self._nearest(ticket, by_mark, marks, paired)
+            if opponent is None:
+                continue
+            band = max(self.get_band(ticket, now), self.get_band(opponent, now))
+            if abs(opponent.mark - ticket.mark) <= band and self._commit(ticket, opponent, now):
+                paired.update((ticket.client_number, opponent.client_number))
+    
+    def _nearest(self, ticket, by_mark, marks, paired):
+        """Get the unpaired ticket with the closest mark, or None"""
+        def first(positions):
+            for position in positions:
+                other = by_mark[position]
+                if other is not ticket and other.client_number not in paired:
+                    return other
+            return None
+        
+        index = bisect.bisect_left(marks, ticket.mark)
+        below = first(range(index - 1, -1, -1))
+        above = first(range(index, len(by_mark)))
+        if below is None or (above is not None and above.mark - ticket.mark < ticket.mark - below.mark):
+            return above
+        return below
+    
+    def _is_waiting(self, ticket):
+        """Check a ticket's player still waits alone in their room"""
+        room = ticket.room
+        return (not ticket.thread.is_closed and ticket.thread.get_room() is room
+                and room.get_number_of_user() == 1 and self.room_manager.get_room(room.get_id()) is room)
+    
+    def _commit(self, host, guest, now):
+        """
+        Seat the guest in the host's room
+        
+        pair_rooms() moves the guest's thread to the host's room, so a
+        cancel racing the pairing is refused rather than half applied.
+        
+        Returns:
+            True if the pairing took place
+        """
+        if not self.room_manager.pair_rooms(host.room, guest.room, guest.thread):
+            return False
+        
+        del self.waiting[host.client_number]
+        del self.waiting[guest.client_number]
+        for ticket in (host, guest):
+            wait = ticket.get_wait(now)
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        self.matches += 1
+        
+        host.room.increase_number_of_game()
+        log(f"Matched {host.mark} vs {guest.mark} in room {host.room.get_id()} "
+            f"after {host.get_wait(now):.1f}s, {len(self.waiting)} waiting")
+        guest.thread.go_to_partner_room()
+        return True
+
+
+_matchmaker = None
+_matchmaker_lock = threading.Lock()
+
+
+def get_matchmaker():
+    """Get global matchmaker instance"""
+    global _matchmaker
+    with _matchmaker_lock:
+        if _matchmaker is None:
+            _matchmaker = Matchmaker()
+        return _matchmaker
@@ -0,0 +1,294 @@
+"""
+Outbound queue - buffered, non-blocking writes to client sockets
+"""
+
+import selectors
+import socket
+import threading
+from collections import deque
+from shared.constants import (OUTBOUND_HIGH_WATERMARK, OUTBOUND_LOW_WATERMARK, OUTBOUND_MAX_BYTES,
+                              OUTBOUND_CLOSE_TIMEOUT, OUTBOUND_STALL_TIMEOUT)
+from shared.utils import log
+
+class OutboundQueue:
+    """
+    Per-connection send queue drained by the shared OutboundWriter loop
+    
+    put() never blocks, so broadcasts and other clients' threads are not
+    held up by a slow reader. Above the high watermark the connection's
+    reader should stop taking requests (wait_writable()) until the queue
+    drains below the low watermark; past max_bytes the client is
+    disconnected as a slow consumer and its unsent bytes are dropped.
+    
+    The socket must be non-blocking. While the queue holds bytes it
+    belongs to the writer loop, which alone sends on the socket.
+    """
+    
+    def __init__(self, client_socket, name, high_watermark=OUTBOUND_HIGH_WATERMARK,
+                 low_watermark=OUTBOUND_LOW_WATERMARK, max_bytes=OUTBOUND_MAX_BYTES, writer=None):
+        """
+        Initialize queue
+        
+        Args:
+            client_socket: Connected non-blocking socket to write to
+            name: Connection name for log messages
+            high_watermark: Queued bytes above which the connection is congested
+            low_watermark: Queued bytes below which it is writable again
+            max_bytes: Queued bytes above which the client is dropped
+            writer: OutboundWriter sending the bytes, the global one if None
+        """
+        self.client_socket = client_socket
+        self.name = name
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.max_bytes = max_bytes
+        self.writer = writer or get_outbound_writer()
+        
+        self.chunks = deque()
+        self.pending = 0
+        self.congested = False
+        self.closed = False  # no more bytes are accepted
+        self.aborted = False  # unsent bytes were dropped
+        self.scheduled = False  # the writer loop owns the queue
+        self.condition = threading.Condition()
+    
+    def put(self, data):
+        """
+        Queue bytes for sending
+        
+        Args:
+            data: Encoded frame
+        
+        Returns:
+            False if the queue is closed or the client was dropped
+        """
+        with self.condition:
+            if self.closed:
+                return False
+            if self.pending + len(data) > self.max_bytes:
+                log(f"Client {self.name} dropped: {self.pending} bytes unsent", "WARNING")
+                schedule = self._abort()
+                accepted = False
+            else:
+                self.chunks.append(data)
+                self.pending += len(data)
+                if self.pending > self.high_watermark:
+                    self.congested = True
+                schedule = not self.scheduled
+                self.scheduled = True
+                accepted = True
+        
+        if schedule:
+            self.writer.schedule(self)
+        return accepted
+    
+    def send_ready(self):
+        """
+        Send as much as the socket takes now (writer loop only)
+        
+        The queue stays scheduled either way; once the loop has stopped
+        watching the socket it hands the queue back with release().
+        
+        Returns:
+            True if bytes remain and the loop should wait until the socket
+            is writable, False if the loop is done with the queue
+        """
+        with self.condition:
+            if self.chunks and not self.aborted:
+                data = b"".join(self.chunks)
+                self.chunks.clear()
+                try:
+                    sent = self.client_socket.send(data)
+                except (BlockingIOError, InterruptedError):
+                    sent = 0
+                except OSError as e:
+                    log(f"Write error to client {self.name}: {e}", "ERROR")
+                    self._abort()
+                    data = b""
+                    sent = 0
+                if sent < len(data):
+                    self.chunks.append(data[sent:])
+                self.pending -= sent
+                if self.congested and self.pending <= self.low_watermark:
+                    self.congested = False
+                    self.condition.notify_all()
+                if self.chunks:
+                    return True
+            return False
+    
+    def release(self):
+        """Hand the queue back once the loop no longer uses the socket (writer loop only)"""
+        with self.condition:
+            self.scheduled = False
+            self.condition.notify_all()
+    
+    def wait_writable(self, timeout=OUTBOUND_STALL_TIMEOUT):
+        """
+        Block while the queue is above its high watermark
+        
+        A client still congested after timeout seconds is not reading and
+        is dropped, as one past max_bytes is.
+        
+        Args:
+            timeout: Longest wait in seconds, None for no limit
+        
+        Returns:
+            True if the connection may go on, False if the queue closed
+        """
+        with self.condition:
+            if self.condition.wait_for(lambda: not self.congested or self.closed, timeout):
+                return not self.closed
+            log(f"Client {self.name} dropped: congested for {timeout}s", "WARNING")
+            schedule = self._abort()
+        
+        if schedule:
+            self.writer.schedule(self)
+        return False
+    
+    def get_pending(self):
+        """Get the number of queued bytes not yet sent"""
+        return self.pending
+    
+    def is_congested(self):
+        return self.congested
+    
+    def close(self, timeout=OUTBOUND_CLOSE_TIMEOUT):
+        """
+        Send what is queued, then shut the socket down
+        
+        Bytes still unsent after timeout seconds are dropped. When this
+        returns the writer loop no longer uses the socket, so it may be
+        closed.
+        
+        Args:
+            timeout: Longest wait for the queue to drain, in seconds
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+            if not self.condition.wait_for(lambda: not self.scheduled, timeout):
+                # The client is not reading; have the loop let go of it
+                self._abort()
+                self.writer.schedule(self)
+                self.condition.wait_for(lambda: not self.scheduled)
+            self._shutdown()
+    
+    def abort(self):
+        """Drop unsent bytes and disconnect the client"""
+        with self.condition:
+            self._abort()
+    
+    def _abort(self):
+        """
+        Drop unsent bytes and close the queue (condition held)
+        
+        Returns:
+            True if the writer loop holds the queue and must be told
+        """
+        self.closed = True
+        self.aborted = True
+        self.chunks.clear()
+        self.pending = 0
+        self.condition.notify_all()
+        self._shutdown()
+        return self.scheduled
+    
+    def _shutdown(self):
+        """Shut the socket down"""
+        try:
+            # Unblocks the reader's select() so the connection cleans up
+            self.client_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class OutboundWriter:
+    """
+    One I/O loop sending the queued bytes of every connection
+    
+    A socket is watched only while its queue holds bytes the socket would
+    not take at once, so idle connections cost neither a thread nor a
+    selector entry. Queues hand themselves over with schedule(), which
+    wakes the loop through a socket pair.
+    """
+    
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+        self.wakeup_reader.setblocking(False)
+        self.wakeup_writer.setblocking(False)
+        self.selector.register(self.wakeup_reader, selectors.EVENT_READ)
+        
+        self.requests = deque()
+        self.lock = threading.Lock()
+        self.thread = None
+        # Queue -> file descriptor it is watched under (loop only); the fd
+        # is kept so the socket can be unregistered even once closed
+        self.watched = {}
+    
+    def schedule(self, queue):
+        """Have the loop send a queue's bytes (any thread)"""
+        with self.lock:
+            self.requests.append(queue)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="OutboundWriter", daemon=True)
+                self.thread.start()
+        try:
+            self.wakeup_writer.send(b"\0")
+        except (BlockingIOError, InterruptedError):
+            pass  # a wakeup is already pending
+    
+    def run(self):
+        """Send queued bytes whenever their sockets are writable"""
+        while True:
+            for key, _ in self.selector.select():
+                if key.fileobj is self.wakeup_reader:
+                    self._take_requests()
+                else:
+                    self._send(key.data)
+    
+    def _take_requests(self):
+        """Start on the queues handed over since the last wakeup (loop only)"""
+        try:
+            while self.wakeup_reader.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+        with self.lock:
+            queues = list(self.requests)
+            self.requests.clear()
+        for queue in queues:
+            self._send(queue)
+    
+    def _send(self, queue):
+        """Send what a socket takes and watch it while bytes remain (loop only)"""
+        more = queue.send_ready()
+        if more and queue not in self.watched:
+            try:
+                fd = queue.client_socket.fileno()
+                self.selector.register(fd, selectors.EVENT_WRITE, queue)
+                self.watched[queue] = fd
+            except (KeyError, ValueError, OSError) as e:
+                log(f"Cannot watch client {queue.name}: {e}", "ERROR")
+                queue.abort()
+                more = False
+        if not more:
+            # Stop watching before the queue is handed back, as the owner
+            # may close the socket and its fd be reused right after
+            fd = self.watched.pop(queue, None)
+            if fd is not None:
+                self.selector.unregister(fd)
+            queue.release()
+
+
+_outbound_writer = None
+_outbound_writer_lock = threading.Lock()
+
+
+def get_outbound_writer():
+    """Get global outbound writer instance"""
+    global _outbound_writer
+    with _outbound_writer_lock:
+        if _outbound_writer is None:
+            _outbound_writer = OutboundWriter()
+        return _outbound_writer
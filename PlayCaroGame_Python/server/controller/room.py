@@ -96,40 +96,45 @@ class Room:
             return self.user2
         return self.user1
     
+    def get_players(self):
+        """Get the threads of the human players in the room"""
+        return [user for user in (self.user1, self.user2)
+                if user and user.get_user() and not user.is_bot()]
+    
+    def is_rated(self):
+        """Check if games in this room count towards player statistics"""
+        return not any(user and user.is_bot() for user in (self.user1, self.user2))
+    
     def set_users_to_playing(self):
         """Set both users to playing status"""
-        if self.user1 and self.user1.get_user():
-            self.user_dao.update_to_playing(self.user1.get_user().get_id())
-        if self.user2 and self.user2.get_user():
-            self.user_dao.update_to_playing(self.user2.get_user().get_id())
+        for user in self.get_players():
+            self.user_dao.update_to_playing(user.get_user().get_id())
     
     def set_users_to_not_playing(self):
         """Set both users to not playing status"""
-        if self.user1 and self.user1.get_user():
-            self.user_dao.update_to_not_playing(self.user1.get_user().get_id())
-        if self.user2 and self.user2.get_user():
-            self.user_dao.update_to_not_playing(self.user2.get_user().get_id())
+        for user in self.get_players():
+            self.user_dao.update_to_not_playing(user.get_user().get_id())
     
     def increase_number_of_game(self):
         """Increment game count for both players"""
-        if self.user1 and self.user1.get_user():
-            self.user_dao.add_game(self.user1.get_user().get_id())
-        if self.user2 and self.user2.get_user():
-            self.user_dao.add_game(self.user2.get_user().get_id())
+        if not self.is_rated():
+            return
+        for user in self.get_players():
+            self.user_dao.add_game(user.get_user().get_id())
     
     def increase_number_of_draw(self):
         """Increment draw count for both players"""
-        if self.user1 and self.user1.get_user():
-            self.user_dao.add_draw_game(self.user1.get_user().get_id())
-        if self.user2 and self.user2.get_user():
-            self.user_dao.add_draw_game(self.user2.get_user().get_id())
+        if not self.is_rated():
+            return
+        for user in self.get_players():
+            self.user_dao.add_draw_game(user.get_user().get_id())
     
     def decrease_number_of_game(self):
         """Decrement game count for both players"""
-        if self.user1 and self.user1.get_user():
-            self.user_dao.decrease_game(self.user1.get_user().get_id())
-        if self.user2 and self.user2.get_user():
-            self.user_dao.decrease_game(self.user2.get_user().get_id())
+        if not self.is_rated():
+            return
+        for user in self.get_players():
+            self.user_dao.decrease_game(user.get_user().get_id())
     
     def __str__(self):
         return f"Room(id={self.id}, users={self.get_number_of_user()})"
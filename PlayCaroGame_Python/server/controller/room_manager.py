@@ -0,0 +1,335 @@
+"""
+Room manager - registry of all rooms and of the rooms open to join
+"""
+
+import bisect
+import heapq
+import itertools
+from threading import Lock
+from server.controller.room import Room
+from shared.constants import ROOM_PASSWORD_PLACEHOLDER, ROOM_PAGE_SIZE
+from shared.utils import log, calculate_mark
+
+# Removed room IDs an open room index keeps before compacting, beyond one per open room
+COMPACT_SLACK = 16
+
+class OpenRoomIndex:
+    """
+    Rooms of one kind waiting for a second player, in room ID order
+    
+    Rooms only open when created, under the manager's lock, and room IDs
+    grow with creation, so new IDs are appended to a sorted list. Removed
+    IDs stay in the list until they outnumber the open rooms and it is
+    compacted, so adding and removing are amortised O(1) and a page finds
+    its cursor with bisect in O(log n).
+    """
+    
+    def __init__(self):
+        self.rooms = {}
+        self.ids = []  # sorted; may still hold IDs of removed rooms
+    
+    def add(self, room):
+        """Add a room"""
+        self.rooms[room.get_id()] = room
+        self.ids.append(room.get_id())
+    
+    def pop(self, room_id):
+        """Remove a room by ID, returning it or None"""
+        room = self.rooms.pop(room_id, None)
+        if room is not None and len(self.ids) > 2 * len(self.rooms) + COMPACT_SLACK:
+            self.ids = [room_id for room_id in self.ids if room_id in self.rooms]
+        return room
+    
+    def get_rooms_after(self, cursor):
+        """Iterate the rooms with an ID above cursor, oldest first"""
+        rooms = self.rooms
+        start = bisect.bisect_right(self.ids, cursor)
+        return (rooms[room_id] for room_id in itertools.islice(self.ids, start, None) if room_id in rooms)
+    
+    def __len__(self):
+        return len(self.rooms)
+
+
+def is_locked(room):
+    """Check whether a room needs a password to join"""
+    return room.get_password() != ROOM_PASSWORD_PLACEHOLDER
+
+
+def get_host_mark(room):
+    """Get the mark of the player who created a room"""
+    host = room.get_user1()
+    user = host.get_user() if host else None
+    if user is None:
+        return 0
+    return calculate_mark(user.get_number_of_game(), user.get_number_of_win())
+
+
+class RoomManager:
+    """
+    Thread-safe registry of rooms
+    
+    Rooms are kept by ID, and rooms waiting for a second player are also
+    kept in ID order in a public and a password-protected index, so finding,
+    joining and listing rooms never walks the connected clients. Room list
+    subscribers are told when a room opens or stops being open.
+    """
+    
+    def __init__(self):
+        self.rooms = {}
+        self.open_public = OpenRoomIndex()
+        self.open_private = OpenRoomIndex()
+        self.subscribers = {}  # key -> (callback, locked, min_mark)
+        self.lock = Lock()
+    
+    def create_room(self, user1_thread, password=ROOM_PASSWORD_PLACEHOLDER, user2_thread=None):
+        """
+        Create and register a room
+        
+        Args:
+            user1_thread: Thread of the creating player
+            password: Room password, ROOM_PASSWORD_PLACEHOLDER for none
+            user2_thread: Second player if already known (duel, bot)
+        
+        Returns:
+            New Room
+        """
+        with self.lock:
+            room = Room(user1_thread)
+            room.set_password(password)
+            self.rooms[room.get_id()] = room
+            if user2_thread is None:
+                self._open(room)
+            else:
+                room.set_user2(user2_thread)
+            return room
+    
+    def get_room(self, room_id):
+        """Get room by ID, or None"""
+        with self.lock:
+            return self.rooms.get(room_id)
+    
+    def join_room(self, room, user2_thread):
+        """
+        Take the free seat of a room
+        
+        Args:
+            room: Room to join
+            user2_thread: Thread of the joining player
+        
+        Returns:
+            True if joined, False if the room is full or gone
+        """
+        with self.lock:
+            if room.get_number_of_user() == 2 or self.rooms.get(room.get_id()) is not room:
+                return False
+            room.set_user2(user2_thread)
+            self._close(room)
+            return True
+    
+    def pair_rooms(self, host_room, guest_room, guest_thread):
+        """
+        Move the player waiting in one open room into another, atomically
+        
+        The guest's thread is moved to the host's room under the lock too,
+        so cancel_room() sees either the guest alone in their own room or
+        the guest seated, never a half-made pairing.
+        
+        Args:
+            host_room: Open room that receives the guest
+            guest_room: Open room of the guest, removed on success
+            guest_thread: Thread of the guest
+        
+        Returns:
+            True if paired, False if either room is no longer open
+        """
+        with self.lock:
+            for room in (host_room, guest_room):
+                if room.get_number_of_user() == 2 or self.rooms.get(room.get_id()) is not room:
+                    return False
+            if guest_thread.get_room() is not guest_room:
+                return False
+            del self.rooms[guest_room.get_id()]
+            self._close(guest_room)
+            host_room.set_user2(guest_thread)
+            guest_thread.set_room(host_room)
+            self._close(host_room)
+            return True
+    
+    def cancel_room(self, room, thread):
+        """
+        Remove the room a player waits in alone and take them out of it
+        
+        Args:
+            room: Room the player created
+            thread: Thread of the player
+        
+        Returns:
+            True if cancelled or there was no room, False if a second
+            player was seated first
+        """
+        if room is None:
+            return True
+        with self.lock:
+            if thread.get_room() is not room or room.get_number_of_user() == 2:
+                return False
+            if self.rooms.get(room.get_id()) is room:
+                del self.rooms[room.get_id()]
+                self._close(room)
+            thread.set_room(None)
+        log(f"Room removed: ID={room.get_id()}")
+        return True
+    
+    def get_open_rooms(self, limit=None):
+        """
+        Get rooms waiting for a second player, oldest first
+        
+        Args:
+            limit: Maximum number of rooms, None for all
+        
+        Returns:
+            List of Room
+        """
+        with self.lock:
+            return list(itertools.islice(self._get_rooms_after(0, None, 0), limit))
+    
+    def get_room_page(self, cursor=0, page_size=ROOM_PAGE_SIZE, locked=None, min_mark=0):
+        """
+        Get one page of the rooms waiting for a second player, oldest first
+        
+        Args:
+            cursor: Room ID the previous page ended at, 0 for the first page
+            page_size: Maximum number of rooms
+            locked: True for password-protected rooms only, False for
+                public rooms only, None for both
+            min_mark: Lowest mark of the room's creator
+        
+        Returns:
+            Tuple of (list of Room, cursor of the next page or 0 if none)
+        """
+        with self.lock:
+            return self._get_page(cursor, page_size, locked, min_mark)
+    
+    def subscribe(self, key, callback, send_page, page_size=ROOM_PAGE_SIZE, locked=None, min_mark=0):
+        """
+        Subscribe to rooms opening and closing, starting with the first page
+        
+        Both functions are called while the manager's lock is held, so the
+        first page comes before any event and events come in order; they
+        must not block or call back into the manager.
+        
+        Args:
+            key: Subscriber key, e.g. the client number; replaces any
+                earlier subscription with the same key
+            callback: Called as callback(event, room) with event "add" or
+                "remove" for rooms matching the filters
+            send_page: Called once as send_page(rooms, next_cursor) with
+                the first page, as from get_room_page()
+            page_size: Maximum number of rooms in the first page
+            locked: Lock filter, as for get_room_page()
+            min_mark: Lowest mark of the room's creator
+        """
+        with self.lock:
+            self.subscribers[key] = (callback, locked, min_mark)
+            send_page(*self._get_page(0, page_size, locked, min_mark))
+    
+    def unsubscribe(self, key):
+        """Remove a room list subscription, if any"""
+        with self.lock:
+            self.subscribers.pop(key, None)
+    
+    def remove_room(self, room):
+        """
+        Unregister a room once its players have left
+        
+        Args:
+            room: Room to remove
+        """
+        if room is None:
+            return
+        with self.lock:
+            if self.rooms.get(room.get_id()) is not room:
+                return
+            del self.rooms[room.get_id()]
+            self._close(room)
+        log(f"Room removed: ID={room.get_id()}")
+    
+    def get_room_count(self):
+        """Get number of rooms"""
+        with self.lock:
+            return len(self.rooms)
+    
+    def get_open_room_count(self):
+        """Get number of rooms waiting for a second player"""
+        with self.lock:
+            return len(self.open_public) + len(self.open_private)
+    
+    def get_subscriber_count(self):
+        """Get number of room list subscribers"""
+        with self.lock:
+            return len(self.subscribers)
+    
+    def _open_index(self, room):
+        """Get the open room index a room belongs in (lock held)"""
+        if is_locked(room):
+            return self.open_private
+        return self.open_public
+    
+    def _open(self, room):
+        """Add a room to the open rooms and notify subscribers (lock held)"""
+        self._open_index(room).add(room)
+        self._notify("add", room)
+    
+    def _close(self, room):
+        """Remove a room from the open rooms and notify subscribers (lock held)"""
+        if self._open_index(room).pop(room.get_id()) is not None:
+            self._notify("remove", room)
+    
+    def _notify(self, event, room):
+        """Send a room event to the matching subscribers (lock held)"""
+        if not self.subscribers:
+            return
+        locked = is_locked(room)
+        mark = get_host_mark(room)
+        for key, (callback, want_locked, min_mark) in list(self.subscribers.items()):
+            if (want_locked is None or want_locked == locked) and mark >= min_mark:
+                try:
+                    callback(event, room)
+                except Exception as e:
+                    log(f"Room subscriber {key} error: {e}", "ERROR")
+                    del self.subscribers[key]
+    
+    def _get_rooms_after(self, cursor, locked, min_mark):
+        """Iterate the open rooms above cursor matching the filters (lock held)"""
+        if locked is None:
+            # Room IDs grow with creation, so merging the indexes by ID
+            # keeps creation order across both
+            rooms = heapq.merge(self.open_public.get_rooms_after(cursor),
+                                self.open_private.get_rooms_after(cursor), key=Room.get_id)
+        elif locked:
+            rooms = self.open_private.get_rooms_after(cursor)
+        else:
+            rooms = self.open_public.get_rooms_after(cursor)
+        if min_mark > 0:
+            rooms = (room for room in rooms if get_host_mark(room) >= min_mark)
+        return rooms
+    
+    def _get_page(self, cursor, page_size, locked, min_mark):
+        """Get a page of open rooms (lock held)"""
+        # One extra room tells whether another page follows
+        rooms = list(itertools.islice(self._get_rooms_after(cursor, locked, min_mark), page_size + 1))
+        if len(rooms) > page_size:
+            return rooms[:page_size], rooms[page_size - 1].get_id()
+        return rooms, 0
+
+
+_room_manager = None
+_room_manager_lock = Lock()
+
+
+def get_room_manager():
+    """Get global room manager instance"""
+    global _room_manager
+    with _room_manager_lock:
+        if _room_manager is None:
+            _room_manager = RoomManager()
+        return _room_manager
@@ -7,7 +7,9 @@ import threading
 from concurrent.futures import ThreadPoolExecutor
 from server.controller.server_thread import ServerThread
 from server.controller.server_thread_bus import ServerThreadBus
+from server.controller.bot_player import get_bot_pool
 from server.dao.database import get_database
+from server.dao.stats_writer import get_stats_writer
 from server.dao.user_dao import UserDAO
 from shared.config import Config
 from shared.constants import *
@@ -54,6 +56,8 @@ class Server:
             self.server_socket.bind((self.host, self.port))
             self.server_socket.listen(100)
             
+            # A previous stop() stopped the shared stats writer
+            get_stats_writer().start()
             self.running = True
             log(f"Server started on {self.host}:{self.port}")
             log("Waiting for connections...")
@@ -109,6 +113,12 @@ class Server:
         # Clear thread bus
         self.server_thread_bus = ServerThreadBus()
         
+        # Stop bot workers
+        get_bot_pool().shutdown()
+        
+        # Write game results still pending
+        get_stats_writer().stop()
+        
         if self.server_socket:
             try:
                 self.server_socket.close()
@@ -6,36 +6,65 @@ from threading import Lock
 from shared.utils import log
 
 class ServerThreadBus:
-    """Manages all active server threads"""
+    """
+    Registry of all active server threads
+    
+    Threads are indexed by client number and, once logged in, by user ID,
+    so adding, removing and finding a thread is O(1). Enumeration works on
+    a snapshot taken under the lock, so the lock is only held briefly.
+    """
     
     def __init__(self):
-        self.list_server_threads = []
+        self.threads_by_client = {}
+        self.threads_by_user = {}
         self.lock = Lock()
     
     def add(self, server_thread):
         """Add server thread to bus"""
         with self.lock:
-            self.list_server_threads.append(server_thread)
-            log(f"Added thread {server_thread.get_client_number()}, total: {len(self.list_server_threads)}")
+            self.threads_by_client[server_thread.get_client_number()] = server_thread
+            total = len(self.threads_by_client)
+        log(f"Added thread {server_thread.get_client_number()}, total: {total}")
     
     def remove(self, client_number):
         """Remove server thread by client number"""
         with self.lock:
-            self.list_server_threads = [
-                t for t in self.list_server_threads 
-                if t.get_client_number() != client_number
-            ]
-            log(f"Removed thread {client_number}, remaining: {len(self.list_server_threads)}")
+            thread = self.threads_by_client.pop(client_number, None)
+            user = thread.get_user() if thread else None
+            if user and self.threads_by_user.get(user.get_id()) is thread:
+                del self.threads_by_user[user.get_id()]
+            remaining = len(self.threads_by_client)
+        log(f"Removed thread {client_number}, remaining: {remaining}")
+    
+    def set_user(self, server_thread, user):
+        """
+        Index a thread under the user who logged in on it
+        
+        Args:
+            server_thread: Thread of the connection
+            user: Logged in User, or None on logout
+        """
+        with self.lock:
+            old_user = server_thread.get_user()
+            if old_user and self.threads_by_user.get(old_user.get_id()) is server_thread:
+                del self.threads_by_user[old_user.get_id()]
+            if user and server_thread.get_client_number() in self.threads_by_client:
+                self.threads_by_user[user.get_id()] = server_thread
     
     def get_length(self):
         """Get number of active threads"""
         with self.lock:
-            return len(self.list_server_threads)
+            return len(self.threads_by_client)
     
     def get_list_server_threads(self):
-        """Get copy of server thread list"""
+        """Get snapshot of the server threads"""
         with self.lock:
-            return self.list_server_threads.copy()
+            return list(self.threads_by_client.values())
+    
+    def get_server_thread_by_client_number(self, client_number):
+        """Get server thread by client number"""
+        with self.lock:
+            return self.threads_by_client.get(client_number)
     
     def broadcast(self, client_number, message):
         """
@@ -45,21 +74,18 @@ class ServerThreadBus:
             client_number: Sender's client number (to exclude)
             message: Message to broadcast
         """
-        with self.lock:
-            for thread in self.list_server_threads:
-                if thread.get_client_number() != client_number:
-                    try:
-                        thread.write(message)
-                    except Exception as e:
-                        log(f"Broadcast error to client {thread.get_client_number()}: {e}", "ERROR")
+        # Write outside the lock so adding and removing clients never waits on sends
+        for thread in self.get_list_server_threads():
+            if thread.get_client_number() != client_number:
+                try:
+                    thread.write(message)
+                except Exception as e:
+                    log(f"Broadcast error to client {thread.get_client_number()}: {e}", "ERROR")
     
     def get_server_thread_by_user_id(self, user_id):
         """Get server thread by user ID"""
         with self.lock:
-            for thread in self.list_server_threads:
-                if thread.get_user() and thread.get_user().get_id() == user_id:
-                    return thread
-        return None
+            return self.threads_by_user.get(user_id)
     
     def send_message_to_user_id(self, user_id, message):
         """Send message to specific user by ID"""
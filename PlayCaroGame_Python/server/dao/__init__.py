@@ -3,6 +3,7 @@ Server DAO package
 """
 
 from .database import Database, get_database
+from .stats_writer import StatsWriter, get_stats_writer
 from .user_dao import UserDAO
 
-__all__ = ['Database', 'get_database', 'UserDAO']
+__all__ = ['Database', 'get_database', 'StatsWriter', 'get_stats_writer', 'UserDAO']
@@ -4,14 +4,21 @@ Database connection and initialization
 
 import sqlite3
 import os
+import threading
 from shared.utils import log, create_dirs_if_not_exists
 
 class Database:
-    """SQLite database manager"""
+    """
+    SQLite database manager
+    
+    All threads share one connection, so every statement runs under a
+    lock; otherwise one thread's commit() could end another's transaction.
+    """
     
     def __init__(self, db_path="database/caro_game.db"):
         self.db_path = db_path
         self.connection = None
+        self.lock = threading.RLock()
         self._ensure_database_exists()
     
     def _ensure_database_exists(self):
@@ -61,9 +68,10 @@ class Database:
                 sql_script = f.read()
             
             # Execute SQL script
-            cursor = conn.cursor()
-            cursor.executescript(sql_script)
-            conn.commit()
+            with self.lock:
+                cursor = conn.cursor()
+                cursor.executescript(sql_script)
+                conn.commit()
             log("Database initialized successfully")
             return True
         
@@ -90,18 +98,45 @@ class Database:
             return False
         
         try:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            conn.commit()
+            with self.lock:
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                conn.commit()
             return True
         except sqlite3.Error as e:
             log(f"Query execution error: {e}", "ERROR")
             log(f"Query: {query}", "ERROR")
             return False
     
+    def execute_many(self, query, params_list):
+        """
+        Execute a query once per parameter set, in a single transaction
+        
+        Args:
+            query: SQL query string
+            params_list: List of query parameters
+        
+        Returns:
+            True if all were executed, False if none were
+        """
+        conn = self.get_connection()
+        if conn is None:
+            return False
+        
+        with self.lock:
+            try:
+                conn.executemany(query, params_list)
+                conn.commit()
+                return True
+            except sqlite3.Error as e:
+                conn.rollback()
+                log(f"Query execution error: {e}", "ERROR")
+                log(f"Query: {query}", "ERROR")
+                return False
+    
     def fetch_one(self, query, params=None):
         """
         Fetch one result
@@ -118,12 +153,13 @@ class Database:
             return None
         
         try:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            return cursor.fetchone()
+            with self.lock:
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                return cursor.fetchone()
         except sqlite3.Error as e:
             log(f"Fetch one error: {e}", "ERROR")
             return None
@@ -144,12 +180,13 @@ class Database:
             return []
         
         try:
-            cursor = conn.cursor()
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            return cursor.fetchall()
+            with self.lock:
+                cursor = conn.cursor()
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                return cursor.fetchall()
         except sqlite3.Error as e:
             log(f"Fetch all error: {e}", "ERROR")
             return []
@@ -0,0 +1,204 @@
+"""
+Stats writer - write-behind batching of user game statistics
+"""
+
+import atexit
+import threading
+from server.dao.database import get_database
+from shared.constants import STATS_FLUSH_INTERVAL, STATS_MAX_PENDING
+from shared.utils import log
+
+class StatsWriter:
+    """
+    Accumulates game, win and draw counts in memory and writes them behind
+    
+    Increments are summed per user and written in one transaction by a
+    flusher thread, flush_interval seconds after the first pending change
+    or as soon as max_pending users have changes, so ending a game never
+    waits on the disk. Readers add get_pending() to the rows they read
+    rather than forcing a flush. stop() writes whatever is still pending,
+    and start() resumes writing behind after a stop().
+    """
+    
+    def __init__(self, db=None, flush_interval=STATS_FLUSH_INTERVAL, max_pending=STATS_MAX_PENDING):
+        """
+        Initialize writer
+        
+        Args:
+            db: Database to write to, the global one if None
+            flush_interval: Longest seconds a change stays unwritten
+            max_pending: Number of users with changes that forces a flush
+        """
+        self.db = db or get_database()
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        
+        self.pending = {}  # user ID -> [games, wins, draws]
+        self.writing = {}  # the batch being written, same layout
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.thread = None
+        self.stopped = False
+        self.exit_hook = False
+        
+        # Metrics
+        self.flushes = 0
+        self.rows_written = 0
+    
+    def add(self, user_id, games=0, wins=0, draws=0):
+        """
+        Queue changes to a user's statistics
+        
+        Args:
+            user_id: User ID
+            games: Change to the number of games
+            wins: Change to the number of wins
+            draws: Change to the number of draws
+        """
+        with self.condition:
+            counts = self.pending.setdefault(user_id, [0, 0, 0])
+            counts[0] += games
+            counts[1] += wins
+            counts[2] += draws
+            
+            stopped = self.stopped
+            if not stopped:
+                self._start()
+                self.condition.notify_all()
+        
+        # Nothing flushes after stop(), so write late changes at once
+        if stopped:
+            self.flush()
+    
+    def flush(self):
+        """
+        Write all pending changes in one transaction
+        
+        Returns:
+            True if written, False if the write failed and the changes
+            were put back to retry
+        """
+        # flush_lock is held while writing, so a flush() called to read
+        # fresh statistics waits for a batch already being written. The
+        # batch is committed and dropped from `writing` under the database
+        # lock, so get_pending() readers count it exactly once
+        with self.flush_lock, self.db.lock:
+            with self.condition:
+                pending, self.pending = self.pending, {}
+                self.writing = pending
+            if not pending:
+                return True
+            
+            query = """
+                UPDATE user SET
+                    NumberOfGame = MAX(0, NumberOfGame + ?),
+                    NumberOfWin = NumberOfWin + ?,
+                    NumberOfDraw = NumberOfDraw + ?
+                WHERE ID = ?
+            """
+            rows = [(games, wins, draws, user_id) for user_id, (games, wins, draws) in pending.items()]
+            written = self.db.execute_many(query, rows)
+            with self.condition:
+                self.writing = {}
+                if not written:
+                    # Merge back with anything added meanwhile
+                    for user_id, (games, wins, draws) in pending.items():
+                        counts = self.pending.setdefault(user_id, [0, 0, 0])
+                        counts[0] += games
+                        counts[1] += wins
+                        counts[2] += draws
+        
+        if written:
+            self.flushes += 1
+            self.rows_written += len(rows)
+            return True
+        log(f"Stats flush failed, {len(rows)} users kept pending", "ERROR")
+        return False
+    
+    def get_pending(self, user_ids=None):
+        """
+        Get changes not yet committed, including a batch being written
+        
+        Call with the database lock held while reading the rows the
+        changes apply to, so a batch is counted in the rows or here, never
+        both.
+        
+        Args:
+            user_ids: IDs to get changes of, None for every user with changes
+        
+        Returns:
+            Dict of user ID -> [games, wins, draws]
+        """
+        with self.condition:
+            if user_ids is None:
+                user_ids = set(self.pending) | set(self.writing)
+            changes = {}
+            for user_id in user_ids:
+                counts = [0, 0, 0]
+                for source in (self.writing, self.pending):
+                    for i, count in enumerate(source.get(user_id, ())):
+                        counts[i] += count
+                if any(counts):
+                    changes[user_id] = counts
+            return changes
+    
+    def run(self):
+        """Flusher thread: write pending changes on time or size"""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.stopped)
+                self.condition.wait_for(
+                    lambda: len(self.pending) >= self.max_pending or self.stopped,
+                    self.flush_interval
+                )
+                if self.stopped:
+                    return
+            self.flush()
+    
+    def start(self):
+        """Write changes behind again after stop()"""
+        with self.condition:
+            self.stopped = False
+            if self.pending:
+                self._start()
+    
+    def stop(self):
+        """Stop the flusher thread and write what is pending"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+            thread = self.thread
+        if thread and thread is not threading.current_thread():
+            thread.join()
+        with self.condition:
+            if self.thread is thread:
+                self.thread = None
+        self.flush()
+    
+    def get_pending_count(self):
+        """Get number of users with unwritten changes"""
+        with self.condition:
+            return len(self.pending)
+    
+    def _start(self):
+        """Start the flusher thread if needed (condition held)"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="StatsWriter", daemon=True)
+            self.thread.start()
+            if not self.exit_hook:
+                # The thread is a daemon, so write the last changes on exit too
+                atexit.register(self.stop)
+                self.exit_hook = True
+
+
+_stats_writer = None
+_stats_writer_lock = threading.Lock()
+
+
+def get_stats_writer():
+    """Get global stats writer instance"""
+    global _stats_writer
+    with _stats_writer_lock:
+        if _stats_writer is None:
+            _stats_writer = StatsWriter()
+        return _stats_writer
@@ -3,6 +3,7 @@ User Data Access Object
 """
 
 from server.dao.database import get_database
+from server.dao.stats_writer import get_stats_writer
 from shared.user import User
 from shared.utils import log, calculate_mark
 
@@ -11,6 +12,7 @@ class UserDAO:
     
     def __init__(self):
         self.db = get_database()
+        self.stats_writer = get_stats_writer()
     
     def verify_user(self, username, password):
         """
@@ -24,18 +26,21 @@ class UserDAO:
             User object if verified, None otherwise
         """
         query = "SELECT * FROM user WHERE Username = ? AND Password = ?"
-        row = self.db.fetch_one(query, (username, password))
+        with self.db.lock:
+            row = self.db.fetch_one(query, (username, password))
+            pending = self.stats_writer.get_pending([row['ID']]) if row else {}
         
         if row:
+            games, wins, draws = self._get_stats(row, pending)
             user = User(
                 user_id=row['ID'],
                 username=row['Username'],
                 password=row['Password'],
                 nickname=row['Nickname'],
                 avatar=row['Avatar'],
-                number_of_game=row['NumberOfGame'],
-                number_of_win=row['NumberOfWin'],
-                number_of_draw=row['NumberOfDraw'],
+                number_of_game=games,
+                number_of_win=wins,
+                number_of_draw=draws,
                 is_online=bool(row['IsOnline']),
                 is_playing=bool(row['IsPlaying']),
                 rank=self.get_rank(row['ID'])
@@ -188,19 +193,32 @@ class UserDAO:
             ORDER BY NumberOfWin DESC, NumberOfGame ASC
             LIMIT 100
         """
-        rows = self.db.fetch_all(query)
+        with self.db.lock:
+            pending = self.stats_writer.get_pending()
+            rows = {row['ID']: row for row in self.db.fetch_all(query)}
+            # Unwritten wins may lift a user into the top 100
+            missing = [user_id for user_id in pending if user_id not in rows]
+            if missing:
+                placeholders = ",".join("?" * len(missing))
+                for row in self.db.fetch_all(f"SELECT * FROM user WHERE ID IN ({placeholders})", missing):
+                    rows[row['ID']] = row
+        
+        stats = {user_id: self._get_stats(row, pending) for user_id, row in rows.items()}
+        ranked = sorted(rows, key=lambda user_id: (-stats[user_id][1], stats[user_id][0]))[:100]
         
         users = []
-        for row in rows:
+        for user_id in ranked:
+            row = rows[user_id]
+            games, wins, draws = stats[user_id]
             user = User(
                 user_id=row['ID'],
                 username=row['Username'],
                 password=row['Password'],
                 nickname=row['Nickname'],
                 avatar=row['Avatar'],
-                number_of_game=row['NumberOfGame'],
-                number_of_win=row['NumberOfWin'],
-                number_of_draw=row['NumberOfDraw'],
+                number_of_game=games,
+                number_of_win=wins,
+                number_of_draw=draws,
                 rank=self.get_rank(row['ID'])
             )
             users.append(user)
@@ -223,51 +241,85 @@ class UserDAO:
         Returns:
             Rank position (1-based)
         """
-        query = """
-            SELECT COUNT(*) + 1 as rank
-            FROM user
-            WHERE NumberOfWin > (
-                SELECT NumberOfWin FROM user WHERE ID = ?
-            )
+        with self.db.lock:
+            pending = self.stats_writer.get_pending()
+            row = self.db.fetch_one("SELECT NumberOfWin FROM user WHERE ID = ?", (user_id,))
+            if row is None:
+                return 0
+            wins = row['NumberOfWin'] + pending.get(user_id, (0, 0, 0))[1]
+            query = """
+                SELECT COUNT(*) + 1 as rank
+                FROM user
+                WHERE NumberOfWin > ?
+            """
+            rank = self.db.fetch_one(query, (wins,))['rank']
+            
+            # Correct for users whose unwritten wins move them past or behind
+            others = [other for other, counts in pending.items() if other != user_id and counts[1]]
+            if others:
+                placeholders = ",".join("?" * len(others))
+                query = f"SELECT ID, NumberOfWin FROM user WHERE ID IN ({placeholders})"
+                for other in self.db.fetch_all(query, others):
+                    committed = other['NumberOfWin']
+                    rank += (committed + pending[other['ID']][1] > wins) - (committed > wins)
+        return rank
+    
+    # Game statistics are written behind by the StatsWriter; methods
+    # reading them add the changes it has not written yet
+    
+    def _get_stats(self, row, pending):
         """
-        row = self.db.fetch_one(query, (user_id,))
-        return row['rank'] if row else 0
+        Get a user row's game, win and draw counts with unwritten changes
+        
+        Args:
+            row: user table row
+            pending: Changes from StatsWriter.get_pending()
+        
+        Returns:
+            Tuple of (games, wins, draws)
+        """
+        games, wins, draws = pending.get(row['ID'], (0, 0, 0))
+        return (max(0, row['NumberOfGame'] + games), row['NumberOfWin'] + wins,
+                row['NumberOfDraw'] + draws)
     
     def add_game(self, user_id):
         """Increment user's game count"""
-        query = "UPDATE user SET NumberOfGame = NumberOfGame + 1 WHERE ID = ?"
-        return self.db.execute_query(query, (user_id,))
+        self.stats_writer.add(user_id, games=1)
+        return True
     
     def decrease_game(self, user_id):
         """Decrement user's game count"""
-        query = "UPDATE user SET NumberOfGame = NumberOfGame - 1 WHERE ID = ? AND NumberOfGame > 0"
-        return self.db.execute_query(query, (user_id,))
+        self.stats_writer.add(user_id, games=-1)
+        return True
     
     def add_win_game(self, user_id):
         """Increment user's win count"""
-        query = "UPDATE user SET NumberOfWin = NumberOfWin + 1 WHERE ID = ?"
-        return self.db.execute_query(query, (user_id,))
+        self.stats_writer.add(user_id, wins=1)
+        return True
     
     def add_draw_game(self, user_id):
         """Increment user's draw count"""
-        query = "UPDATE user SET NumberOfDraw = NumberOfDraw + 1 WHERE ID = ?"
-        return self.db.execute_query(query, (user_id,))
+        self.stats_writer.add(user_id, draws=1)
+        return True
     
     def get_user_by_id(self, user_id):
         """Get full user info by ID"""
         query = "SELECT * FROM user WHERE ID = ?"
-        row = self.db.fetch_one(query, (user_id,))
+        with self.db.lock:
+            row = self.db.fetch_one(query, (user_id,))
+            pending = self.stats_writer.get_pending([user_id])
         
         if row:
+            games, wins, draws = self._get_stats(row, pending)
             return User(
                 user_id=row['ID'],
                 username=row['Username'],
                 password=row['Password'],
                 nickname=row['Nickname'],
                 avatar=row['Avatar'],
-                number_of_game=row['NumberOfGame'],
-                number_of_win=row['NumberOfWin'],
-                number_of_draw=row['NumberOfDraw'],
+                number_of_game=games,
+                number_of_win=wins,
+                number_of_draw=draws,
                 is_online=bool(row['IsOnline']),
                 is_playing=bool(row['IsPlaying']),
                 rank=self.get_rank(row['ID'])
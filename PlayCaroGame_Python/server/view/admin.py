@@ -357,16 +357,14 @@ class Admin:
         if messagebox.askyesno("Xác nhận", "Ngắt kết nối tất cả client đang kết nối?\n\nTất cả người chơi sẽ bị ngắt kết nối khỏi server."):
             count = 0
             if hasattr(self.server, 'server_thread_bus'):
-                threads = list(self.server.server_thread_bus.get_list_server_threads())
+                # cleanup() removes each thread from the bus; iterate a snapshot
+                threads = self.server.server_thread_bus.get_list_server_threads()
                 for thread in threads:
                     try:
                         thread.cleanup()
                         count += 1
                     except Exception as e:
                         self.add_message(f"Error disconnecting client: {e}")
-                
-                # Clear thread bus
-                self.server.server_thread_bus.get_list_server_threads().clear()
             
             self.add_message(f"Disconnected {count} clients")
             self.refresh_users()
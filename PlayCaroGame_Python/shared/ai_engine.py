@@ -0,0 +1,522 @@
+"""
+AI Engine - negamax search with alpha-beta pruning and pattern evaluation
+"""
+
+import random
+import time
+from functools import lru_cache
+from shared.constants import BOARD_SIZE
+from shared.point import Point
+from shared.bitboard import SIDE_KEYS, cell_index, cell_coords, iter_bits
+from shared.game_state import GameState
+from shared.transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from shared.game_logic import ThreatSpaceSolver
+from shared.opening_book import get_opening_book
+from shared.patterns import (FIVE, OPEN_FOUR, FOUR, OPEN_THREE, THREE, OPEN_TWO, TWO,
+                             classify_line, move_threats)
+
+SHAPE_SCORES = {
+    FIVE: 1000000,
+    OPEN_FOUR: 100000,
+    FOUR: 5000,
+    OPEN_THREE: 5000,
+    THREE: 500,
+    OPEN_TWO: 200,
+    TWO: 20,
+}
+
+WIN_SCORE = 10000000
+# Static score for a position that is won a move or two later
+FORCED_SCORE = 500000
+INFINITY = WIN_SCORE * 10
+
+# Move ordering weight of the shape a move makes, by shape class
+THREAT_WEIGHTS = [100000, 20000, 2000, 1500, 200, 100, 10, 0]
+# Candidates searched per node below the root
+MAX_BRANCHING = 20
+
+# Share of the time budget the forced-win solver may use for each of VCF and VCT
+SOLVER_TIME_SHARE = 0.1
+
+# A deliberately random move is picked from this many best-ordered candidates
+RANDOM_MOVE_POOL = 4
+
+# The clock is read once every CHECK_INTERVAL + 1 nodes
+CHECK_INTERVAL = 255
+
+
+def _decode_line(code):
+    """Decode a line code into its list of cell values"""
+    cells = []
+    while code:
+        cells.append(code & 3)
+        code >>= 2
+    return cells
+
+
+@lru_cache(maxsize=1 << 16)
+def line_value(code):
+    """
+    Evaluate one line code for both players
+
+    Args:
+        code: Line code from GameState.line_codes
+
+    Returns:
+        (score, fours, open_threes) for X followed by the same for O.
+        An open four counts as two fours, since it cannot be blocked.
+    """
+    cells = _decode_line(code)
+    result = []
+    for player in (1, 2):
+        line = "".join("x" if v == player else ("." if v == 0 else "o") for v in cells)
+        counts = classify_line(line)
+        score = sum(SHAPE_SCORES[shape] * n for shape, n in counts.items())
+        fours = counts.get(FOUR, 0) + 2 * counts.get(OPEN_FOUR, 0)
+        result.extend((score, fours, counts.get(OPEN_THREE, 0)))
+    return tuple(result)
+
+
+def evaluate(state, player):
+    """
+    Static evaluation of a position
+
+    Args:
+        state: GameState
+        player: Player to move
+
+    Returns:
+        Score from the point of view of player
+    """
+    totals = [0, 0, 0, 0, 0, 0]
+    for code in state.line_codes:
+        value = line_value(code)
+        for i in range(6):
+            totals[i] += value[i]
+
+    if player == 1:
+        my_score, my_fours, my_threes, opp_score, opp_fours, opp_threes = totals
+    else:
+        opp_score, opp_fours, opp_threes, my_score, my_fours, my_threes = totals
+
+    # Side to move completes a four first
+    if my_fours:
+        return FORCED_SCORE
+    # Two four threats cannot both be blocked
+    if opp_fours >= 2:
+        return -FORCED_SCORE
+    # An open three becomes an open four unless the opponent must be answered
+    if my_threes and not opp_fours:
+        my_score += SHAPE_SCORES[OPEN_FOUR] // 2
+
+    return my_score - opp_score
+
+
+def generate_moves(state, player, first=None, limit=None):
+    """
+    Get candidate moves in search order
+
+    A winning move is returned alone. If the opponent threatens to
+    win, only blocking moves are returned. Otherwise the candidates are
+    the empty cells within two steps of a stone, ordered by the shapes
+    they make for either player (own shapes count double), then by
+    distance to the last move, and cut to the `limit` best. The move
+    `first` (usually the transposition table move) is put before the
+    others if it is a candidate.
+
+    Args:
+        state: GameState
+        player: Player to move
+        first: Bit index of a move to try first, or None
+        limit: Maximum number of ordered candidates, or None for all
+
+    Returns:
+        List of bit indices
+    """
+    board = state.board
+    wins = board.winning_moves(player)
+    if wins:
+        return [(wins & -wins).bit_length() - 1]
+
+    blocks = board.winning_moves(3 - player)
+    if blocks:
+        moves = list(iter_bits(blocks))
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    last = state.history[-1][0] if state.history else cell_index(BOARD_SIZE // 2, BOARD_SIZE // 2)
+    lx, ly = cell_coords(last)
+    opponent = 3 - player
+
+    def order(index):
+        mine = sum(THREAT_WEIGHTS[shape] for shape in move_threats(state, index, player))
+        theirs = sum(THREAT_WEIGHTS[shape] for shape in move_threats(state, index, opponent))
+        x, y = cell_coords(index)
+        return -(2 * mine + theirs), max(abs(x - lx), abs(y - ly))
+
+    moves = sorted(state.candidates, key=order)
+    if limit and len(moves) > limit:
+        moves = moves[:limit]
+    if first in moves:
+        moves.remove(first)
+        moves.insert(0, first)
+    elif first in state.candidates:
+        moves.insert(0, first)
+    return moves
+
+
+class SearchResult:
+    """Outcome of one search"""
+
+    def __init__(self, move, score, depth, nodes, elapsed):
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    def get_move(self):
+        return self.move
+
+    def get_depth(self):
+        return self.depth
+
+    def get_nodes(self):
+        return self.nodes
+
+    def get_nps(self):
+        """Get nodes searched per second"""
+        return int(self.nodes / self.elapsed) if self.elapsed > 0 else 0
+
+    def __str__(self):
+        return (f"SearchResult(move={self.move}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, nps={self.get_nps()})")
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class _SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out or it is stopped"""
+
+
+class AlphaBetaAI:
+    """
+    Negamax AI with alpha-beta pruning
+
+    Search results are kept in a transposition table that lives as long
+    as the engine, so positions reached again on later turns of the same
+    game are not searched from scratch. Call new_game() between games.
+
+    A search running in another thread can be cut short by setting
+    stop_event, a threading.Event; it then returns its best move so far.
+    """
+
+    def __init__(self, depth=2, time_budget_ms=None, table=None, max_branching=MAX_BRANCHING,
+                 solver=None, use_book=True, max_nodes=None, randomness=0.0, seed=None):
+        """
+        Initialize engine
+
+        Args:
+            depth: Search depth in plies; the maximum depth when a time
+                budget is set
+            time_budget_ms: Thinking time per move in milliseconds, or None
+                to always search to full depth
+            table: TranspositionTable to use, a default-sized one if None
+            max_branching: Moves searched per node below the root, or None
+                for all candidates
+            solver: ThreatSpaceSolver tried before the search, a default one
+                if None
+            use_book: Play from the opening book while in book
+            max_nodes: Node budget per move after depth 1, or None
+            randomness: Chance of playing a random one of the best few
+                candidates instead of the searched move, for weaker play
+            seed: Random seed for randomness
+        """
+        self.depth = depth
+        self.max_branching = max_branching
+        self.time_budget_ms = time_budget_ms
+        self.max_nodes = max_nodes
+        self.randomness = randomness
+        self.rng = random.Random(seed)
+        self.nodes = 0
+        self.table = table if table is not None else TranspositionTable()
+        self.solver = solver if solver is not None else ThreatSpaceSolver()
+        self.book = get_opening_book() if use_book else None
+        self.last_result = None
+        self.stop_event = None
+        self._deadline = None
+        self._node_limit = None
+        self._root_best = None
+
+    def new_game(self):
+        """Forget results from the previous game"""
+        self.table.clear()
+
+    def get_stats_string(self):
+        """Get one-line summary of the last search"""
+        result = self.last_result
+        if result is None:
+            return ""
+        if not result.depth:
+            return "book move"
+        return f"depth {result.depth}, {result.nodes} nodes, {result.get_nps()} nodes/s"
+
+    def get_best_move(self, board, ai_player, human_player):
+        """
+        Get the best move for AI
+
+        Args:
+            board: 2D array, BitBoard or GameState representing the game board
+            ai_player: AI's player marker (1 or 2)
+            human_player: Human's player marker (1 or 2)
+
+        Returns:
+            Point object representing the best move, or None if board is full
+        """
+        result = self.search(board, ai_player)
+        return result.move if result else None
+
+    def search(self, board, player, time_budget_ms=None, max_depth=None):
+        """
+        Iterative deepening search
+
+        Book moves and forced wins found by the threat-space solver are
+        played without searching. Otherwise searches depth 1, 2, ... until max_depth is
+        done or the time budget runs out. An unfinished iteration is
+        abandoned, but its best root move is kept if it beat the previous
+        iteration's move, which is always searched first. Depth 1 always
+        completes unless stop_event is set, so a move is returned however
+        small the budget.
+
+        Args:
+            board: 2D array, BitBoard or GameState representing the game board
+            player: Player marker to move
+            time_budget_ms: Overrides the engine's budget for this search
+            max_depth: Overrides the engine's depth for this search
+
+        Returns:
+            SearchResult, or None if the board is full
+        """
+        if isinstance(board, GameState):
+            state = board.copy()
+        else:
+            state = GameState.from_grid(board)
+
+        if state.is_full():
+            return None
+
+        start = time.perf_counter()
+        if state.move_count == 0:
+            center = BOARD_SIZE // 2
+            self.last_result = SearchResult(Point(center, center), 0, 0, 0, 0.0)
+            return self.last_result
+        book_move = self.book.lookup(state, player) if self.book is not None else None
+        if book_move is not None:
+            self.last_result = SearchResult(book_move, 0, 0, 0, time.perf_counter() - start)
+            return self.last_result
+
+        if time_budget_ms is None:
+            time_budget_ms = self.time_budget_ms
+        if max_depth is None:
+            max_depth = self.depth
+
+        self.nodes = 0
+        self.table.new_search()
+        self._deadline = None
+        self._node_limit = None
+        only_move = len(self._generate_moves(state, player)) == 1
+
+        if not only_move:
+            solver_ms = time_budget_ms * SOLVER_TIME_SHARE if time_budget_ms is not None else None
+            line = self.solver.find_win(state, player, solver_ms)
+            if line:
+                elapsed = time.perf_counter() - start
+                self.last_result = SearchResult(line[0], WIN_SCORE, len(line), self.solver.nodes, elapsed)
+                return self.last_result
+
+        best_index, best_score, completed = None, 0, 0
+
+        for depth in range(1, max_depth + 1):
+            self._root_best = None
+            try:
+                best_index, best_score = self._search_root(state, depth, player)
+                completed = depth
+            except _SearchTimeout:
+                if self._root_best is not None:
+                    best_index, best_score = self._root_best
+                break
+            if only_move or abs(best_score) >= WIN_SCORE:
+                break
+            if time_budget_ms is not None:
+                self._deadline = start + time_budget_ms / 1000
+            self._node_limit = self.max_nodes
+            if self._out_of_time():
+                break
+
+        if best_index is None:
+            # Stopped before depth 1 finished
+            best_index = self._generate_moves(state, player)[0]
+        elif (self.randomness and not only_move and abs(best_score) < WIN_SCORE
+              and self.rng.random() < self.randomness):
+            best_index = self.rng.choice(self._generate_moves(state, player, limit=RANDOM_MOVE_POOL))
+        self._deadline = None
+        self._node_limit = None
+        elapsed = time.perf_counter() - start
+        self.last_result = SearchResult(Point(*cell_coords(best_index)), best_score, completed, self.nodes, elapsed)
+        return self.last_result
+
+    def search_root_move(self, state, index, depth, alpha, player, time_budget_ms=None):
+        """
+        Search a single root move
+
+        Args:
+            state: GameState before the move (left unchanged)
+            index: Bit index of the move
+            depth: Search depth including the move
+            alpha: Lower bound; a score at or below it is only an upper bound
+            player: Player making the move
+            time_budget_ms: Time limit in milliseconds, or None
+
+        Returns:
+            Score of the move, or None if the time ran out
+        """
+        self.nodes = 0
+        if time_budget_ms is not None:
+            self._deadline = time.perf_counter() + time_budget_ms / 1000
+        try:
+            return self._score_move(state, index, depth, alpha, INFINITY, player)
+        except _SearchTimeout:
+            return None
+        finally:
+            self._deadline = None
+
+    def _out_of_time(self):
+        """Check whether the search must stop"""
+        if self.stop_event is not None and self.stop_event.is_set():
+            return True
+        if self._node_limit is not None and self.nodes >= self._node_limit:
+            return True
+        return self._deadline is not None and time.perf_counter() >= self._deadline
+
+    def _search_root(self, state, depth, player):
+        """
+        Search all root moves
+
+        Returns:
+            (best bit index, score)
+        """
+        key = state.hash ^ SIDE_KEYS[player]
+        entry = self.table.probe(key)
+        alpha = -INFINITY
+        best_index = None
+        for index in self._generate_moves(state, player, entry[3] if entry else None):
+            score = self._score_move(state, index, depth, alpha, INFINITY, player)
+            if best_index is None or score > alpha:
+                alpha = score
+                best_index = index
+                self._root_best = (best_index, alpha)
+        self.table.store(key, depth, alpha, EXACT, best_index)
+        return best_index, alpha
+
+    def _score_move(self, state, index, depth, alpha, beta, player):
+        """Play a move, search the reply and take it back"""
+        if state.play_index(index, player):
+            # Sooner wins score higher
+            score = WIN_SCORE + depth
+        elif state.is_full():
+            score = 0
+        else:
+            score = -self._negamax(state, depth - 1, -beta, -alpha, 3 - player)
+        state.undo()
+        return score
+
+    def _negamax(self, state, depth, alpha, beta, player):
+        """
+        Negamax search with alpha-beta pruning
+
+        Args:
+            state: GameState (moves are played and undone in place)
+            depth: Remaining depth
+            alpha, beta: Search window
+            player: Player to move
+
+        Returns:
+            Score from the point of view of player
+        """
+        self.nodes += 1
+        if not self.nodes & CHECK_INTERVAL and self._out_of_time():
+            raise _SearchTimeout()
+        if depth <= 0:
+            return evaluate(state, player)
+
+        key = state.hash ^ SIDE_KEYS[player]
+        entry = self.table.probe(key)
+        table_move = None
+        if entry is not None:
+            table_depth, table_score, bound, table_move = entry
+            if table_depth >= depth:
+                if bound == EXACT:
+                    return table_score
+                if bound == LOWER_BOUND and table_score >= beta:
+                    return table_score
+                if bound == UPPER_BOUND and table_score <= alpha:
+                    return table_score
+
+        original_alpha = alpha
+        best = -INFINITY
+        best_index = None
+        for index in self._generate_moves(state, player, table_move, self.max_branching):
+            score = self._score_move(state, index, depth, alpha, beta, player)
+            if score > best:
+                best = score
+                best_index = index
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best <= original_alpha:
+            bound = UPPER_BOUND
+        elif best >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.table.store(key, depth, best, bound, best_index)
+        return best
+
+    def _generate_moves(self, state, player, first=None, limit=None):
+        """Get candidate moves in search order; see generate_moves()"""
+        return generate_moves(state, player, first, limit)
+
+
+def create_ai_engine(profile, seed=None):
+    """
+    Create an engine for a difficulty profile
+
+    Args:
+        profile: Dict from Config.AI_PROFILES
+        seed: Random seed
+
+    Returns:
+        Object with get_best_move(board, ai_player, human_player)
+    """
+    engine = profile.get("engine", "alphabeta")
+    depth = profile.get("depth", 2)
+    time_budget_ms = profile.get("time_budget_ms")
+    if engine == "simple":
+        from shared.game_logic import SimpleAI
+        return SimpleAI()
+    if engine == "mcts":
+        from shared.mcts import MCTSAI
+        return MCTSAI(playouts=profile.get("max_nodes") or 1000000, time_budget_ms=time_budget_ms, seed=seed)
+
+    solver_depth = profile.get("solver_depth")
+    solver = ThreatSpaceSolver(max_depth=solver_depth) if solver_depth is not None else None
+    if engine == "parallel":
+        from shared.parallel_search import ParallelAlphaBetaAI
+        return ParallelAlphaBetaAI(depth=depth, time_budget_ms=time_budget_ms, solver=solver)
+    return AlphaBetaAI(depth=depth, time_budget_ms=time_budget_ms, solver=solver,
+                       max_nodes=profile.get("max_nodes"), randomness=profile.get("randomness", 0.0), seed=seed)
@@ -0,0 +1,324 @@
+"""
+Arena - headless engine-versus-engine matches and benchmarks
+"""
+
+import json
+import math
+import os
+import random
+import sys
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from shared.constants import AI_MAX_DEPTH, AI_TIME_BUDGET_MS
+from shared.config import Config
+from shared.bitboard import cell_coords
+from shared.game_state import GameState
+from shared.game_logic import SimpleAI
+from shared.ai_engine import AlphaBetaAI, create_ai_engine
+from shared.mcts import MCTSAI
+from shared.parallel_search import ParallelAlphaBetaAI
+from shared.opening_book import standard_openings
+from shared.utils import create_dirs_if_not_exists, log
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Engines at the given time budget, then the difficulty profiles
+ENGINE_NAMES = ["simple", "alphabeta", "mcts"] + list(Config.AI_PROFILES)
+
+# z value of a 95% confidence interval
+CONFIDENCE_Z = 1.96
+
+
+def create_engine(name, time_budget_ms=AI_TIME_BUDGET_MS, seed=None):
+    """
+    Create an engine by name
+
+    Args:
+        name: One of ENGINE_NAMES
+        time_budget_ms: Thinking time per move, for engines that use one;
+            difficulty profiles keep their own
+        seed: Random seed, for engines that take one
+
+    Returns:
+        Object with get_best_move(board, ai_player, human_player)
+    """
+    if name == "simple":
+        return SimpleAI()
+    if name == "alphabeta":
+        return AlphaBetaAI(depth=AI_MAX_DEPTH, time_budget_ms=time_budget_ms)
+    if name == "mcts":
+        return MCTSAI(playouts=1000000, time_budget_ms=time_budget_ms, seed=seed)
+    if name in Config.AI_PROFILES:
+        return create_ai_engine(Config.get_ai_profile(name), seed)
+    raise ValueError(f"Unknown engine: {name}")
+
+
+def _engine_nodes(engine):
+    """Get the work done by the engine's last move: search nodes, or playouts for MCTS"""
+    if isinstance(engine, AlphaBetaAI):
+        return engine.last_result.nodes if engine.last_result is not None else 0
+    if isinstance(engine, MCTSAI):
+        return engine.stats.get("playouts", 0)
+    return 0
+
+
+def _peak_memory_mb():
+    """Get the peak resident memory of this process in MB, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def play_game(engine_x, engine_o, opening, time_budget_ms=AI_TIME_BUDGET_MS, seed=None):
+    """
+    Play one game between two engines
+
+    An engine that returns no move or an occupied cell loses the game.
+
+    Args:
+        engine_x: Name of the engine playing X
+        engine_o: Name of the engine playing O
+        opening: List of (x, y) played before the engines take over
+        time_budget_ms: Thinking time per move
+        seed: Random seed
+
+    Returns:
+        Dict with the engines, winner (0 for a draw), moves played, peak
+        memory and per-player "moves", "time" and "nodes" totals
+    """
+    random.seed(seed)
+    engines = {
+        1: create_engine(engine_x, time_budget_ms, seed),
+        2: create_engine(engine_o, time_budget_ms, seed),
+    }
+    state = GameState()
+    for count, (x, y) in enumerate(opening):
+        state.play(x, y, 1 if count % 2 == 0 else 2)
+
+    sides = {player: {"moves": 0, "time": 0.0, "nodes": 0, "max_time": 0.0} for player in (1, 2)}
+    player = 1 if len(opening) % 2 == 0 else 2
+    winner = 0
+    while not state.is_full():
+        engine = engines[player]
+        start = time.perf_counter()
+        move = engine.get_best_move(state, player, 3 - player)
+        elapsed = time.perf_counter() - start
+
+        side = sides[player]
+        side["moves"] += 1
+        side["time"] += elapsed
+        side["max_time"] = max(side["max_time"], elapsed)
+        side["nodes"] += _engine_nodes(engine)
+
+        if move is None or not state.is_empty(move.get_x(), move.get_y()):
+            log(f"Arena: {engine_x if player == 1 else engine_o} made an illegal move {move}", "WARNING")
+            winner = 3 - player
+            break
+        if state.play(move.get_x(), move.get_y(), player):
+            winner = player
+            break
+        player = 3 - player
+
+    for engine in engines.values():
+        if hasattr(engine, "shutdown"):
+            engine.shutdown()
+    return {
+        "engine_x": engine_x,
+        "engine_o": engine_o,
+        "opening": opening,
+        "winner": winner,
+        "moves": state.get_move_count(),
+        "move_list": [list(cell_coords(index)) for index, _, _, _ in state.history],
+        "peak_memory_mb": _peak_memory_mb(),
+        "sides": {"x": sides[1], "o": sides[2]},
+    }
+
+
+def wilson_interval(score, games, z=CONFIDENCE_Z):
+    """
+    Get the Wilson confidence interval of a score rate
+
+    Args:
+        score: Points scored, a draw counting half
+        games: Games played
+        z: z value of the confidence level
+
+    Returns:
+        (low, high) bounds of the rate
+    """
+    if games == 0:
+        return 0.0, 1.0
+    rate = score / games
+    denominator = 1 + z * z / games
+    centre = (rate + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def summarize(engine_a, engine_b, games):
+    """
+    Summarize a match from engine_a's point of view
+
+    Args:
+        engine_a: Name of the engine under test
+        engine_b: Name of the reference engine
+        games: Results of play_game(), each with "a_player" set to the
+            player engine_a had in that game
+
+    Returns:
+        Dict with the score and its confidence interval, and the average
+        move latency and nodes per second of each engine
+    """
+    wins = losses = draws = 0
+    totals = {"engine": {"moves": 0, "time": 0.0, "nodes": 0, "max_time": 0.0},
+              "opponent": {"moves": 0, "time": 0.0, "nodes": 0, "max_time": 0.0}}
+    for game in games:
+        a_player = game["a_player"]
+        if game["winner"] == a_player:
+            wins += 1
+        elif game["winner"]:
+            losses += 1
+        else:
+            draws += 1
+        for player, key in ((1, "x"), (2, "o")):
+            side = game["sides"][key]
+            total = totals["engine" if player == a_player else "opponent"]
+            total["moves"] += side["moves"]
+            total["time"] += side["time"]
+            total["nodes"] += side["nodes"]
+            total["max_time"] = max(total["max_time"], side["max_time"])
+
+    count = len(games)
+    score = wins + draws / 2
+    low, high = wilson_interval(score, count)
+    summary = {
+        "engine": engine_a,
+        "opponent": engine_b,
+        "games": count,
+        "wins": wins,
+        "losses": losses,
+        "draws": draws,
+        "score_rate": round(score / count, 4) if count else 0.0,
+        "confidence_interval": [round(low, 4), round(high, 4)],
+        "avg_game_moves": round(sum(game["moves"] for game in games) / count, 1) if count else 0.0,
+    }
+    for role, total in totals.items():
+        summary[f"{role}_stats"] = {
+            "moves": total["moves"],
+            "avg_move_ms": round(total["time"] / total["moves"] * 1000, 2) if total["moves"] else 0.0,
+            "max_move_ms": round(total["max_time"] * 1000, 2),
+            "nodes_per_second": int(total["nodes"] / total["time"]) if total["time"] > 0 else 0,
+        }
+    memory = [game["peak_memory_mb"] for game in games if game["peak_memory_mb"] is not None]
+    summary["peak_memory_mb"] = max(memory) if memory else None
+    return summary
+
+
+def run_arena(engine_a, engine_b, games=20, workers=None, time_budget_ms=AI_TIME_BUDGET_MS, seed=0):
+    """
+    Play a match between two engines
+
+    Games start from the standard openings in turn, and each opening is
+    played twice with the colours swapped. Games run in parallel in
+    separate processes.
+
+    Args:
+        engine_a: Name of the engine under test
+        engine_b: Name of the reference engine
+        games: Number of games
+        workers: Number of processes, one per core if None
+        time_budget_ms: Thinking time per move
+        seed: Base random seed; game n uses seed + n
+
+    Returns:
+        Summary from summarize(), with the single game results under "results"
+    """
+    openings = standard_openings()
+    jobs = []
+    for number in range(games):
+        opening = openings[(number // 2) % len(openings)]
+        if number % 2 == 0:
+            jobs.append((engine_a, engine_b, opening, time_budget_ms, seed + number))
+        else:
+            jobs.append((engine_b, engine_a, opening, time_budget_ms, seed + number))
+
+    workers = min(workers or os.cpu_count() or 1, games) or 1
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_game(*job) for job in jobs]
+    else:
+        # Spawned workers do not inherit the caller's threads and sockets
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = list(pool.map(play_game, *zip(*jobs)))
+
+    for number, result in enumerate(results):
+        result["a_player"] = 1 if number % 2 == 0 else 2
+    summary = summarize(engine_a, engine_b, results)
+    summary["workers"] = workers
+    summary["time_budget_ms"] = time_budget_ms
+    summary["elapsed"] = round(time.perf_counter() - start, 2)
+    summary["results"] = results
+    return summary
+
+
+def benchmark_scaling(worker_counts=(1, 2, 4), depth=4, positions=4):
+    """
+    Time the parallel engine's fixed-depth search with different worker counts
+
+    Every count searches the same standard openings to the same depth,
+    after its workers have started. One worker runs the serial engine.
+
+    Args:
+        worker_counts: Numbers of worker processes to compare
+        depth: Search depth
+        positions: Number of standard openings to search
+
+    Returns:
+        Dict with the CPU count, depth, positions and one run per worker
+        count with its total seconds, nodes and speedup over the first
+    """
+    openings = standard_openings()[:positions]
+    runs = []
+    for workers in worker_counts:
+        engine = ParallelAlphaBetaAI(depth=depth, workers=workers, use_book=False)
+        seconds = nodes = 0
+        try:
+            if workers > 1:
+                engine.start()
+            for opening in openings:
+                engine.new_game()
+                state = GameState()
+                for count, (x, y) in enumerate(opening):
+                    state.play(x, y, 1 if count % 2 == 0 else 2)
+                result = engine.search(state, 1 if len(opening) % 2 == 0 else 2)
+                seconds += result.elapsed
+                nodes += result.nodes
+        finally:
+            engine.shutdown()
+        runs.append({"workers": workers, "seconds": round(seconds, 3), "nodes": nodes})
+
+    for run in runs:
+        run["speedup"] = round(runs[0]["seconds"] / run["seconds"], 2) if run["seconds"] else None
+    return {"cpu_count": os.cpu_count(), "depth": depth, "positions": len(openings), "runs": runs}
+
+
+def write_results(summary, path):
+    """
+    Write a match summary as JSON
+
+    Args:
+        summary: Result of run_arena()
+        path: Output file
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        create_dirs_if_not_exists(directory)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
@@ -0,0 +1,138 @@
+"""
+Batch evaluation - game status and threat features of many boards at once
+"""
+
+import numpy as np
+from shared.constants import BOARD_SIZE, WIN_CONDITION
+from shared.bitboard import BitBoard, DIRECTIONS
+from shared.game_state import GameState
+
+# Game status per board
+ONGOING = 0
+X_WINS = 1
+O_WINS = 2
+DRAW = 3
+
+
+def to_array(boards):
+    """
+    Stack boards into one array
+
+    Args:
+        boards: Sequence of 2D arrays, BitBoards or GameStates
+
+    Returns:
+        (N, BOARD_SIZE, BOARD_SIZE) int8 array, 0 empty, 1 X, 2 O
+    """
+    grids = []
+    for board in boards:
+        if isinstance(board, GameState):
+            board = board.board
+        if isinstance(board, BitBoard):
+            board = board.to_grid()
+        grids.append(board)
+    return np.asarray(grids, dtype=np.int8).reshape(-1, BOARD_SIZE, BOARD_SIZE)
+
+
+def _window_sums(planes, dx, dy):
+    """
+    Sum planes over every WIN_CONDITION-cell window in direction (dx, dy)
+
+    The board is shifted once per window cell and added up, so the work is
+    a handful of whole-array operations whatever the number of boards.
+
+    Args:
+        planes: (..., BOARD_SIZE, BOARD_SIZE) array
+        dx, dy: Direction from DIRECTIONS
+
+    Returns:
+        (..., rows, columns) array, one entry per window start
+    """
+    span = WIN_CONDITION - 1
+    rows = BOARD_SIZE - span * abs(dx)
+    columns = BOARD_SIZE - span * abs(dy)
+    y_start = span if dy < 0 else 0
+    total = 0
+    for k in range(WIN_CONDITION):
+        x = k * dx
+        y = y_start + k * dy
+        total = total + planes[..., x:x + rows, y:y + columns]
+    return total
+
+
+def window_counts(boards):
+    """
+    Count stones of each player in every window of every board
+
+    Args:
+        boards: (N, BOARD_SIZE, BOARD_SIZE) int8 array
+
+    Returns:
+        List of one (N, 2, rows, columns) int8 array per direction in
+        DIRECTIONS; [:, 0] counts X stones and [:, 1] O stones
+    """
+    planes = np.stack([boards == 1, boards == 2], axis=1).astype(np.int8)
+    return [_window_sums(planes, dx, dy) for dx, dy in DIRECTIONS]
+
+
+def threat_features(boards, counts=None):
+    """
+    Count open windows by the number of stones in them
+
+    A window is open for a player if the opponent has no stone in it, so
+    a window holding k stones is k moves from five. Five stones is a win,
+    four a four, three a three and so on.
+
+    Args:
+        boards: (N, BOARD_SIZE, BOARD_SIZE) int8 array
+        counts: Result of window_counts(boards), if already known
+
+    Returns:
+        (N, 2, WIN_CONDITION) int32 array; [n, p, k - 1] is the number of
+        open windows of board n holding k stones of player p + 1
+    """
+    if counts is None:
+        counts = window_counts(boards)
+    sizes = np.arange(1, WIN_CONDITION + 1, dtype=np.int8)
+    features = np.zeros((len(boards), 2, WIN_CONDITION), dtype=np.int32)
+    for window in counts:
+        # Swap the players to get the opponent's count for each window
+        open_windows = np.where(window[:, ::-1] == 0, window, 0)
+        matches = open_windows[..., np.newaxis] == sizes
+        features += matches.sum(axis=(2, 3), dtype=np.int32)
+    return features
+
+
+def game_status(boards, features=None):
+    """
+    Get the status of every board
+
+    Args:
+        boards: (N, BOARD_SIZE, BOARD_SIZE) int8 array
+        features: Result of threat_features(boards), if already known
+
+    Returns:
+        (N,) int8 array of ONGOING, X_WINS, O_WINS or DRAW
+    """
+    if features is None:
+        features = threat_features(boards)
+    fives = features[:, :, WIN_CONDITION - 1] > 0
+    full = (boards != 0).all(axis=(1, 2))
+    return np.select([fives[:, 0], fives[:, 1], full], [X_WINS, O_WINS, DRAW], ONGOING).astype(np.int8)
+
+
+def evaluate_batch(boards):
+    """
+    Get status and threat features of many boards
+
+    Args:
+        boards: (N, BOARD_SIZE, BOARD_SIZE) array, or a sequence of 2D
+            arrays, BitBoards or GameStates
+
+    Returns:
+        (status, features) as from game_status() and threat_features()
+    """
+    if not isinstance(boards, np.ndarray):
+        boards = to_array(boards)
+    features = threat_features(boards)
+    return game_status(boards, features), features
@@ -0,0 +1,256 @@
+"""
+Bitboard - compact board representation using one integer bitmask per player
+"""
+
+import random
+from shared.constants import BOARD_SIZE, WIN_CONDITION
+from shared.point import Point
+
+# Cell (x, y) lives at bit x * STRIDE + y. The extra column per row is
+# always empty, so horizontal and diagonal shifts never wrap to the next row.
+STRIDE = BOARD_SIZE + 1
+
+# Bit shift for each direction: horizontal, vertical, diagonal \, diagonal /
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+SHIFTS = [dx * STRIDE + dy for dx, dy in DIRECTIONS]
+
+
+def cell_index(x, y):
+    """Get bit index of cell (x, y)"""
+    return x * STRIDE + y
+
+
+def cell_coords(index):
+    """Get (x, y) of bit index"""
+    return divmod(index, STRIDE)
+
+
+def _build_neighbor_masks(distance):
+    """Build, for every cell, the mask of cells within Chebyshev distance"""
+    masks = [0] * (BOARD_SIZE * STRIDE)
+    for x in range(BOARD_SIZE):
+        for y in range(BOARD_SIZE):
+            mask = 0
+            for nx in range(max(0, x - distance), min(BOARD_SIZE, x + distance + 1)):
+                for ny in range(max(0, y - distance), min(BOARD_SIZE, y + distance + 1)):
+                    if nx != x or ny != y:
+                        mask |= 1 << cell_index(nx, ny)
+            masks[cell_index(x, y)] = mask
+    return masks
+
+
+# Precomputed masks
+FULL_MASK = sum(1 << cell_index(x, y) for x in range(BOARD_SIZE) for y in range(BOARD_SIZE))
+NEIGHBOR_MASKS = _build_neighbor_masks(1)
+NEAR_MASKS = _build_neighbor_masks(2)
+
+
+def _build_window_masks():
+    """
+    Build, for every cell and direction, the mask of line cells within
+    WIN_CONDITION - 1 steps. Any winning run inside such a window passes
+    through the centre cell.
+    """
+    reach = WIN_CONDITION - 1
+    masks = [[0] * 4 for _ in range(BOARD_SIZE * STRIDE)]
+    for x in range(BOARD_SIZE):
+        for y in range(BOARD_SIZE):
+            for d, (dx, dy) in enumerate(DIRECTIONS):
+                mask = 0
+                for k in range(-reach, reach + 1):
+                    nx, ny = x + k * dx, y + k * dy
+                    if 0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE:
+                        mask |= 1 << cell_index(nx, ny)
+                masks[cell_index(x, y)][d] = mask
+    return masks
+
+
+CELL_WINDOW_MASKS = _build_window_masks()
+
+
+def _build_zobrist_keys():
+    """
+    Build Zobrist keys
+
+    A fixed seed keeps hashes identical across processes and runs, so
+    they can be shared with worker processes and stored on disk.
+    """
+    rng = random.Random(0x5EED)
+    keys = [[0] * (BOARD_SIZE * STRIDE) for _ in range(3)]
+    for player in (1, 2):
+        for x in range(BOARD_SIZE):
+            for y in range(BOARD_SIZE):
+                keys[player][cell_index(x, y)] = rng.getrandbits(64)
+    side_keys = [0, rng.getrandbits(64), rng.getrandbits(64)]
+    return keys, side_keys
+
+
+# ZOBRIST_KEYS[player][index] is XOR-ed into the hash for each stone;
+# SIDE_KEYS[player] marks the player to move when a search needs it
+ZOBRIST_KEYS, SIDE_KEYS = _build_zobrist_keys()
+
+
+def iter_bits(mask):
+    """Yield the bit indices set in mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def has_run(bits, shift, length=WIN_CONDITION):
+    """Check whether bits contain `length` consecutive stones along shift"""
+    run = bits
+    for _ in range(length - 1):
+        run &= run >> shift
+        if not run:
+            return False
+    return True
+
+
+class BitBoard:
+    """Game board stored as one bitmask per player (1 for X, 2 for O)"""
+
+    def __init__(self):
+        # Indexed by player marker; index 0 is unused
+        self.bits = [0, 0, 0]
+
+    @classmethod
+    def from_grid(cls, board):
+        """
+        Create bitboard from a 2D array board
+
+        Args:
+            board: 2D array representing the game board
+
+        Returns:
+            BitBoard with the same stones
+        """
+        bitboard = cls()
+        for x in range(BOARD_SIZE):
+            row = board[x]
+            for y in range(BOARD_SIZE):
+                player = row[y]
+                if player:
+                    bitboard.bits[player] |= 1 << cell_index(x, y)
+        return bitboard
+
+    def to_grid(self):
+        """Convert to 2D array board"""
+        board = [[0 for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        for player in (1, 2):
+            for index in iter_bits(self.bits[player]):
+                x, y = cell_coords(index)
+                board[x][y] = player
+        return board
+
+    def copy(self):
+        """Get independent copy of this board"""
+        board = BitBoard()
+        board.bits = self.bits[:]
+        return board
+
+    def get(self, x, y):
+        """Get player marker at (x, y), 0 if empty"""
+        bit = 1 << cell_index(x, y)
+        if self.bits[1] & bit:
+            return 1
+        if self.bits[2] & bit:
+            return 2
+        return 0
+
+    def is_empty(self, x, y):
+        """Check if cell (x, y) is empty"""
+        return not (self.occupied() >> cell_index(x, y)) & 1
+
+    def place(self, x, y, player):
+        """Put player's stone on (x, y)"""
+        self.bits[player] |= 1 << cell_index(x, y)
+
+    def remove(self, x, y):
+        """Clear cell (x, y)"""
+        clear = ~(1 << cell_index(x, y))
+        self.bits[1] &= clear
+        self.bits[2] &= clear
+
+    def occupied(self):
+        """Get mask of all stones"""
+        return self.bits[1] | self.bits[2]
+
+    def empty_mask(self):
+        """Get mask of all empty cells"""
+        return FULL_MASK & ~(self.bits[1] | self.bits[2])
+
+    def stone_count(self):
+        """Get number of stones on board"""
+        return bin(self.bits[1] | self.bits[2]).count("1")
+
+    def is_full(self):
+        """Check if the board is full"""
+        return (self.bits[1] | self.bits[2]) == FULL_MASK
+
+    def check_win(self, x, y, player):
+        """
+        Check if player has a winning line through (x, y)
+
+        Args:
+            x, y: Position of the last move
+            player: Player marker
+
+        Returns:
+            True if there are WIN_CONDITION or more stones in a row through (x, y)
+        """
+        bits = self.bits[player]
+        window_masks = CELL_WINDOW_MASKS[cell_index(x, y)]
+        for d in range(4):
+            if has_run(bits & window_masks[d], SHIFTS[d]):
+                return True
+        return False
+
+    def winning_moves(self, player):
+        """
+        Get mask of empty cells where player completes a winning line
+
+        For each direction and each position of the gap inside a
+        WIN_CONDITION-long window, the window start is found by shifting
+        the stone and empty masks onto it and AND-ing them together.
+        """
+        bits = self.bits[player]
+        empty = self.empty_mask()
+        result = 0
+        for shift in SHIFTS:
+            shifted = [bits >> (k * shift) for k in range(WIN_CONDITION)]
+            for gap in range(WIN_CONDITION):
+                starts = empty >> (gap * shift)
+                for k in range(WIN_CONDITION):
+                    if k != gap:
+                        starts &= shifted[k]
+                result |= starts << (gap * shift)
+        return result & empty
+
+    def get_valid_moves(self):
+        """Get list of Point objects for every empty cell"""
+        return [Point(*cell_coords(index)) for index in iter_bits(self.empty_mask())]
+
+    def zobrist_hash(self):
+        """Compute Zobrist hash of the position from scratch"""
+        value = 0
+        for player in (1, 2):
+            keys = ZOBRIST_KEYS[player]
+            for index in iter_bits(self.bits[player]):
+                value ^= keys[index]
+        return value
+
+    def __eq__(self, other):
+        if isinstance(other, BitBoard):
+            return self.bits[1] == other.bits[1] and self.bits[2] == other.bits[2]
+        return False
+
+    def __hash__(self):
+        return hash((self.bits[1], self.bits[2]))
+
+    def __str__(self):
+        return f"BitBoard(stones={self.stone_count()})"
+
+    def __repr__(self):
+        return self.__str__()
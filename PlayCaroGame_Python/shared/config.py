@@ -10,6 +10,7 @@ class Config:
     # Server settings
     SERVER_HOST = DEFAULT_SERVER_HOST
     SERVER_PORT = DEFAULT_SERVER_PORT
+    SERVER_MODE = "thread"  # "thread" (one thread per client) or "asyncio"
     
     # Game settings
     BOARD_SIZE = BOARD_SIZE
@@ -20,6 +21,51 @@ class Config:
     # Database
     DATABASE_PATH = DATABASE_PATH
     
+    # AI difficulty profiles, weakest first. "engine" is one of "simple",
+    # "alphabeta", "parallel" or "mcts"; depth and time budget (ms) limit
+    # the search, max_nodes is a node budget per move, randomness the
+    # chance of a deliberately imprecise move and solver_depth the
+    # forced-win solver's depth (None for its default, 0 turns it off).
+    AI_PROFILES = {
+        "easy": {
+            "label": "Dễ",
+            "engine": "alphabeta",
+            "depth": 1,
+            "time_budget_ms": 200,
+            "max_nodes": None,
+            "randomness": 0.4,
+            "solver_depth": 0,
+        },
+        "medium": {
+            "label": "Trung bình",
+            "engine": "alphabeta",
+            "depth": 3,
+            "time_budget_ms": 500,
+            "max_nodes": 5000,
+            "randomness": 0.1,
+            "solver_depth": 3,
+        },
+        "hard": {
+            "label": "Khó",
+            "engine": "alphabeta",
+            "depth": AI_MAX_DEPTH,
+            "time_budget_ms": AI_TIME_BUDGET_MS,
+            "max_nodes": None,
+            "randomness": 0.0,
+            "solver_depth": None,
+        },
+        "expert": {
+            "label": "Chuyên gia",
+            "engine": "parallel",
+            "depth": AI_MAX_DEPTH + 4,
+            "time_budget_ms": 2 * AI_TIME_BUDGET_MS,
+            "max_nodes": None,
+            "randomness": 0.0,
+            "solver_depth": None,
+        },
+    }
+    AI_DIFFICULTY = "hard"
+    
     # Debug mode
     DEBUG = True
     
@@ -37,3 +83,22 @@ class Config:
     def set_server_port(cls, port):
         """Set server port"""
         cls.SERVER_PORT = port
+    
+    @classmethod
+    def get_ai_profile(cls, name=None):
+        """
+        Get AI difficulty profile
+        
+        Args:
+            name: Profile name, the configured difficulty if None
+        
+        Returns:
+            Profile dict; the configured difficulty's if name is unknown
+        """
+        return cls.AI_PROFILES.get(name or cls.AI_DIFFICULTY, cls.AI_PROFILES[cls.AI_DIFFICULTY])
+    
+    @classmethod
+    def set_ai_difficulty(cls, name):
+        """Set default AI difficulty"""
+        if name in cls.AI_PROFILES:
+            cls.AI_DIFFICULTY = name
@@ -6,6 +6,15 @@ Constants used across the application
 DEFAULT_SERVER_HOST = "127.0.0.1"
 DEFAULT_SERVER_PORT = 7777
 BUFFER_SIZE = 4096
+MAX_FRAME_SIZE = 64 * 1024  # longest message accepted, in bytes
+CLIENT_IDLE_TIMEOUT = 600.0  # seconds without a request after which a client is dropped
+
+# Outbound queues, in bytes queued per client
+OUTBOUND_HIGH_WATERMARK = 64 * 1024  # stop reading the client's requests above this
+OUTBOUND_LOW_WATERMARK = 16 * 1024  # resume reading below this
+OUTBOUND_MAX_BYTES = 1024 * 1024  # disconnect slow clients above this
+OUTBOUND_CLOSE_TIMEOUT = 2.0  # seconds a closing connection gets to send what is queued
+OUTBOUND_STALL_TIMEOUT = 30.0  # seconds a client may stay congested before it is dropped
 ENCODING = "utf-8"
 
 # Game Settings
@@ -14,18 +23,42 @@ WIN_CONDITION = 5
 TURN_TIME_LIMIT = 30  # seconds
 CELL_SIZE = 40  # pixels
 
+# AI
+AI_MAX_DEPTH = 8
+AI_TIME_BUDGET_MS = TURN_TIME_LIMIT * 1000 // 30  # 1 s of the turn timer
+
+# Server bots
+BOT_WORKERS = 2  # processes computing bot moves, shared by all bot games
+MAX_BOT_GAMES = 20
+
 # Room Settings
 MIN_ROOM_ID = 100
 MAX_ROOMS = 100
 ROOM_PASSWORD_PLACEHOLDER = " "
+ROOM_PAGE_SIZE = 8  # rooms per room list page
+MAX_ROOM_PAGE_SIZE = 50
+ROOM_FILTER_ALL = "all"
+ROOM_FILTER_OPEN = "open"  # rooms without a password
+ROOM_FILTER_LOCKED = "locked"  # password-protected rooms
+
+# Matchmaking, in marks (see calculate_mark)
+MATCH_BASE_BAND = 50  # mark difference accepted at once
+MATCH_BAND_DOUBLING = 5  # seconds of waiting after which the band doubles
+MATCH_TICK = 0.5  # seconds between pairing passes
 
 # Thread Pool
 MIN_THREADS = 10
 MAX_THREADS = 100
 THREAD_TIMEOUT = 10  # seconds
 
+# Asyncio Server
+ASYNC_HANDLER_THREADS = 8  # threads running client commands, not one per socket
+ASYNC_BACKLOG = 4096
+
 # Database
 DATABASE_PATH = "database/caro_game.db"
+STATS_FLUSH_INTERVAL = 1.0  # seconds a game result may stay unwritten
+STATS_MAX_PENDING = 100  # users with unwritten results that force a write
 
 # Avatar
 AVATAR_COUNT = 6  # 0.jpg to 5.jpg
@@ -63,6 +96,7 @@ MSG_ROOM_NOT_FOUND = "Không tìm thấy phòng"
 MSG_ROOM_WRONG_PASSWORD = "Mật khẩu phòng sai"
 MSG_CONNECTION_ERROR = "Lỗi kết nối đến server"
 MSG_LEFT_ROOM = "Đối thủ đã rời khỏi phòng"
+MSG_BOT_UNAVAILABLE = "Máy chủ đang bận, chưa thể chơi với Bot"
 
 # Protocol Messages
 PROTOCOL_LOGIN = "login"
@@ -81,10 +115,18 @@ PROTOCOL_VIEW_FRIEND_LIST = "view-friend-list"
 PROTOCOL_RETURN_FRIEND_LIST = "return-friend-list"
 PROTOCOL_VIEW_ROOM_LIST = "view-room-list"
 PROTOCOL_ROOM_LIST = "room-list"
+PROTOCOL_VIEW_ROOM_PAGE = "view-room-page"
+PROTOCOL_ROOM_PAGE = "room-page"
+PROTOCOL_SUBSCRIBE_ROOM_LIST = "subscribe-room-list"
+PROTOCOL_UNSUBSCRIBE_ROOM_LIST = "unsubscribe-room-list"
+PROTOCOL_ROOM_ADDED = "room-added"
+PROTOCOL_ROOM_REMOVED = "room-removed"
 PROTOCOL_CREATE_ROOM = "create-room"
 PROTOCOL_CREATE_ROOM_PASSWORD = "create-room-password"
 PROTOCOL_YOUR_CREATED_ROOM = "your-created-room"
 PROTOCOL_QUICK_ROOM = "quick-room"
+PROTOCOL_PLAY_BOT = "play-bot"
+PROTOCOL_BOT_UNAVAILABLE = "bot-unavailable"
 PROTOCOL_GO_TO_ROOM = "go-to-room"
 PROTOCOL_JOIN_ROOM = "join-room"
 PROTOCOL_CANCEL_ROOM = "cancel-room"
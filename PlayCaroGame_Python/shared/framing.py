@@ -0,0 +1,94 @@
+"""
+Message framing - newline-delimited messages over a byte stream
+"""
+
+from shared.constants import ENCODING, MAX_FRAME_SIZE
+
+
+class FrameTooLargeError(ValueError):
+    """A peer sent a message longer than the decoder allows"""
+
+
+def encode_frame(message):
+    """
+    Encode a message for sending
+
+    Args:
+        message: Message string, without the newline
+
+    Returns:
+        Bytes of the message followed by a newline
+    """
+    return (message + '\n').encode(ENCODING)
+
+
+class FrameDecoder:
+    """
+    Incremental decoder splitting received bytes into messages
+
+    Bytes are buffered until a newline arrives, so messages may be split
+    across or packed into any number of recv() calls. Frames are split on
+    the raw bytes before decoding; a newline byte never occurs inside a
+    multi-byte UTF-8 character, so a character cut by a recv() boundary is
+    simply decoded with the rest of its frame.
+    """
+
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE, encoding=ENCODING):
+        """
+        Initialize decoder
+
+        Args:
+            max_frame_size: Longest allowed message in bytes
+            encoding: Text encoding of the messages
+        """
+        self.max_frame_size = max_frame_size
+        self.encoding = encoding
+        self.buffer = bytearray()
+        self.scanned = 0  # Bytes of the buffer known to hold no newline
+
+    def feed(self, data):
+        """
+        Add received bytes and take out the complete messages
+
+        Args:
+            data: Bytes from recv()
+
+        Returns:
+            List of complete messages, stripped; blank lines are skipped
+
+        Raises:
+            FrameTooLargeError: If a message exceeds max_frame_size
+        """
+        self.buffer += data
+        messages = []
+        start = 0
+        while True:
+            end = self.buffer.find(b'\n', max(start, self.scanned))
+            if end < 0:
+                break
+            if end - start > self.max_frame_size:
+                self.reset()
+                raise FrameTooLargeError(f"Message of {end - start} bytes exceeds {self.max_frame_size}")
+            message = self.buffer[start:end].decode(self.encoding, errors="replace").strip()
+            if message:
+                messages.append(message)
+            start = end + 1
+
+        # Drop the consumed frames at once rather than one at a time
+        if start:
+            del self.buffer[:start]
+        self.scanned = len(self.buffer)
+        if self.scanned > self.max_frame_size:
+            size = self.scanned
+            self.reset()
+            raise FrameTooLargeError(f"Unterminated message of {size} bytes exceeds {self.max_frame_size}")
+        return messages
+
+    def get_pending(self):
+        """Get the number of buffered bytes of an incomplete message"""
+        return len(self.buffer)
+
+    def reset(self):
+        """Discard any buffered bytes"""
+        self.buffer.clear()
+        self.scanned = 0
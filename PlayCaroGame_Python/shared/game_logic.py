@@ -4,7 +4,18 @@ Game Logic - Core game rules and AI
 
 from shared.constants import *
 from shared.point import Point
+from shared.bitboard import BitBoard, NEIGHBOR_MASKS, CELL_WINDOW_MASKS, SHIFTS, cell_coords, iter_bits
+from shared.game_state import GameState
+from shared.patterns import FOUR, OPEN_THREE, move_threats
+from shared.opening_book import get_opening_book
+from shared.position_cache import get_position_cache
 import random
+import time
+
+# Maximum attacker moves in a forced-win sequence
+VCF_MAX_DEPTH = 15
+VCT_MAX_DEPTH = 5
+
 
 class GameLogic:
     """Core game logic for Caro game"""
@@ -15,7 +26,7 @@ class GameLogic:
         Check if the move at (x, y) creates a winning condition
         
         Args:
-            board: 2D array representing the game board
+            board: 2D array, BitBoard or GameState representing the game board
             x: Row position
             y: Column position
             player: Player marker (1 for X, 2 for O)
@@ -23,6 +34,11 @@ class GameLogic:
         Returns:
             True if this move wins the game, False otherwise
         """
+        if isinstance(board, GameState):
+            board = board.board
+        if isinstance(board, BitBoard):
+            return board.check_win(x, y, player)
+        
         directions = [
             (0, 1),   # Horizontal
             (1, 0),   # Vertical
@@ -122,11 +138,14 @@ class GameLogic:
         Check if the board is full (draw condition)
         
         Args:
-            board: 2D array representing the game board
+            board: 2D array, BitBoard or GameState representing the game board
         
         Returns:
             True if board is full, False otherwise
         """
+        if isinstance(board, (BitBoard, GameState)):
+            return board.is_full()
+        
         for row in board:
             for cell in row:
                 if cell == 0:  # Empty cell
@@ -139,11 +158,14 @@ class GameLogic:
         Get all valid (empty) moves on the board
         
         Args:
-            board: 2D array representing the game board
+            board: 2D array, BitBoard or GameState representing the game board
         
         Returns:
             List of Point objects representing valid moves
         """
+        if isinstance(board, (BitBoard, GameState)):
+            return board.get_valid_moves()
+        
         valid_moves = []
         for x in range(BOARD_SIZE):
             for y in range(BOARD_SIZE):
@@ -161,19 +183,44 @@ class SimpleAI:
         Get the best move for AI using simple strategy
         
         Strategy:
+        0. Play from the opening book while in book
         1. Check if AI can win in next move
         2. Check if need to block human from winning
         3. Look for good offensive positions
         4. Random move near existing pieces
         
         Args:
-            board: 2D array representing the game board
+            board: 2D array, BitBoard or GameState representing the game board
             ai_player: AI's player marker (1 or 2)
             human_player: Human's player marker (1 or 2)
         
         Returns:
             Point object representing the best move
         """
+        if isinstance(board, GameState):
+            board = board.board
+        elif not isinstance(board, BitBoard):
+            board = BitBoard.from_grid(board)
+        
+        # 0. Opening book
+        book_move = get_opening_book().lookup(board, ai_player)
+        if book_move:
+            return book_move
+        
+        # Equivalent positions share one cached answer
+        cache = get_position_cache()
+        cached_move = cache.get_move(board, ai_player)
+        if cached_move and board.is_empty(cached_move.get_x(), cached_move.get_y()):
+            return cached_move
+        
+        move = SimpleAI._choose_move(board, ai_player, human_player)
+        if move:
+            cache.put_move(board, ai_player, move)
+        return move
+    
+    @staticmethod
+    def _choose_move(board, ai_player, human_player):
+        """Pick a move by the strategy in get_best_move()"""
         # 1. Check if AI can win
         winning_move = SimpleAI._find_winning_move(board, ai_player)
         if winning_move:
@@ -195,69 +242,232 @@ class SimpleAI:
             return nearby_move
         
         # 5. Random move (fallback)
-        valid_moves = GameLogic.get_valid_moves(board)
+        valid_moves = board.get_valid_moves()
         if valid_moves:
             return random.choice(valid_moves)
         
         return None
     
+    @staticmethod
+    def _first_cell(mask):
+        """Get Point of the lowest set bit (first cell in row-major order)"""
+        if not mask:
+            return None
+        return Point(*cell_coords((mask & -mask).bit_length() - 1))
+    
     @staticmethod
     def _find_winning_move(board, player):
         """Find a move that wins the game"""
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                if board[x][y] == 0:
-                    # Try this move
-                    board[x][y] = player
-                    if GameLogic.check_win(board, x, y, player):
-                        board[x][y] = 0  # Undo
-                        return Point(x, y)
-                    board[x][y] = 0  # Undo
-        return None
+        return SimpleAI._first_cell(board.winning_moves(player))
     
     @staticmethod
     def _find_offensive_move(board, player):
         """Find a move that creates a strong threat (3 in a row)"""
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                if board[x][y] == 0:
-                    # Try this move
-                    board[x][y] = player
-                    threat_count = SimpleAI._count_threats(board, x, y, player)
-                    board[x][y] = 0  # Undo
-                    
-                    if threat_count >= 3:  # Creates 3+ in a row
-                        return Point(x, y)
-        return None
-    
-    @staticmethod
-    def _count_threats(board, x, y, player):
-        """Count consecutive pieces for threat evaluation"""
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        max_count = 0
+        bits = board.bits[player]
+        empty = board.empty_mask()
+        threats = 0
         
-        for dx, dy in directions:
-            count = 1
-            count += GameLogic._count_consecutive(board, x, y, dx, dy, player)
-            count += GameLogic._count_consecutive(board, x, y, -dx, -dy, player)
-            max_count = max(max_count, count)
+        for shift in SHIFTS:
+            before = bits << shift
+            after = bits >> shift
+            # Stone pair on one side, or one stone on each side
+            threats |= before & (before << shift)
+            threats |= after & (after >> shift)
+            threats |= before & after
         
-        return max_count
+        return SimpleAI._first_cell(threats & empty)
     
     @staticmethod
     def _find_nearby_move(board):
         """Find a move near existing pieces"""
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                if board[x][y] != 0:
-                    # Check adjacent cells
-                    for dx in [-1, 0, 1]:
-                        for dy in [-1, 0, 1]:
-                            if dx == 0 and dy == 0:
-                                continue
-                            nx, ny = x + dx, y + dy
-                            if (0 <= nx < BOARD_SIZE and 
-                                0 <= ny < BOARD_SIZE and 
-                                board[nx][ny] == 0):
-                                return Point(nx, ny)
+        empty = board.empty_mask()
+        for index in iter_bits(board.occupied()):
+            # Neighbours of a stone, first in row-major order
+            nearby = NEIGHBOR_MASKS[index] & empty
+            if nearby:
+                return SimpleAI._first_cell(nearby)
+        return None
+
+
+class _SolverLimit(Exception):
+    """Raised inside the solver when its node or time limit is reached"""
+
+
+class ThreatSpaceSolver:
+    """
+    Solver for forced wins by continuous threats
+    
+    VCF (victory by continuous fours) only plays fours, so every defender
+    reply is forced. VCT (victory by continuous threats) also plays open
+    threes, and must then beat every defence: the cells that stop the
+    three and the defender's own fours. A win reported by the solver is
+    sound within those rules; a missed win only means none was found
+    within the limits.
+    """
+    
+    def __init__(self, max_nodes=20000, time_limit_ms=200, max_depth=VCF_MAX_DEPTH):
+        """
+        Initialize solver
+        
+        Args:
+            max_nodes: Node limit per solve
+            time_limit_ms: Time limit per solve in milliseconds
+            max_depth: Maximum number of attacker moves in a sequence
+        """
+        self.max_nodes = max_nodes
+        self.time_limit_ms = time_limit_ms
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.aborted = False
+        self._deadline = 0
+        self._failed = {}
+    
+    def find_win(self, board, player, time_limit_ms=None):
+        """
+        Look for a forced win, trying VCF first and then VCT
+        
+        Args:
+            board: 2D array, BitBoard or GameState representing the game board
+            player: Attacking player marker
+            time_limit_ms: Overrides the time limit of each solve
+        
+        Returns:
+            List of Point objects, attacker and defender moves alternating,
+            or None if no forced win was found
+        """
+        return (self.solve(board, player, False, time_limit_ms)
+                or self.solve(board, player, True, time_limit_ms))
+    
+    def solve(self, board, player, threes=False, time_limit_ms=None):
+        """
+        Search for a forced win with player to move
+        
+        Args:
+            board: 2D array, BitBoard or GameState representing the game board
+            player: Attacking player marker
+            threes: False for VCF, True for VCT
+            time_limit_ms: Overrides the solver's time limit
+        
+        Returns:
+            List of Point objects, attacker and defender moves alternating,
+            or None if no forced win was found
+        """
+        if isinstance(board, GameState):
+            state = board.copy()
+        else:
+            state = GameState.from_grid(board)
+        
+        self.nodes = 0
+        self.aborted = False
+        self._failed = {}
+        if time_limit_ms is None:
+            time_limit_ms = self.time_limit_ms
+        self._deadline = time.perf_counter() + time_limit_ms / 1000
+        max_depth = self.max_depth if not threes else min(self.max_depth, VCT_MAX_DEPTH)
+        
+        # Deepen one attacker move at a time, so the shortest win is found first
+        line = None
+        try:
+            for depth in range(1, max_depth + 1):
+                line = self._attack(state, player, depth, threes)
+                if line is not None:
+                    break
+        except _SolverLimit:
+            self.aborted = True
+            return None
+        if line is None:
+            return None
+        return [Point(*cell_coords(index)) for index in line]
+    
+    def get_stats(self):
+        """Get statistics of the last solve"""
+        return {"nodes": self.nodes, "aborted": self.aborted}
+    
+    def _count_node(self):
+        """Count a node and stop the search when a limit is reached"""
+        self.nodes += 1
+        if self.nodes >= self.max_nodes:
+            raise _SolverLimit()
+        if not self.nodes & 63 and time.perf_counter() >= self._deadline:
+            raise _SolverLimit()
+    
+    def _attack(self, state, attacker, depth, threes):
+        """
+        Attacker to move
+        
+        Returns:
+            List of bit indices of the winning line, or None
+        """
+        self._count_node()
+        board = state.board
+        wins = board.winning_moves(attacker)
+        if wins:
+            return [(wins & -wins).bit_length() - 1]
+        
+        defender = 3 - attacker
+        threats = board.winning_moves(defender)
+        if threats & (threats - 1) or depth <= 0:
+            return None
+        if self._failed.get(state.hash, -1) >= depth:
+            return None
+        
+        # A defender four must be blocked, and only a threat keeps the initiative
+        moves = []
+        for index in ([(threats & -threats).bit_length() - 1] if threats else state.candidates):
+            shape = min(move_threats(state, index, attacker))
+            if shape <= FOUR or (threes and shape == OPEN_THREE):
+                moves.append((shape, index))
+        moves.sort()
+        
+        for shape, index in moves:
+            state.play_index(index, attacker)
+            line = self._defend(state, attacker, depth - 1, threes)
+            state.undo()
+            if line is not None:
+                return [index] + line
+        
+        self._failed[state.hash] = depth
         return None
+    
+    def _defend(self, state, attacker, depth, threes):
+        """
+        Defender to move, after an attacker threat
+        
+        Returns:
+            List of bit indices of the winning line, or None if any
+            defence holds
+        """
+        self._count_node()
+        board = state.board
+        defender = 3 - attacker
+        if board.winning_moves(defender):
+            return None
+        
+        fours = board.winning_moves(attacker)
+        if fours & (fours - 1):
+            # Two ways to make five cannot both be blocked
+            return []
+        if fours:
+            replies = [(fours & -fours).bit_length() - 1]
+        else:
+            # Stop the new three where it would become a four, or counter with a four
+            last = state.history[-1][0]
+            replies = set()
+            for d, window in enumerate(CELL_WINDOW_MASKS[last]):
+                for index in iter_bits(window & board.empty_mask()):
+                    if move_threats(state, index, attacker)[d] <= FOUR:
+                        replies.add(index)
+            for index in state.candidates:
+                if index not in replies and min(move_threats(state, index, defender)) <= FOUR:
+                    replies.add(index)
+        
+        main_line = None
+        for index in replies:
+            state.play_index(index, defender)
+            line = self._attack(state, attacker, depth, threes)
+            state.undo()
+            if line is None:
+                return None
+            if main_line is None:
+                main_line = [index] + line
+        return main_line
@@ -0,0 +1,312 @@
+"""
+Game state - incremental board state with constant-time win and draw checks
+"""
+
+from shared.constants import BOARD_SIZE, WIN_CONDITION
+from shared.point import Point
+from shared.bitboard import (BitBoard, STRIDE, DIRECTIONS, SHIFTS, ZOBRIST_KEYS, NEAR_MASKS,
+                             cell_index, cell_coords, iter_bits)
+
+CELL_COUNT = BOARD_SIZE * BOARD_SIZE
+
+# Cell arrays are padded on both sides so that reading one step past any
+# edge (including the padding column) lands on an always-empty slot.
+_PAD = STRIDE + 1
+_ARRAY_SIZE = BOARD_SIZE * STRIDE + 2 * _PAD
+
+# Line codes store every board line as 2 bits per cell (0 empty, 1 X, 2 O,
+# 3 off-board). Lines are padded with LINE_PADDING off-board cells at both
+# ends, so a window around any cell can be cut out without bounds checks.
+LINE_PADDING = WIN_CONDITION - 1
+EDGE = 3
+
+
+def _build_lines():
+    """
+    Build line geometry
+
+    Returns:
+        (cell_lines, initial_codes) where cell_lines[index][d] is the
+        (line id, bit offset) of the cell in direction d
+    """
+    cell_lines = [None] * (BOARD_SIZE * STRIDE)
+    per_cell = {}
+    initial_codes = []
+
+    for d, (dx, dy) in enumerate(DIRECTIONS):
+        for x in range(BOARD_SIZE):
+            for y in range(BOARD_SIZE):
+                px, py = x - dx, y - dy
+                if 0 <= px < BOARD_SIZE and 0 <= py < BOARD_SIZE:
+                    continue
+
+                cells = []
+                nx, ny = x, y
+                while 0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE:
+                    cells.append(cell_index(nx, ny))
+                    nx += dx
+                    ny += dy
+
+                line_id = len(initial_codes)
+                code = 0
+                for k in range(LINE_PADDING):
+                    code |= EDGE << (2 * k)
+                    code |= EDGE << (2 * (len(cells) + LINE_PADDING + k))
+                initial_codes.append(code)
+
+                for pos, index in enumerate(cells):
+                    per_cell.setdefault(index, [None] * 4)[d] = (line_id, 2 * (pos + LINE_PADDING))
+
+    for index, lines in per_cell.items():
+        cell_lines[index] = tuple(lines)
+    return cell_lines, initial_codes
+
+
+CELL_LINES, INITIAL_LINE_CODES = _build_lines()
+
+# Cells within two steps of each cell; an empty cell that is this close to
+# a stone is a candidate move
+NEAR_CELLS = [list(iter_bits(mask)) for mask in NEAR_MASKS]
+
+
+class GameState:
+    """
+    Board state that is updated move by move
+
+    Tracks the move count, the set of empty cells and, for every stone,
+    the length of the run it belongs to in each direction. Run lengths are
+    only kept up to date at the two ends of each run, which is all that is
+    needed to extend a run when a stone is placed next to it. The code of
+    every line and the Zobrist hash of the position are kept as well, for
+    pattern evaluation and transposition lookups, along with the set of
+    candidate moves: empty cells within two steps of a stone, found from a
+    per-cell count of nearby stones. Moves can be undone in
+    LIFO order, so search code can play and take back moves on a single
+    instance.
+    """
+
+    def __init__(self):
+        self.board = BitBoard()
+        self.cells = [0] * _ARRAY_SIZE
+        self.runs = [[0] * _ARRAY_SIZE for _ in SHIFTS]
+        self.line_codes = INITIAL_LINE_CODES[:]
+        self.empty_cells = {cell_index(x, y) for x in range(BOARD_SIZE) for y in range(BOARD_SIZE)}
+        self.near_counts = [0] * (BOARD_SIZE * STRIDE)
+        self.candidates = set()
+        self.move_count = 0
+        self.winner = 0
+        self.hash = 0
+        self.history = []
+
+    @classmethod
+    def from_grid(cls, board):
+        """
+        Create game state from a 2D array or BitBoard
+
+        Args:
+            board: 2D array or BitBoard representing the game board
+
+        Returns:
+            GameState with the same stones
+        """
+        if isinstance(board, BitBoard):
+            board = board.to_grid()
+        state = cls()
+        for x in range(BOARD_SIZE):
+            for y in range(BOARD_SIZE):
+                if board[x][y]:
+                    state.play(x, y, board[x][y])
+        return state
+
+    def copy(self):
+        """Get independent copy of this state"""
+        state = GameState.__new__(GameState)
+        state.board = self.board.copy()
+        state.cells = self.cells[:]
+        state.runs = [run[:] for run in self.runs]
+        state.line_codes = self.line_codes[:]
+        state.empty_cells = set(self.empty_cells)
+        state.near_counts = self.near_counts[:]
+        state.candidates = set(self.candidates)
+        state.move_count = self.move_count
+        state.winner = self.winner
+        state.hash = self.hash
+        state.history = self.history[:]
+        return state
+
+    def reset(self):
+        """Clear the board"""
+        self.__init__()
+
+    def play(self, x, y, player):
+        """
+        Place player's stone on (x, y)
+
+        Args:
+            x, y: Position
+            player: Player marker (1 or 2)
+
+        Returns:
+            True if this move makes a winning line, False otherwise
+        """
+        return self.play_index(cell_index(x, y), player)
+
+    def play_index(self, index, player):
+        """Place player's stone on bit index; see play()"""
+        c = index + _PAD
+        cells = self.cells
+        if cells[c]:
+            raise ValueError(f"Cell {cell_coords(index)} is already occupied")
+
+        cells[c] = player
+        self.board.bits[player] |= 1 << index
+        self.empty_cells.discard(index)
+        self.hash ^= ZOBRIST_KEYS[player][index]
+
+        near_counts = self.near_counts
+        candidates = self.candidates
+        candidates.discard(index)
+        for near in NEAR_CELLS[index]:
+            near_counts[near] += 1
+            if not cells[near + _PAD]:
+                candidates.add(near)
+
+        lines = CELL_LINES[index]
+        codes = self.line_codes
+        arms = []
+        won = False
+        for d, shift in enumerate(SHIFTS):
+            line_id, bit = lines[d]
+            codes[line_id] += player << bit
+            run = self.runs[d]
+            left = run[c - shift] if cells[c - shift] == player else 0
+            right = run[c + shift] if cells[c + shift] == player else 0
+            total = left + right + 1
+            run[c - left * shift] = total
+            run[c + right * shift] = total
+            run[c] = total
+            arms.append((left, right))
+            if total >= WIN_CONDITION:
+                won = True
+
+        self.history.append((index, player, arms, self.winner))
+        self.move_count += 1
+        if won and not self.winner:
+            self.winner = player
+        return won
+
+    def undo(self):
+        """
+        Take back the last move
+
+        Returns:
+            (x, y, player) of the removed move
+        """
+        index, player, arms, previous_winner = self.history.pop()
+        c = index + _PAD
+        lines = CELL_LINES[index]
+        codes = self.line_codes
+
+        for d, shift in enumerate(SHIFTS):
+            line_id, bit = lines[d]
+            codes[line_id] -= player << bit
+            run = self.runs[d]
+            left, right = arms[d]
+            run[c] = 0
+            if left:
+                run[c - left * shift] = left
+            if right:
+                run[c + right * shift] = right
+
+        self.cells[c] = 0
+        self.board.bits[player] &= ~(1 << index)
+        self.empty_cells.add(index)
+        self.hash ^= ZOBRIST_KEYS[player][index]
+
+        near_counts = self.near_counts
+        candidates = self.candidates
+        for near in NEAR_CELLS[index]:
+            near_counts[near] -= 1
+            if not near_counts[near]:
+                candidates.discard(near)
+        if near_counts[index]:
+            candidates.add(index)
+        self.move_count -= 1
+        self.winner = previous_winner
+
+        x, y = cell_coords(index)
+        return x, y, player
+
+    def get(self, x, y):
+        """Get player marker at (x, y), 0 if empty"""
+        return self.cells[cell_index(x, y) + _PAD]
+
+    def is_empty(self, x, y):
+        """Check if cell (x, y) is empty"""
+        return self.cells[cell_index(x, y) + _PAD] == 0
+
+    def run_through(self, x, y, player, direction):
+        """
+        Get length of the run player would make by playing empty cell (x, y)
+
+        Args:
+            x, y: Empty cell position
+            player: Player marker
+            direction: Index into bitboard DIRECTIONS
+
+        Returns:
+            Number of consecutive stones including (x, y)
+        """
+        c = cell_index(x, y) + _PAD
+        shift = SHIFTS[direction]
+        run = self.runs[direction]
+        left = run[c - shift] if self.cells[c - shift] == player else 0
+        right = run[c + shift] if self.cells[c + shift] == player else 0
+        return left + right + 1
+
+    def get_hash(self):
+        """Get Zobrist hash of the position"""
+        return self.hash
+
+    def get_winner(self):
+        """Get winning player marker, 0 if nobody has won"""
+        return self.winner
+
+    def get_move_count(self):
+        return self.move_count
+
+    def get_last_move(self):
+        """Get Point of the last move, or None"""
+        if not self.history:
+            return None
+        return Point(*cell_coords(self.history[-1][0]))
+
+    def is_full(self):
+        """Check if the board is full"""
+        return self.move_count == CELL_COUNT
+
+    def is_draw(self):
+        """Check if the game ended in a draw"""
+        return self.move_count == CELL_COUNT and not self.winner
+
+    def is_over(self):
+        """Check if the game has ended"""
+        return bool(self.winner) or self.move_count == CELL_COUNT
+
+    def get_valid_moves(self):
+        """Get list of Point objects for every empty cell"""
+        return [Point(*cell_coords(index)) for index in sorted(self.empty_cells)]
+
+    def get_candidate_moves(self):
+        """Get list of Point objects for every empty cell near a stone"""
+        return [Point(*cell_coords(index)) for index in sorted(self.candidates)]
+
+    def to_grid(self):
+        """Convert to 2D array board"""
+        return self.board.to_grid()
+
+    def __str__(self):
+        return f"GameState(moves={self.move_count}, winner={self.winner})"
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,415 @@
+"""
+MCTS Engine - Monte Carlo tree search with pattern-guided rollouts
+"""
+
+import math
+import os
+import random
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from shared.constants import BOARD_SIZE
+from shared.point import Point
+from shared.bitboard import cell_coords, iter_bits
+from shared.game_state import GameState
+from shared.patterns import move_threats
+from shared.ai_engine import THREAT_WEIGHTS, evaluate, generate_moves
+from shared.opening_book import get_opening_book
+
+# Children considered per tree node, best-ordered first
+MAX_CHILDREN = 15
+# Candidates sampled per rollout move; the most threatening one is played
+ROLLOUT_SAMPLE = 6
+# Rollout moves before the position is scored statically
+ROLLOUT_DEPTH = 30
+# Static score at which a cut-off rollout counts as about 73% won
+ROLLOUT_SCORE_SCALE = 5000
+EXPLORATION = 1.4
+# Seconds between checks of the stop event while waiting for workers
+STOP_POLL_INTERVAL = 0.05
+
+# Per-process worker state, set up by _init_worker
+_worker_stop = None
+
+
+class _SharedStop:
+    """Stop event of a worker's search, set by the parent through a shared value"""
+
+    def is_set(self):
+        return _worker_stop.value != 0
+
+
+def _init_worker(stop):
+    """
+    Set up a worker process
+
+    Args:
+        stop: Shared multiprocessing.Value, non-zero to end running batches
+    """
+    global _worker_stop
+    _worker_stop = stop
+
+
+class MCTSNode:
+    """Node of the search tree, reached by `player` playing `move`"""
+
+    __slots__ = ("move", "player", "parent", "children", "untried", "visits", "wins", "winner")
+
+    def __init__(self, move, player, parent=None):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        # Sum of results from the point of view of self.player
+        self.wins = 0.0
+        # Player who has won in this node, 0 if the game goes on
+        self.winner = 0
+
+    def select_child(self, exploration):
+        """Get the child with the highest UCT value"""
+        log_visits = math.log(self.visits)
+        best, best_value = None, -1.0
+        for child in self.children:
+            value = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def get_win_rate(self):
+        return self.wins / self.visits if self.visits else 0.0
+
+
+def _rollout(state, player, rng, max_moves=ROLLOUT_DEPTH):
+    """
+    Play a game out with a cheap threat-aware policy
+
+    Winning moves are always taken and the opponent's wins blocked. Other
+    moves are the most threatening of a few sampled candidates. The moves
+    are taken back afterwards.
+
+    Args:
+        state: GameState, changed during the rollout and restored after
+        player: Player to move
+        rng: random.Random
+        max_moves: Moves played before the position is scored statically
+
+    Returns:
+        Result for X: 1.0 win, 0.0 loss, in between for a draw or a
+        statically scored position
+    """
+    played = 0
+    result = None
+    while played < max_moves:
+        if state.is_full():
+            result = 0.5
+            break
+        board = state.board
+        if board.winning_moves(player):
+            result = 1.0 if player == 1 else 0.0
+            break
+
+        blocks = board.winning_moves(3 - player)
+        if blocks:
+            index = rng.choice(list(iter_bits(blocks)))
+        else:
+            candidates = list(state.candidates)
+            if len(candidates) > ROLLOUT_SAMPLE:
+                candidates = rng.sample(candidates, ROLLOUT_SAMPLE)
+            index = max(candidates, key=lambda index: (
+                sum(THREAT_WEIGHTS[shape] for shape in move_threats(state, index, player))
+                + sum(THREAT_WEIGHTS[shape] for shape in move_threats(state, index, 3 - player))
+                + rng.random()))
+        state.play_index(index, player)
+        played += 1
+        player = 3 - player
+
+    if result is None:
+        score = max(-50.0, min(50.0, evaluate(state, player) / ROLLOUT_SCORE_SCALE))
+        value = 1 / (1 + math.exp(-score))
+        result = value if player == 1 else 1 - value
+
+    for _ in range(played):
+        state.undo()
+    return result
+
+
+class MCTSAI:
+    """
+    UCT search AI
+
+    An anytime engine: it runs playouts until the playout count or the
+    time budget is used up, and plays the most visited root move. With
+    more than one worker, each worker process grows its own tree from the
+    same position and the root statistics are added together.
+
+    A search running in another thread can be cut short by setting
+    stop_event, a threading.Event.
+    """
+
+    def __init__(self, playouts=2000, time_budget_ms=None, exploration=EXPLORATION, workers=1, seed=None,
+                 use_book=True):
+        """
+        Initialize engine
+
+        Args:
+            playouts: Maximum number of playouts per move
+            time_budget_ms: Thinking time per move in milliseconds, or None
+            exploration: UCT exploration constant
+            workers: Number of processes to run playouts in
+            seed: Random seed, for repeatable games
+            use_book: Play from the opening book while in book
+        """
+        self.playouts = playouts
+        self.time_budget_ms = time_budget_ms
+        self.exploration = exploration
+        self.workers = workers or os.cpu_count() or 1
+        self.rng = random.Random(seed)
+        self.book = get_opening_book() if use_book else None
+        self.root = None
+        self.stats = {}
+        self.stop_event = None
+        self._pool = None
+        self._stop = None
+
+    def get_best_move(self, board, ai_player, human_player):
+        """
+        Get the best move for AI
+
+        Args:
+            board: 2D array, BitBoard or GameState representing the game board
+            ai_player: AI's player marker (1 or 2)
+            human_player: Human's player marker (1 or 2)
+
+        Returns:
+            Point object representing the best move, or None if board is full
+        """
+        if isinstance(board, GameState):
+            state = board.copy()
+        else:
+            state = GameState.from_grid(board)
+
+        self.root = None
+        self.stats = {}
+        if state.is_full():
+            return None
+        if state.move_count == 0:
+            center = BOARD_SIZE // 2
+            return Point(center, center)
+
+        book_move = self.book.lookup(state, ai_player, self.rng) if self.book is not None else None
+        if book_move is not None:
+            return book_move
+
+        # A win, or the only way to stop one, needs no playouts
+        moves = generate_moves(state, ai_player)
+        if len(moves) == 1:
+            return Point(*cell_coords(moves[0]))
+
+        if self.workers > 1:
+            visits = self._search_parallel(state, ai_player)
+        else:
+            self.search(state, ai_player)
+            visits = {child.move: child.visits for child in self.root.children}
+        if not visits:
+            # Stopped before the first playout
+            return Point(*cell_coords(moves[0]))
+        best = max(visits, key=lambda index: visits[index])
+        return Point(*cell_coords(best))
+
+    def search(self, state, player, playouts=None, time_budget_ms=None):
+        """
+        Grow a new tree from a position
+
+        Args:
+            state: GameState (restored before returning)
+            player: Player to move
+            playouts: Overrides the engine's playout count
+            time_budget_ms: Overrides the engine's time budget
+
+        Returns:
+            Root MCTSNode
+        """
+        if playouts is None:
+            playouts = self.playouts
+        if time_budget_ms is None:
+            time_budget_ms = self.time_budget_ms
+        start = time.perf_counter()
+        deadline = start + time_budget_ms / 1000 if time_budget_ms is not None else None
+
+        root = MCTSNode(None, 3 - player)
+        nodes = 1
+        max_depth = 0
+        done = 0
+        while done < playouts:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if self.stop_event is not None and self.stop_event.is_set():
+                break
+
+            # Selection
+            node = root
+            to_move = player
+            depth = 0
+            while not node.winner and not node.untried and node.children:
+                node = node.select_child(self.exploration)
+                state.play_index(node.move, node.player)
+                to_move = 3 - node.player
+                depth += 1
+
+            # Expansion
+            if not node.winner and not state.is_full():
+                if node.untried is None:
+                    node.untried = generate_moves(state, to_move, limit=MAX_CHILDREN)
+                    node.untried.reverse()
+                if node.untried:
+                    child = MCTSNode(node.untried.pop(), to_move, node)
+                    node.children.append(child)
+                    nodes += 1
+                    if state.play_index(child.move, to_move):
+                        child.winner = to_move
+                    node = child
+                    to_move = 3 - to_move
+                    depth += 1
+            max_depth = max(max_depth, depth)
+
+            # Simulation
+            if node.winner:
+                result = 1.0 if node.winner == 1 else 0.0
+            elif state.is_full():
+                result = 0.5
+            else:
+                result = _rollout(state, to_move, self.rng)
+
+            # Backpropagation
+            while node is not None:
+                node.visits += 1
+                node.wins += result if node.player == 1 else 1 - result
+                node = node.parent
+            for _ in range(depth):
+                state.undo()
+            done += 1
+
+        elapsed = time.perf_counter() - start
+        self.root = root
+        self.stats = {
+            "playouts": done,
+            "nodes": nodes,
+            "max_depth": max_depth,
+            "elapsed": elapsed,
+            "playouts_per_second": int(done / elapsed) if elapsed > 0 else 0,
+        }
+        return root
+
+    def get_stats(self):
+        """
+        Get statistics of the last search
+
+        Returns:
+            Dict with playouts, tree nodes, maximum tree depth, elapsed
+            seconds, playouts per second and the most visited root moves
+            as (Point, visits, win rate)
+        """
+        stats = dict(self.stats)
+        if self.root is not None:
+            children = sorted(self.root.children, key=lambda child: -child.visits)[:5]
+            stats["top_moves"] = [(Point(*cell_coords(child.move)), child.visits, round(child.get_win_rate(), 3))
+                                  for child in children]
+        return stats
+
+    def _get_pool(self):
+        """Start the worker pool on first use"""
+        if self._pool is None:
+            context = multiprocessing.get_context("spawn")
+            self._stop = context.Value("b", 0, lock=False)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                             initializer=_init_worker, initargs=(self._stop,))
+        return self._pool
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._stop = None
+
+    def _search_parallel(self, state, player):
+        """
+        Run a share of the playouts in each worker and merge the root visits
+
+        Setting stop_event ends every worker's batch after its current
+        playout, and the playouts made so far are still merged.
+
+        Returns:
+            Dict of root move bit index -> visits
+        """
+        moves = [(index, mover) for index, mover, _, _ in state.history]
+        share = max(1, self.playouts // self.workers)
+        pool = self._get_pool()
+        self._stop.value = 0
+        futures = [pool.submit(run_playout_batch, moves, player, share, self.time_budget_ms,
+                               self.exploration, self.rng.getrandbits(32))
+                   for _ in range(self.workers)]
+
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=STOP_POLL_INTERVAL)
+            if self.stop_event is not None and self.stop_event.is_set():
+                self._stop.value = 1
+
+        visits, wins = {}, {}
+        totals = {"playouts": 0, "nodes": 0, "max_depth": 0, "elapsed": 0.0}
+        for future in futures:
+            batch = future.result()
+            for index, (count, won) in batch["moves"].items():
+                visits[index] = visits.get(index, 0) + count
+                wins[index] = wins.get(index, 0.0) + won
+            totals["playouts"] += batch["playouts"]
+            totals["nodes"] += batch["nodes"]
+            totals["max_depth"] = max(totals["max_depth"], batch["max_depth"])
+            totals["elapsed"] = max(totals["elapsed"], batch["elapsed"])
+
+        elapsed = totals["elapsed"]
+        totals["playouts_per_second"] = int(totals["playouts"] / elapsed) if elapsed > 0 else 0
+        totals["top_moves"] = [(Point(*cell_coords(index)), visits[index], round(wins[index] / visits[index], 3))
+                               for index in sorted(visits, key=lambda index: -visits[index])[:5]]
+        self.root = None
+        self.stats = totals
+        return visits
+
+    def get_stats_string(self):
+        """Get one-line summary of the last search"""
+        stats = self.get_stats()
+        return (f"{stats.get('playouts', 0)} playouts, {stats.get('nodes', 0)} nodes, "
+                f"depth {stats.get('max_depth', 0)}, {stats.get('playouts_per_second', 0)} playouts/s")
+
+
+def run_playout_batch(moves, player, playouts, time_budget_ms, exploration=EXPLORATION, seed=None):
+    """
+    Grow a tree in this process and return its root statistics
+
+    Used to spread playouts over worker processes.
+
+    Args:
+        moves: (bit index, player) of every move played so far
+        player: Player to move
+        playouts: Maximum number of playouts
+        time_budget_ms: Time limit in milliseconds, or None
+        exploration: UCT exploration constant
+        seed: Random seed
+
+    Returns:
+        Dict with "moves" (root move -> (visits, wins)) and the search stats
+    """
+    state = GameState()
+    for index, mover in moves:
+        state.play_index(index, mover)
+
+    engine = MCTSAI(playouts, time_budget_ms, exploration, workers=1, seed=seed, use_book=False)
+    if _worker_stop is not None:
+        engine.stop_event = _SharedStop()
+    root = engine.search(state, player)
+    batch = dict(engine.stats)
+    batch["moves"] = {child.move: (child.visits, child.wins) for child in root.children}
+    return batch
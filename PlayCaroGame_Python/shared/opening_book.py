@@ -0,0 +1,310 @@
+"""
+Opening book - standard opening moves read from a memory-mapped file
+"""
+
+import mmap
+import os
+import random
+import struct
+from shared.constants import BOARD_SIZE
+from shared.point import Point
+from shared.bitboard import BitBoard, cell_index, cell_coords
+from shared.game_state import GameState
+from shared.symmetry import INVERSE, canonical_hash, transform_index
+from shared.utils import get_project_root, create_dirs_if_not_exists, log
+
+BOOK_PATH = os.path.join(get_project_root(), "assets", "book", "opening_book.bin")
+
+# File layout: header, then entries sorted by key. Each entry holds a
+# canonical position key, a move in canonical orientation and a weight.
+MAGIC = b"CAROBOOK"
+HEADER = struct.Struct("<8sI")
+ENTRY = struct.Struct("<QHH")
+
+# Positions deeper than this are not looked up
+MAX_BOOK_MOVES = 12
+
+
+def _book_key(board, player=None):
+    """
+    Get the key of a position for the player to move
+
+    Stones are hashed by side rather than colour, so the book works for
+    either colour.
+
+    Args:
+        board: BitBoard
+        player: Player to move; if None, the one with fewer stones (X on
+            a tie)
+
+    Returns:
+        (key, symmetry) from canonical_hash()
+    """
+    if player is None:
+        x_count = bin(board.bits[1]).count("1")
+        o_count = bin(board.bits[2]).count("1")
+        player = 1 if x_count <= o_count else 2
+    return canonical_hash(board, player)
+
+
+class OpeningBook:
+    """
+    Read-only opening book
+
+    The file is mapped into memory rather than read, so opening it is
+    instant and every process using the book shares the same pages.
+    Lookups are a binary search over the sorted entries.
+    """
+
+    def __init__(self, path=BOOK_PATH):
+        """
+        Open book file
+
+        Args:
+            path: Path of the book file; a missing file gives an empty book
+        """
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._data = None
+        self.hits = 0
+        self.lookups = 0
+
+        if not os.path.exists(path):
+            log(f"Opening book not found: {path}", "WARNING")
+            return
+        self._file = open(path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count = HEADER.unpack_from(self._data, 0)
+            if magic != MAGIC or HEADER.size + count * ENTRY.size > len(self._data):
+                raise ValueError("bad book header")
+            self.count = count
+        except (OSError, ValueError, struct.error) as e:
+            log(f"Could not load opening book {path}: {e}", "ERROR")
+            self.close()
+
+    def close(self):
+        """Release the mapped file"""
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.count = 0
+
+    def _entry(self, position):
+        """Read entry number position"""
+        return ENTRY.unpack_from(self._data, HEADER.size + position * ENTRY.size)
+
+    def _find(self, key):
+        """Get (move, weight) of every entry with key, in canonical orientation"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        moves = []
+        while low < self.count:
+            entry_key, move, weight = self._entry(low)
+            if entry_key != key:
+                break
+            moves.append((move, weight))
+            low += 1
+        return moves
+
+    def get_moves(self, board, player=None):
+        """
+        Get book moves for a position
+
+        Args:
+            board: 2D array, BitBoard or GameState representing the game board
+            player: Player to move, inferred from the stone counts if None
+
+        Returns:
+            List of (Point, weight), best first; empty if out of book
+        """
+        if isinstance(board, GameState):
+            board = board.board
+        elif not isinstance(board, BitBoard):
+            board = BitBoard.from_grid(board)
+
+        if not self.count or board.stone_count() > MAX_BOOK_MOVES:
+            return []
+
+        self.lookups += 1
+        key, symmetry = _book_key(board, player)
+        back = INVERSE[symmetry]
+        moves = []
+        for move, weight in self._find(key):
+            x, y = cell_coords(transform_index(move, back))
+            # Guard against hash collisions
+            if board.is_empty(x, y):
+                moves.append((Point(x, y), weight))
+        if moves:
+            self.hits += 1
+        moves.sort(key=lambda item: -item[1])
+        return moves
+
+    def lookup(self, board, player=None, rng=random):
+        """
+        Pick a book move, at random in proportion to the weights
+
+        Args:
+            board: 2D array, BitBoard or GameState representing the game board
+            player: Player to move, inferred from the stone counts if None
+            rng: Random number source
+
+        Returns:
+            Point object, or None if the position is not in the book
+        """
+        moves = self.get_moves(board, player)
+        if not moves:
+            return None
+        total = sum(weight for _, weight in moves)
+        pick = rng.uniform(0, total)
+        for move, weight in moves:
+            pick -= weight
+            if pick <= 0:
+                return move
+        return moves[0][0]
+
+    def __len__(self):
+        return self.count
+
+
+class OpeningBookBuilder:
+    """Collects opening lines and writes them as a book file"""
+
+    def __init__(self):
+        # key -> {canonical move: weight}
+        self.entries = {}
+
+    def add_move(self, board, x, y, player, weight=1):
+        """
+        Add a book move for a position
+
+        Args:
+            board: BitBoard before the move
+            x, y: Move
+            player: Player making the move
+            weight: Relative weight of the move
+        """
+        key, symmetry = _book_key(board, player)
+        move = transform_index(cell_index(x, y), symmetry)
+        moves = self.entries.setdefault(key, {})
+        moves[move] = min(0xFFFF, moves.get(move, 0) + weight)
+
+    def add_line(self, moves, weight=1):
+        """
+        Add every move of an opening line
+
+        Args:
+            moves: List of (x, y), starting from the empty board
+            weight: Relative weight of each move
+        """
+        board = BitBoard()
+        for count, (x, y) in enumerate(moves):
+            player = 1 if count % 2 == 0 else 2
+            self.add_move(board, x, y, player, weight)
+            board.place(x, y, player)
+
+    def write(self, path=BOOK_PATH):
+        """
+        Write the book file
+
+        Returns:
+            Number of entries written
+        """
+        rows = sorted((key, move, weight) for key, moves in self.entries.items() for move, weight in moves.items())
+        create_dirs_if_not_exists(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(rows)))
+            for row in rows:
+                f.write(ENTRY.pack(*row))
+        return len(rows)
+
+
+def standard_openings():
+    """
+    Get the 26 standard three-stone openings
+
+    X starts in the centre and O answers next to it, straight (direct
+    openings) or diagonally (indirect openings). X's second stone can go
+    anywhere in the central 5x5 square; up to symmetry that gives 13
+    openings of each kind.
+
+    Returns:
+        List of move lists
+    """
+    center = BOARD_SIZE // 2
+    openings = []
+    seen = set()
+    for second in ((center - 1, center), (center - 1, center + 1)):
+        for x in range(center - 2, center + 3):
+            for y in range(center - 2, center + 3):
+                line = [(center, center), second, (x, y)]
+                if (x, y) in line[:2]:
+                    continue
+                board = BitBoard()
+                for count, (mx, my) in enumerate(line):
+                    board.place(mx, my, 1 if count % 2 == 0 else 2)
+                key = canonical_hash(board)[0]
+                if key not in seen:
+                    seen.add(key)
+                    openings.append(line)
+    return openings
+
+
+def build_book(path=BOOK_PATH, plies=4, time_budget_ms=500):
+    """
+    Build the default book
+
+    Every standard opening is extended by the alpha-beta engine playing
+    both sides for a few more moves.
+
+    Args:
+        path: Output file
+        plies: Engine moves added after each opening
+        time_budget_ms: Engine thinking time per move
+
+    Returns:
+        Number of entries written
+    """
+    from shared.ai_engine import AlphaBetaAI
+
+    builder = OpeningBookBuilder()
+    engine = AlphaBetaAI(depth=8, time_budget_ms=time_budget_ms, use_book=False)
+    for number, opening in enumerate(standard_openings(), 1):
+        engine.new_game()
+        line = list(opening)
+        state = GameState()
+        for count, (x, y) in enumerate(line):
+            state.play(x, y, 1 if count % 2 == 0 else 2)
+        for _ in range(plies):
+            player = 1 if len(line) % 2 == 0 else 2
+            move = engine.get_best_move(state, player, 3 - player)
+            if move is None or state.play(move.get_x(), move.get_y(), player):
+                break
+            line.append((move.get_x(), move.get_y()))
+        builder.add_line(line)
+        log(f"Opening {number}: {line}")
+    return builder.write(path)
+
+
+_opening_book = None
+
+
+def get_opening_book():
+    """Get the shared opening book, opening it on first use"""
+    global _opening_book
+    if _opening_book is None:
+        _opening_book = OpeningBook()
+    return _opening_book
+
+
+if __name__ == "__main__":
+    print(f"Wrote {build_book()} entries to {BOOK_PATH}")
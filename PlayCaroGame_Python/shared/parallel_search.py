@@ -0,0 +1,263 @@
+"""
+Parallel search - root-splitting alpha-beta across worker processes
+"""
+
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from shared.point import Point
+from shared.bitboard import cell_coords
+from shared.game_state import GameState
+from shared.ai_engine import AlphaBetaAI, SearchResult, WIN_SCORE, INFINITY, SOLVER_TIME_SHARE
+
+# Seconds between checks of the stop event while waiting for workers
+STOP_POLL_INTERVAL = 0.05
+
+# Per-process worker state, set up by _init_worker
+_worker_engine = None
+_worker_bound = None
+_worker_generation = None
+_worker_game = None
+
+
+class _StaleSearch:
+    """Stop event for a worker task, set once the parent starts a new generation"""
+
+    def __init__(self, generation):
+        self.generation = generation
+
+    def is_set(self):
+        return _worker_generation.value != self.generation
+
+
+def _init_worker(bound, generation, max_branching):
+    """
+    Set up a worker process
+
+    Args:
+        bound: Shared multiprocessing.Value holding the best root score so far
+        generation: Shared multiprocessing.Value numbering the parent's
+            search iterations; guarded by bound's lock
+        max_branching: Engine branching limit
+    """
+    global _worker_engine, _worker_bound, _worker_generation
+    _worker_engine = AlphaBetaAI(max_branching=max_branching)
+    _worker_bound = bound
+    _worker_generation = generation
+
+
+def _search_move(game_id, generation, moves, index, depth, player, deadline):
+    """
+    Search one root move in a worker
+
+    The window starts at the best score any worker has found so far, and
+    a better score is published for the others. A task from an iteration
+    the parent has moved on from stops early and publishes nothing.
+
+    Args:
+        game_id: Game number; the worker's table is cleared when it changes
+        generation: Iteration the task belongs to
+        moves: (bit index, player) of every move played so far
+        index: Root move to search
+        depth: Search depth including the root move
+        player: Player making the root move
+        deadline: Wall-clock time.time() at which to give up, or None
+
+    Returns:
+        (index, score, exact, nodes); score None if the time ran out or the
+        iteration is over, exact False if the score is only an upper bound
+    """
+    global _worker_game
+    engine = _worker_engine
+    if game_id != _worker_game:
+        engine.new_game()
+        _worker_game = game_id
+
+    budget_ms = None
+    if deadline is not None:
+        # Tasks may wait in the queue, so the time left is only known here
+        budget_ms = (deadline - time.time()) * 1000
+        if budget_ms <= 0:
+            return index, None, False, 0
+
+    with _worker_bound.get_lock():
+        if _worker_generation.value != generation:
+            return index, None, False, 0
+        alpha = _worker_bound.value
+
+    state = GameState()
+    for move, mover in moves:
+        state.play_index(move, mover)
+
+    engine.stop_event = _StaleSearch(generation)
+    score = engine.search_root_move(state, index, depth, alpha, player, budget_ms)
+    if score is None:
+        return index, None, False, engine.nodes
+
+    with _worker_bound.get_lock():
+        if _worker_generation.value != generation:
+            return index, None, False, engine.nodes
+        if score > _worker_bound.value:
+            _worker_bound.value = score
+    return index, score, score > alpha, engine.nodes
+
+
+class ParallelAlphaBetaAI(AlphaBetaAI):
+    """
+    Alpha-beta AI that splits the root moves across worker processes
+
+    Each iteration of iterative deepening hands every root move to the
+    pool as a separate task, so idle workers pick up the next move. The
+    best score found so far is kept in shared memory and used as the lower
+    bound of every root move searched after it, so a move can fail low and
+    only bound its score; the best move is taken from the exact scores.
+    Every iteration has its own generation number, and tasks of an older
+    generation stop and publish nothing. Each worker keeps its own
+    transposition table for the whole game.
+    """
+
+    def __init__(self, depth=2, time_budget_ms=None, workers=None, **kwargs):
+        """
+        Initialize engine
+
+        Args:
+            depth: Search depth in plies; the maximum depth when a time
+                budget is set
+            time_budget_ms: Thinking time per move in milliseconds, or None
+            workers: Number of worker processes, one per core if None
+            **kwargs: Passed on to AlphaBetaAI
+        """
+        super().__init__(depth=depth, time_budget_ms=time_budget_ms, **kwargs)
+        self.workers = workers or os.cpu_count() or 1
+        self.game_id = 0
+        self._pool = None
+        self._bound = None
+        self._generation = None
+
+    def _get_pool(self):
+        """Start the worker pool on first use"""
+        if self._pool is None:
+            # Spawned workers do not inherit the GUI's threads and sockets
+            context = multiprocessing.get_context("spawn")
+            self._bound = context.Value("q", -INFINITY)
+            self._generation = context.Value("q", 0, lock=False)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._bound, self._generation, self.max_branching),
+            )
+        return self._pool
+
+    def new_game(self):
+        """Forget results from the previous game"""
+        super().new_game()
+        self.game_id += 1
+
+    def start(self):
+        """Start every worker process now rather than during the first search"""
+        pool = self._get_pool()
+        wait([pool.submit(time.sleep, 0) for _ in range(self.workers)])
+
+    def _next_generation(self):
+        """Start a new generation, ending the tasks of the current one"""
+        with self._bound.get_lock():
+            self._generation.value += 1
+            self._bound.value = -INFINITY
+            return self._generation.value
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def search(self, board, player, time_budget_ms=None, max_depth=None):
+        """
+        Parallel iterative deepening search; see AlphaBetaAI.search()
+
+        Returns:
+            SearchResult, or None if the board is full
+        """
+        if isinstance(board, GameState):
+            state = board.copy()
+        else:
+            state = GameState.from_grid(board)
+
+        if state.is_full():
+            return None
+
+        start = time.perf_counter()
+        root_moves = self._generate_moves(state, player)
+        in_book = self.book is not None and self.book.get_moves(state, player)
+        if state.move_count == 0 or in_book or len(root_moves) == 1 or self.workers <= 1:
+            return super().search(state, player, time_budget_ms, max_depth)
+
+        if time_budget_ms is None:
+            time_budget_ms = self.time_budget_ms
+        if max_depth is None:
+            max_depth = self.depth
+
+        self.nodes = 0
+        solver_ms = time_budget_ms * SOLVER_TIME_SHARE if time_budget_ms is not None else None
+        line = self.solver.find_win(state, player, solver_ms)
+        if line:
+            self.last_result = SearchResult(line[0], WIN_SCORE, len(line), self.solver.nodes,
+                                            time.perf_counter() - start)
+            return self.last_result
+
+        pool = self._get_pool()
+        moves = [(index, mover) for index, mover, _, _ in state.history]
+        best_index, best_score, completed = root_moves[0], 0, 0
+
+        deadline = None
+        for depth in range(1, max_depth + 1):
+            if depth > 1 and time_budget_ms is not None:
+                remaining = time_budget_ms / 1000 - (time.perf_counter() - start)
+                if remaining <= 0:
+                    break
+                deadline = time.time() + remaining
+
+            generation = self._next_generation()
+            pending = {pool.submit(_search_move, self.game_id, generation, moves, index, depth, player, deadline)
+                       for index in root_moves}
+            scores = {}
+            exact = set()
+            while pending:
+                done, pending = wait(pending, STOP_POLL_INTERVAL, FIRST_COMPLETED)
+                for future in done:
+                    index, score, is_exact, nodes = future.result()
+                    self.nodes += nodes
+                    if score is not None:
+                        scores[index] = score
+                        if is_exact:
+                            exact.add(index)
+                if self.stop_event is not None and self.stop_event.is_set():
+                    # Queued tasks are dropped; running ones see the new
+                    # generation and stop
+                    for future in pending:
+                        future.cancel()
+                    self._next_generation()
+                    break
+
+            if exact and (len(scores) == len(root_moves) or best_index in scores):
+                # Either finished, or the previous best move was searched in
+                # full and can only be replaced by a better move. Fail-low
+                # scores are upper bounds and never beat an exact score;
+                # ties go to the earlier root move
+                best_index = max((index for index in root_moves if index in exact),
+                                 key=lambda index: scores[index])
+                best_score = scores[best_index]
+            if len(scores) < len(root_moves):
+                break
+            completed = depth
+
+            # Search the best moves first in the next iteration
+            root_moves.sort(key=lambda index: -scores[index])
+            if abs(best_score) >= WIN_SCORE:
+                break
+
+        elapsed = time.perf_counter() - start
+        self.last_result = SearchResult(Point(*cell_coords(best_index)), best_score, completed, self.nodes, elapsed)
+        return self.last_result
@@ -0,0 +1,219 @@
+"""
+Line patterns - shape classes and precomputed threat lookup tables
+"""
+
+import os
+import zlib
+from shared.constants import BOARD_SIZE, WIN_CONDITION
+from shared.bitboard import DIRECTIONS, cell_index
+from shared.game_state import CELL_LINES, EDGE
+from shared.utils import get_project_root, create_dirs_if_not_exists, log
+
+# Shape classes found on a line, strongest first
+FIVE = 0
+OPEN_FOUR = 1
+FOUR = 2
+OPEN_THREE = 3
+THREE = 4
+OPEN_TWO = 5
+TWO = 6
+NONE = 7
+
+SHAPE_NAMES = ["five", "open four", "four", "open three", "three", "open two", "two", "none"]
+
+# Patterns per shape, strongest first. 'x' is own stone, '.' empty.
+# Opponent stones and the board edge read as 'o' and never match.
+# Broken threes such as ".xx.x." are open threes: one move makes an open four.
+SHAPE_PATTERNS = [
+    (FIVE, ["xxxxx"]),
+    (OPEN_FOUR, [".xxxx."]),
+    (FOUR, ["xxxx.", ".xxxx", "xxx.x", "x.xxx", "xx.xx"]),
+    (OPEN_THREE, [".xxx..", "..xxx.", ".xx.x.", ".x.xx."]),
+    (THREE, ["xxx..", "..xxx", ".xxx.", "xx.x.", ".x.xx", "x.xx.", ".xx.x",
+             "xx..x", "x..xx", "x.x.x"]),
+    (OPEN_TWO, ["..xx..", ".x.x..", "..x.x.", ".x..x."]),
+    (TWO, ["xx...", "...xx", ".xx..", "..xx.", "x.x..", "..x.x", ".x.x.",
+           "x..x.", ".x..x", "x...x"]),
+]
+
+# Cells on each side of the centre in a lookup window
+WINDOW_REACH = WIN_CONDITION - 1
+WINDOW_SIZE = 2 * WINDOW_REACH + 1
+# Window keys hold 2 bits per cell, centre excluded
+WINDOW_KEYS = 1 << (4 * WINDOW_REACH)
+_SIDE_MASK = (1 << (2 * WINDOW_REACH)) - 1
+
+TABLE_PATH = os.path.join(get_project_root(), "cache", "threat_tables.bin")
+
+
+def classify_line(line):
+    """
+    Count shapes on one line
+
+    A lower shape is only counted if it uses a stone that no stronger
+    shape has claimed, so an open four does not also count as two fours
+    and a three.
+
+    Args:
+        line: String of 'x', '.' and 'o' cells
+
+    Returns:
+        Dict of shape class -> count
+    """
+    counts = {}
+    claimed = set()
+    for shape, patterns in SHAPE_PATTERNS:
+        for pattern in patterns:
+            start = line.find(pattern)
+            while start != -1:
+                stones = {start + k for k, c in enumerate(pattern) if c == "x"}
+                if not stones <= claimed:
+                    counts[shape] = counts.get(shape, 0) + 1
+                    claimed |= stones
+                start = line.find(pattern, start + 1)
+    return counts
+
+
+def classify_cell(line, center):
+    """
+    Get the strongest shape that uses the stone at one position
+
+    Args:
+        line: String of 'x', '.' and 'o' cells
+        center: Position of the stone in line
+
+    Returns:
+        Shape class, NONE if the stone is in no shape
+    """
+    for shape, patterns in SHAPE_PATTERNS:
+        for pattern in patterns:
+            first = max(0, center - len(pattern) + 1)
+            last = min(center, len(line) - len(pattern))
+            for start in range(first, last + 1):
+                if pattern[center - start] == "x" and line.startswith(pattern, start):
+                    return shape
+    return NONE
+
+
+def _window_line(key, player):
+    """Decode a window key into a line string with player's stone at the centre"""
+    chars = []
+    for k in range(2 * WINDOW_REACH):
+        value = (key >> (2 * k)) & 3
+        chars.append("x" if value == player else ("." if value == 0 else "o"))
+    return "".join(chars[:WINDOW_REACH]) + "x" + "".join(chars[WINDOW_REACH:])
+
+
+def _build_tables():
+    """
+    Build the threat table of each player
+
+    The table for O is the table for X with the stone colours swapped, so
+    only one is classified.
+    """
+    table_x = bytes(classify_cell(_window_line(key, 1), WINDOW_REACH) for key in range(WINDOW_KEYS))
+
+    swap = []
+    for byte in range(256):
+        swapped = 0
+        for k in range(4):
+            value = (byte >> (2 * k)) & 3
+            if value in (1, 2):
+                value = 3 - value
+            swapped |= value << (2 * k)
+        swap.append(swapped)
+    table_o = bytes(table_x[swap[key & 0xFF] | (swap[key >> 8] << 8)] for key in range(WINDOW_KEYS))
+    return table_x, table_o
+
+
+def _table_signature():
+    """Checksum of everything the tables are built from"""
+    return zlib.crc32(repr((SHAPE_PATTERNS, WINDOW_REACH)).encode()).to_bytes(4, "little")
+
+
+def _load_tables(path=TABLE_PATH):
+    """
+    Load the threat tables from the cache file, building and saving them
+    if the file is missing or was built from different patterns
+
+    Returns:
+        [None, table for X, table for O]
+    """
+    signature = _table_signature()
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) == 4 + 2 * WINDOW_KEYS and data[:4] == signature:
+            return [None, data[4:4 + WINDOW_KEYS], data[4 + WINDOW_KEYS:]]
+    except OSError:
+        pass
+
+    table_x, table_o = _build_tables()
+    try:
+        create_dirs_if_not_exists(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(signature + table_x + table_o)
+    except OSError as e:
+        log(f"Could not save threat tables: {e}", "WARNING")
+    return [None, table_x, table_o]
+
+
+# THREAT_TABLES[player][window key] is the shape class player makes by
+# playing the centre of the window
+THREAT_TABLES = _load_tables()
+
+
+def move_threats(state, index, player):
+    """
+    Get the shape player makes in each direction by playing a cell
+
+    Args:
+        state: GameState
+        index: Bit index of an empty cell
+        player: Player marker
+
+    Returns:
+        List of four shape classes, one per direction
+    """
+    table = THREAT_TABLES[player]
+    codes = state.line_codes
+    reach = 2 * WINDOW_REACH
+    threats = []
+    for line_id, bit in CELL_LINES[index]:
+        window = codes[line_id] >> (bit - reach)
+        threats.append(table[(window & _SIDE_MASK) | ((window >> (reach + 2)) & _SIDE_MASK) << reach])
+    return threats
+
+
+def board_threats(board, x, y, player):
+    """
+    Get the shape player makes in each direction by playing (x, y)
+
+    Works on a BitBoard, for callers that do not keep a GameState.
+
+    Args:
+        board: BitBoard
+        x, y: Position
+        player: Player marker
+
+    Returns:
+        List of four shape classes, one per direction
+    """
+    table = THREAT_TABLES[player]
+    threats = []
+    for dx, dy in DIRECTIONS:
+        key = 0
+        slot = 0
+        for k in range(-WINDOW_REACH, WINDOW_REACH + 1):
+            if k == 0:
+                continue
+            nx, ny = x + k * dx, y + k * dy
+            if 0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE:
+                bit = 1 << cell_index(nx, ny)
+                value = 1 if board.bits[1] & bit else (2 if board.bits[2] & bit else 0)
+            else:
+                value = EDGE
+            key |= value << (2 * slot)
+            slot += 1
+        threats.append(table[key])
+    return threats
@@ -0,0 +1,138 @@
+"""
+Position cache - LRU cache of AI results keyed by canonical position
+"""
+
+import threading
+from collections import OrderedDict
+from shared.point import Point
+from shared.bitboard import BitBoard, cell_index, cell_coords
+from shared.game_state import GameState
+from shared.symmetry import INVERSE, canonical_hash, transform_index
+
+DEFAULT_CAPACITY = 50000
+
+# Kinds of cached value
+MOVE = 0
+SCORE = 1
+
+
+class PositionCache:
+    """
+    Thread-safe LRU cache of best moves and evaluations
+
+    Positions are keyed by their canonical form, so all eight rotations
+    and reflections of a position share one entry. Moves are stored in
+    canonical orientation and mapped back to the board they are read for.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """
+        Initialize cache
+
+        Args:
+            capacity: Maximum number of entries
+        """
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(board, player, kind):
+        """Get (cache key, symmetry onto the canonical form) of a position"""
+        if isinstance(board, GameState):
+            board = board.board
+        elif not isinstance(board, BitBoard):
+            board = BitBoard.from_grid(board)
+        value, symmetry = canonical_hash(board, player)
+        return (value, kind), symmetry
+
+    def _get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def get_move(self, board, player):
+        """
+        Get cached best move
+
+        Args:
+            board: 2D array, BitBoard or GameState representing the game board
+            player: Player to move
+
+        Returns:
+            Point object in the board's orientation, or None if not cached
+        """
+        key, symmetry = self._key(board, player, MOVE)
+        move = self._get(key)
+        if move is None:
+            return None
+        return Point(*cell_coords(transform_index(move, INVERSE[symmetry])))
+
+    def put_move(self, board, player, move):
+        """
+        Cache best move
+
+        Args:
+            board: 2D array, BitBoard or GameState representing the game board
+            player: Player to move
+            move: Point object
+        """
+        key, symmetry = self._key(board, player, MOVE)
+        self._put(key, transform_index(cell_index(move.get_x(), move.get_y()), symmetry))
+
+    def get_score(self, board, player):
+        """Get cached evaluation from player's point of view, or None"""
+        key, _ = self._key(board, player, SCORE)
+        return self._get(key)
+
+    def put_score(self, board, player, score):
+        """Cache evaluation from player's point of view"""
+        key, _ = self._key(board, player, SCORE)
+        self._put(key, score)
+
+    def clear(self):
+        """Remove all entries and reset statistics"""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        """Get size and hit rate"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "capacity": self.capacity,
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self.entries)
+
+
+_position_cache = None
+
+
+def get_position_cache():
+    """Get the shared position cache"""
+    global _position_cache
+    if _position_cache is None:
+        _position_cache = PositionCache()
+    return _position_cache
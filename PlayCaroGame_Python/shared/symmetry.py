@@ -0,0 +1,90 @@
+"""
+Board symmetry - the eight rotations and reflections of the board
+"""
+
+from shared.constants import BOARD_SIZE
+from shared.bitboard import STRIDE, ZOBRIST_KEYS, cell_index, cell_coords, iter_bits
+
+_LAST = BOARD_SIZE - 1
+
+# Each symmetry maps (x, y) to a new cell: identity, three rotations, then
+# the four reflections
+SYMMETRIES = [
+    lambda x, y: (x, y),
+    lambda x, y: (y, _LAST - x),
+    lambda x, y: (_LAST - x, _LAST - y),
+    lambda x, y: (_LAST - y, x),
+    lambda x, y: (x, _LAST - y),
+    lambda x, y: (_LAST - x, y),
+    lambda x, y: (y, x),
+    lambda x, y: (_LAST - y, _LAST - x),
+]
+
+# INVERSE[t] undoes symmetry t
+INVERSE = [0, 3, 2, 1, 4, 5, 6, 7]
+
+
+def _build_maps():
+    """Build, for every symmetry, the bit index each cell is mapped to"""
+    maps = []
+    for transform in SYMMETRIES:
+        mapping = [0] * (BOARD_SIZE * STRIDE)
+        for x in range(BOARD_SIZE):
+            for y in range(BOARD_SIZE):
+                mapping[cell_index(x, y)] = cell_index(*transform(x, y))
+        maps.append(mapping)
+    return maps
+
+
+# SYMMETRY_MAPS[t][index] is the bit index of cell index under symmetry t
+SYMMETRY_MAPS = _build_maps()
+
+
+def transform_index(index, symmetry):
+    """Map bit index by symmetry"""
+    return SYMMETRY_MAPS[symmetry][index]
+
+
+def transform_point(x, y, symmetry):
+    """Map (x, y) by symmetry"""
+    return cell_coords(SYMMETRY_MAPS[symmetry][cell_index(x, y)])
+
+
+def symmetric_hashes(board, player=None):
+    """
+    Get the Zobrist hash of every symmetric image of a position
+
+    Args:
+        board: BitBoard
+        player: If given, stones of this player are hashed as X and the
+            other player's as O, so the hash does not depend on colour
+
+    Returns:
+        List of eight hashes, indexed by symmetry
+    """
+    hashes = [0] * 8
+    for marker in (1, 2):
+        keys = ZOBRIST_KEYS[marker if player in (None, 1) else 3 - marker]
+        for index in iter_bits(board.bits[marker]):
+            for t in range(8):
+                hashes[t] ^= keys[SYMMETRY_MAPS[t][index]]
+    return hashes
+
+
+def canonical_hash(board, player=None):
+    """
+    Get the canonical hash of a position
+
+    The canonical form is the symmetric image with the smallest hash, so
+    all eight orientations of a position share one key.
+
+    Args:
+        board: BitBoard
+        player: See symmetric_hashes()
+
+    Returns:
+        (hash, symmetry) where symmetry maps the board onto its canonical form
+    """
+    hashes = symmetric_hashes(board, player)
+    best = min(range(8), key=lambda t: hashes[t])
+    return hashes[best], best
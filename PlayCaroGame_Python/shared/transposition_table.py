@@ -0,0 +1,101 @@
+"""
+Transposition table - bounded cache of search results keyed by Zobrist hash
+"""
+
+# Bound types of a stored score
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Rough size of one stored entry (tuple plus its ints) in bytes
+ENTRY_BYTES = 160
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class TranspositionTable:
+    """
+    Fixed-size, depth-preferred transposition table
+
+    Entries live in a preallocated slot array indexed by hash, so memory
+    never grows past the cap. When two positions share a slot, the entry
+    searched deeper is kept, unless it belongs to an older search, in
+    which case it is always replaced. Entries from earlier searches are
+    still returned by probe(), so results carry over between turns.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize table
+
+        Args:
+            max_bytes: Memory cap for stored entries
+        """
+        self.capacity = max(1, max_bytes // ENTRY_BYTES)
+        self.slots = [None] * self.capacity
+        self.generation = 0
+        self.size = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Mark the start of a new search, ageing existing entries"""
+        self.generation += 1
+
+    def clear(self):
+        """Remove all entries"""
+        self.slots = [None] * self.capacity
+        self.generation = 0
+        self.size = 0
+
+    def probe(self, key):
+        """
+        Look up a position
+
+        Args:
+            key: 64-bit position key
+
+        Returns:
+            (depth, score, bound, best_move) or None
+        """
+        self.probes += 1
+        entry = self.slots[key % self.capacity]
+        if entry is None or entry[0] != key:
+            return None
+        self.hits += 1
+        return entry[1:5]
+
+    def store(self, key, depth, score, bound, best_move):
+        """
+        Store a search result
+
+        Args:
+            key: 64-bit position key
+            depth: Depth the position was searched to
+            score: Score from the point of view of the player to move
+            bound: EXACT, LOWER_BOUND or UPPER_BOUND
+            best_move: Best move found (bit index) or None
+        """
+        slot = key % self.capacity
+        entry = self.slots[slot]
+        if entry is None:
+            self.size += 1
+        elif entry[0] != key and entry[5] == self.generation and entry[1] > depth:
+            return
+        self.slots[slot] = (key, depth, score, bound, best_move, self.generation)
+        self.stores += 1
+
+    def get_stats(self):
+        """Get usage statistics"""
+        return {
+            "capacity": self.capacity,
+            "size": self.size,
+            "probes": self.probes,
+            "hits": self.hits,
+            "stores": self.stores,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+        }
+
+    def __len__(self):
+        return self.size
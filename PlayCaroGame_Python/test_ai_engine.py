@@ -0,0 +1,212 @@
+"""
+Test script for board model and AI engine
+"""
+
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+print("=" * 60)
+print("CARO GAME PYTHON - AI ENGINE TEST")
+print("=" * 60)
+
+# Test 1: Import modules
+print("\n[1/4] Testing imports...")
+try:
+    from shared.bitboard import BitBoard
+    from shared.game_state import GameState
+    from shared.game_logic import GameLogic, SimpleAI, ThreatSpaceSolver
+    from shared.ai_engine import AlphaBetaAI
+    from shared.mcts import MCTSAI
+    print("✅ Engine modules OK")
+except Exception as e:
+    print(f"❌ Engine modules FAILED: {e}")
+    sys.exit(1)
+
+# Test 2: Bitboard matches 2D array logic
+print("\n[2/4] Testing bitboard...")
+try:
+    board = [[0 for _ in range(15)] for _ in range(15)]
+    for i in range(5):
+        board[3 + i][10 - i] = 2
+    bitboard = BitBoard.from_grid(board)
+
+    assert bitboard.to_grid() == board, "Grid round trip differs"
+    assert bitboard.check_win(5, 8, 2), "Diagonal win not detected"
+    assert not bitboard.check_win(5, 8, 1), "Wrong player wins"
+    assert GameLogic.check_win(bitboard, 5, 8, 2) == GameLogic.check_win(board, 5, 8, 2)
+    assert len(GameLogic.get_valid_moves(bitboard)) == 220
+
+    # Threat tables see gaps and blocked ends
+    from shared.patterns import board_threats, OPEN_FOUR, FOUR
+    line = BitBoard.from_grid(board)
+    for y in (3, 4, 6):
+        line.place(12, y, 1)
+    assert board_threats(line, 12, 5, 1)[0] == OPEN_FOUR, "Filled gap missed"
+    assert board_threats(line, 12, 7, 1)[0] == FOUR, "Broken four missed"
+    line.place(12, 2, 2)
+    assert board_threats(line, 12, 5, 1)[0] == FOUR, "Blocked end missed"
+    print("✅ Bitboard OK")
+except Exception as e:
+    print(f"❌ Bitboard FAILED: {e}")
+    sys.exit(1)
+
+# Test 3: Incremental game state
+print("\n[3/4] Testing game state...")
+try:
+    state = GameState()
+    for i in range(4):
+        assert not state.play(7, 3 + i, 1), "Early win"
+        state.play(8, 3 + i, 2)
+    assert state.play(7, 7, 1), "Horizontal win not detected"
+    assert state.get_winner() == 1
+
+    state.undo()
+    assert state.get_winner() == 0, "Undo did not clear winner"
+    assert state.get_move_count() == 8
+    assert state.is_empty(7, 7)
+    assert not state.is_full()
+    assert state.get_hash() == state.board.zobrist_hash(), "Incremental hash differs"
+    assert len(state.get_candidate_moves()) == 40, "Wrong candidate moves"
+    print("✅ Game state OK")
+except Exception as e:
+    print(f"❌ Game state FAILED: {e}")
+    sys.exit(1)
+
+# Test 4: Search engine
+print("\n[4/4] Testing search engine...")
+try:
+    engine = AlphaBetaAI(depth=2)
+
+    # Engine must complete its own four
+    state = GameState()
+    for i in range(4):
+        state.play(5, 4 + i, 2)
+        state.play(9, 2 + 2 * i, 1)
+    move = engine.get_best_move(state, 2, 1)
+    assert (move.get_x(), move.get_y()) in [(5, 3), (5, 8)], f"Missed win: {move}"
+
+    # Engine must block an open three turning into an open four
+    state = GameState()
+    for i in range(3):
+        state.play(7, 6 + i, 1)
+    state.play(2, 2, 2)
+    state.play(12, 12, 2)
+    move = engine.get_best_move(state, 2, 1)
+    assert (move.get_x(), move.get_y()) in [(7, 5), (7, 9)], f"Missed block: {move}"
+
+    # Search must not change the caller's state
+    assert state.get_move_count() == 5
+
+    # Iterative deepening must stop near its time budget
+    timed = AlphaBetaAI(depth=20, time_budget_ms=200)
+    state.play(7, 5, 2)
+    state.play(9, 9, 1)
+    result = timed.search(state, 2)
+    assert result.get_move() is not None and result.get_depth() >= 1
+    assert result.elapsed < 1.0, f"Search overran budget: {result.elapsed:.2f}s"
+
+    # A stopped search still returns a legal move at once
+    import threading
+    stopped = AlphaBetaAI(depth=20, time_budget_ms=10000, use_book=False)
+    stopped.stop_event = threading.Event()
+    stopped.stop_event.set()
+    result = stopped.search(state, 2)
+    assert state.is_empty(result.get_move().get_x(), result.get_move().get_y()), "Stopped search gave no move"
+    assert result.elapsed < 1.0, f"Stop ignored: {result.elapsed:.2f}s"
+
+    # Difficulty profiles map to engine budgets
+    from shared.config import Config
+    from shared.ai_engine import create_ai_engine
+    medium = create_ai_engine(Config.get_ai_profile("medium"), seed=1)
+    result = medium.search(state, 2, time_budget_ms=10000, max_depth=12)
+    assert result.get_nodes() < medium.max_nodes + 256, f"Node budget ignored: {result.get_nodes()}"
+    assert create_ai_engine(Config.get_ai_profile("easy")).randomness > 0, "Easy level plays exactly"
+
+    # Two closed threes meeting at one cell are a forced win by fours
+    state = GameState()
+    for x, y in [(7, 7), (7, 8), (7, 9), (8, 10), (9, 10), (10, 10)]:
+        state.play(x, y, 1)
+    for x, y in [(7, 6), (11, 10), (0, 0), (0, 14), (14, 0), (14, 14)]:
+        state.play(x, y, 2)
+    solver = ThreatSpaceSolver()
+    line = solver.solve(state, 1)
+    assert line and (line[0].get_x(), line[0].get_y()) == (7, 10), f"Missed VCF: {line}"
+    assert solver.solve(state, 2) is None, "False VCF"
+
+    # Opening book answers every orientation of a book position
+    from shared.opening_book import get_opening_book
+    from shared.symmetry import transform_point
+    book = get_opening_book()
+    for symmetry in range(8):
+        state = GameState()
+        state.play(7, 7, 1)
+        state.play(*transform_point(6, 8, symmetry), 2)
+        move = book.lookup(state, 1)
+        assert move is not None, "Position missing from book"
+        assert max(abs(move.get_x() - 7), abs(move.get_y() - 7)) <= 2, f"Odd book move: {move}"
+
+    # Cached moves are mapped back onto rotated positions
+    from shared.position_cache import PositionCache
+    from shared.point import Point
+    cache = PositionCache(capacity=4)
+    stones = [((7, 7), 1), ((7, 8), 2), ((9, 5), 1)]
+    state = GameState()
+    for (x, y), player in stones:
+        state.play(x, y, player)
+    cache.put_move(state, 2, Point(8, 6))
+    state = GameState()
+    for (x, y), player in stones:
+        state.play(*transform_point(x, y, 1), player)
+    move = cache.get_move(state, 2)
+    assert move and (move.get_x(), move.get_y()) == transform_point(8, 6, 1), f"Cached move not rotated: {move}"
+    assert cache.get_stats()["hit_rate"] == 1.0, "Rotated position missed the cache"
+
+    # Batch evaluator finds fives, draws and open fours
+    import numpy as np
+    from shared.batch_eval import evaluate_batch, X_WINS, O_WINS, DRAW, ONGOING
+    boards = np.zeros((4, 15, 15), dtype=np.int8)
+    boards[0, 3:8, 3:8] = np.eye(5, dtype=np.int8)
+    boards[1, 10, 2:7] = 2
+    boards[2] = (np.arange(15)[:, None] // 2 + np.arange(15)[None, :]) % 2 + 1
+    boards[3, 7, 7:11] = 1
+    status, features = evaluate_batch(boards)
+    assert list(status) == [X_WINS, O_WINS, DRAW, ONGOING], f"Wrong batch status: {status}"
+    assert features[3, 0, 3] == 2 and features[3, 0, 4] == 0, f"Wrong four count: {features[3, 0]}"
+
+    # Arena plays a full game and scores it
+    from shared.arena import play_game, wilson_interval
+    game = play_game("simple", "simple", [(7, 7), (6, 7), (5, 6)], seed=1)
+    assert game["winner"] in (0, 1, 2) and game["moves"] == len(game["move_list"]) > 3, "Bad arena game"
+    low, high = wilson_interval(15, 20)
+    assert low < 0.75 < high, "Bad confidence interval"
+
+    # Server bots replay the game and answer with a move
+    from server.controller.bot_player import compute_bot_move
+    moves = [(3, 4 + i // 2, 1) if i % 2 == 0 else (10, i, 2) for i in range(7)]
+    assert compute_bot_move(moves, 2, "medium") in [(3, 3), (3, 8)], "Bot missed block"
+
+    # MCTS must block a four and report its statistics
+    mcts = MCTSAI(playouts=200, seed=1)
+    state = GameState()
+    state.play(3, 3, 2)
+    for i in range(4):
+        state.play(3, 4 + i, 1)
+        state.play(10, 2 * i + 1, 2)
+    move = mcts.get_best_move(state, 2, 1)
+    assert (move.get_x(), move.get_y()) == (3, 8), f"MCTS missed block: {move}"
+    state.play(3, 8, 2)
+    mcts.search(state, 1)
+    assert mcts.get_stats()["playouts"] == 200, "Wrong playout count"
+    assert state.get_move_count() == 10, "MCTS changed the state"
+
+    print(f"✅ Search engine OK - {engine.nodes} nodes")
+except Exception as e:
+    print(f"❌ Search engine FAILED: {e}")
+    sys.exit(1)
+
+print("\n" + "=" * 60)
+print("🎉 ALL TESTS PASSED!")
+print("=" * 60)
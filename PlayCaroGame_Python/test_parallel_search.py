@@ -0,0 +1,112 @@
+"""
+Test script for the parallel search engine
+
+Worker processes are spawned and re-import this script, so everything
+runs under the __main__ guard.
+"""
+
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    """Run the tests"""
+    print("=" * 60)
+    print("CARO GAME PYTHON - PARALLEL SEARCH TEST")
+    print("=" * 60)
+
+    # Test 1: Import modules
+    print("\n[1/3] Testing imports...")
+    try:
+        import threading
+        import time
+        from shared.game_state import GameState
+        from shared.ai_engine import AlphaBetaAI
+        from shared.parallel_search import ParallelAlphaBetaAI
+        from shared.mcts import MCTSAI
+        from shared.opening_book import standard_openings
+        print("✅ Parallel search modules OK")
+    except Exception as e:
+        print(f"❌ Parallel search modules FAILED: {e}")
+        sys.exit(1)
+
+    # Test 2: Parallel and serial search agree
+    print("\n[2/3] Testing parallel search...")
+    engine = ParallelAlphaBetaAI(depth=3, workers=2, use_book=False)
+    try:
+        # Same move and score as the serial engine at a fixed depth
+        for opening in standard_openings()[:6]:
+            state = GameState()
+            for count, (x, y) in enumerate(opening):
+                state.play(x, y, 1 if count % 2 == 0 else 2)
+            serial = AlphaBetaAI(depth=3, use_book=False).search(state, 2)
+            engine.new_game()
+            parallel = engine.search(state, 2)
+            assert parallel.get_depth() == 3, f"Search stopped early: {parallel}"
+            assert parallel.score == serial.score, f"Scores differ on {opening}: {serial} vs {parallel}"
+            assert (parallel.get_move().get_x(), parallel.get_move().get_y()) == \
+                (serial.get_move().get_x(), serial.get_move().get_y()), f"Moves differ on {opening}"
+
+        # Engine must block an open four in the making
+        state = GameState()
+        for i in range(3):
+            state.play(7, 6 + i, 1)
+        state.play(2, 2, 2)
+        state.play(12, 12, 2)
+        move = engine.get_best_move(state, 2, 1)
+        assert (move.get_x(), move.get_y()) in [(7, 5), (7, 9)], f"Missed block: {move}"
+
+        # A search stopped while workers are busy returns at once, and the
+        # tasks it abandoned do not disturb the next search
+        engine.stop_event = threading.Event()
+        threading.Timer(0.2, engine.stop_event.set).start()
+        deep = engine.search(state, 2, max_depth=9)
+        assert deep.elapsed < 1.0, f"Stop ignored: {deep.elapsed:.2f}s"
+        engine.stop_event = None
+        engine.new_game()
+        result = engine.search(state, 2)
+        serial = AlphaBetaAI(depth=3, use_book=False).search(state, 2)
+        assert result.score == serial.score, f"Stale bound after stop: {serial} vs {result}"
+        print("✅ Parallel search OK")
+    except Exception as e:
+        print(f"❌ Parallel search FAILED: {e}")
+        sys.exit(1)
+    finally:
+        engine.shutdown()
+
+    # Test 3: Parallel MCTS can be stopped
+    print("\n[3/3] Testing parallel MCTS...")
+    mcts = MCTSAI(playouts=10 ** 7, workers=2, seed=1, use_book=False)
+    try:
+        state = GameState()
+        for x, y, player in [(7, 7, 1), (7, 8, 2), (8, 8, 1), (6, 6, 2)]:
+            state.play(x, y, player)
+
+        # Workers end their batches soon after the event is set, and the
+        # playouts made so far still choose the move
+        for _ in range(2):
+            mcts.stop_event = threading.Event()
+            threading.Timer(1.0, mcts.stop_event.set).start()
+            started = time.perf_counter()
+            move = mcts.get_best_move(state, 1, 2)
+            elapsed = time.perf_counter() - started
+            assert elapsed < 5.0, f"Stop ignored: {elapsed:.2f}s"
+            assert move is not None and state.is_empty(move.get_x(), move.get_y()), f"Bad move: {move}"
+            assert mcts.get_stats()["playouts"] > 0, "No playouts merged"
+        print("✅ Parallel MCTS OK")
+    except Exception as e:
+        print(f"❌ Parallel MCTS FAILED: {e}")
+        sys.exit(1)
+    finally:
+        mcts.shutdown()
+
+    print("\n" + "=" * 60)
+    print("🎉 ALL TESTS PASSED!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
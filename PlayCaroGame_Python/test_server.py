@@ -0,0 +1,673 @@
+"""
+Test script for the server: connections, rooms and persistence
+"""
+
+import sys
+import os
+import socket
+import tempfile
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Keep the test database out of the project
+os.chdir(tempfile.mkdtemp())
+
+print("=" * 60)
+print("CARO GAME PYTHON - SERVER TEST")
+print("=" * 60)
+
+
+def wait_until(condition, timeout=5.0):
+    """Poll condition until it holds or timeout seconds pass"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def receive(client, decoder, command, timeout=5.0):
+    """Read frames from a socket until one starts with command"""
+    client.settimeout(timeout)
+    while True:
+        for message in decoder.feed(client.recv(BUFFER_SIZE)):
+            if message.split(',')[0] == command:
+                return message
+
+
+class FakeUser:
+    """Logged in user stand-in"""
+
+    def __init__(self, user_id, games=0, wins=0):
+        self.user_id = user_id
+        self.games = games
+        self.wins = wins
+
+    def get_id(self):
+        return self.user_id
+
+    def get_number_of_game(self):
+        return self.games
+
+    def get_number_of_win(self):
+        return self.wins
+
+
+class FakeHandler:
+    """Connection stand-in recording what it is sent"""
+
+    def __init__(self, bus, client_number, user=None):
+        self.bus = bus
+        self.client_number = client_number
+        self.user = user
+        self.room = None
+        self.is_closed = False
+        self.messages = []
+
+    def get_client_number(self):
+        return self.client_number
+
+    def get_user(self):
+        return self.user
+
+    def get_room(self):
+        return self.room
+
+    def set_room(self, room):
+        self.room = room
+
+    def is_bot(self):
+        return False
+
+    def go_to_partner_room(self):
+        self.messages.append(PROTOCOL_GO_TO_ROOM)
+
+    def set_user(self, user):
+        self.bus.set_user(self, user)
+        self.user = user
+
+    def write(self, message):
+        self.messages.append(message)
+
+
+# Test 1: Import modules
+print("\n[1/9] Testing imports...")
+try:
+    from shared.constants import *
+    from shared.framing import FrameDecoder, encode_frame
+    from shared.utils import create_message
+    from server.controller.async_server import AsyncServer
+    from server.dao.database import Database
+    from server.dao.stats_writer import StatsWriter
+    from server.dao.user_dao import UserDAO
+    from server.controller.outbound_queue import OutboundQueue, get_outbound_writer
+    from server.controller.server_thread_bus import ServerThreadBus
+    from server.controller.room_manager import RoomManager, get_room_manager
+    from server.controller.bot_player import BotPlayer
+    from server.controller.matchmaker import Matchmaker, MatchTicket
+    print("✅ Server modules OK")
+except Exception as e:
+    print(f"❌ Server modules FAILED: {e}")
+    sys.exit(1)
+
+# Test 2: Outbound queue
+print("\n[2/9] Testing outbound queue...")
+try:
+    frame = encode_frame("x" * 1000)
+
+    def slow_pair(name):
+        """Queue on a socket pair with small buffers whose reader never reads"""
+        server_end, client_end = socket.socketpair()
+        server_end.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        client_end.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        server_end.setblocking(False)
+        client_end.settimeout(5.0)
+        queue = OutboundQueue(server_end, name, high_watermark=16 * 1024,
+                              low_watermark=4 * 1024, max_bytes=256 * 1024)
+        return queue, server_end, client_end
+
+    def assert_dropped(queue, server_end, client_end):
+        """Check a dropped client is let go of and sees the end of the stream"""
+        assert not queue.put(frame), "Dropped queue accepted data"
+        assert wait_until(lambda: not queue.scheduled), "Writer loop kept the dropped queue"
+        while client_end.recv(BUFFER_SIZE):
+            pass
+        server_end.close()
+        client_end.close()
+
+    # Congested once unread bytes pass the high watermark, and dropped
+    # when that lasts longer than the stall timeout
+    queue, server_end, client_end = slow_pair("stalled")
+    for _ in range(64):
+        assert queue.put(frame), "Dropped below max_bytes"
+    assert wait_until(queue.is_congested), "Queue not congested"
+    assert not queue.wait_writable(0.2), "Stalled client not dropped"
+    assert_dropped(queue, server_end, client_end)
+
+    # Dropped at once past max_bytes
+    queue, server_end, client_end = slow_pair("slow")
+    for _ in range(512):
+        if not queue.put(frame):
+            break
+    else:
+        raise AssertionError("Slow client not dropped")
+    assert not queue.wait_writable(0), "Dropped queue still writable"
+    assert_dropped(queue, server_end, client_end)
+
+    # Sockets closed right after close() may have their fd reused at once;
+    # the writer loop must have let go of the old one
+    for round_number in range(20):
+        queue, server_end, client_end = slow_pair(f"reused-{round_number}")
+        for _ in range(32):
+            queue.put(frame)
+        threading.Thread(target=queue.close, args=(0.05,)).start()
+        assert wait_until(lambda: queue.closed and not queue.scheduled)
+        server_end.close()
+        client_end.close()
+    assert get_outbound_writer().thread.is_alive(), "Writer loop died"
+
+    # A normal close sends everything queued before the socket shuts down
+    server_end, client_end = socket.socketpair()
+    server_end.setblocking(False)
+    queue = OutboundQueue(server_end, "closing")
+    for _ in range(500):
+        assert queue.put(frame)
+    closer = threading.Thread(target=queue.close)
+    closer.start()
+    client_end.settimeout(5.0)
+    received = 0
+    while True:
+        data = client_end.recv(65536)
+        if not data:
+            break
+        received += len(data)
+    closer.join()
+    assert received == 500 * len(frame), f"Lost {500 * len(frame) - received} bytes on close"
+    assert not queue.put(frame), "Closed queue accepted data"
+    server_end.close()
+    client_end.close()
+    print("✅ Outbound queue OK")
+except Exception as e:
+    print(f"❌ Outbound queue FAILED: {e}")
+    sys.exit(1)
+
+# Test 3: Server thread bus
+print("\n[3/9] Testing server thread bus...")
+try:
+    bus = ServerThreadBus()
+    first, second, third = (FakeHandler(bus, n) for n in range(3))
+    for handler in (first, second, third):
+        bus.add(handler)
+    assert bus.get_length() == 3
+    assert bus.get_server_thread_by_client_number(1) is second
+    assert bus.get_server_thread_by_client_number(9) is None
+
+    # Logging in indexes by user ID, logging out or back in moves the entry
+    first.set_user(FakeUser(10))
+    second.set_user(FakeUser(20))
+    assert bus.get_server_thread_by_user_id(10) is first
+    assert bus.get_server_thread_by_user_id(20) is second
+    first.set_user(FakeUser(11))
+    assert bus.get_server_thread_by_user_id(10) is None
+    assert bus.get_server_thread_by_user_id(11) is first
+    second.set_user(None)
+    assert bus.get_server_thread_by_user_id(20) is None
+
+    assert bus.send_message_to_user_id(11, "hello")
+    assert not bus.send_message_to_user_id(20, "hello")
+    bus.broadcast(0, "news")
+    assert first.messages == ["hello"], first.messages
+    assert second.messages == ["news"] and third.messages == ["news"]
+
+    # Removing drops both indexes; a snapshot is unaffected by later changes
+    snapshot = bus.get_list_server_threads()
+    bus.remove(0)
+    assert bus.get_server_thread_by_client_number(0) is None
+    assert bus.get_server_thread_by_user_id(11) is None
+    assert bus.get_length() == 2 and len(snapshot) == 3
+    bus.remove(0)
+    assert bus.get_length() == 2
+
+    # A removed connection logging in late is not indexed
+    first.set_user(FakeUser(12))
+    assert bus.get_server_thread_by_user_id(12) is None
+    print("✅ Server thread bus OK")
+except Exception as e:
+    print(f"❌ Server thread bus FAILED: {e}")
+    sys.exit(1)
+
+# Test 4: Room manager
+print("\n[4/9] Testing room manager...")
+try:
+    manager = RoomManager()
+    hosts = [FakeHandler(None, n) for n in range(4)]
+    public = manager.create_room(hosts[0])
+    locked = manager.create_room(hosts[1], "secret")
+    later = manager.create_room(hosts[2])
+    assert manager.get_room_count() == 3 and manager.get_open_room_count() == 3
+    assert manager.get_room(public.get_id()) is public
+    assert manager.get_room(-1) is None
+
+    # Public and locked rooms are kept apart, each in creation order
+    assert manager.get_open_rooms() == [public, locked, later]
+    assert list(manager.open_public.get_rooms_after(0)) == [public, later]
+    assert list(manager.open_private.get_rooms_after(0)) == [locked]
+    assert manager.get_room_page(locked=False)[0] == [public, later]
+    assert manager.get_room_page(locked=True)[0] == [locked]
+
+    # Joining fills the room and closes it; a full room cannot be joined
+    guest = FakeHandler(None, 10)
+    assert manager.join_room(locked, guest)
+    assert locked.get_user2() is guest
+    assert not manager.join_room(locked, FakeHandler(None, 11))
+    assert manager.get_open_rooms() == [public, later]
+    assert len(manager.open_private) == 0
+
+    # A room with a second player already is registered but never open
+    duel = manager.create_room(hosts[3], user2_thread=FakeHandler(None, 12))
+    assert manager.get_room(duel.get_id()) is duel
+    assert duel not in manager.get_open_rooms()
+
+    # Removing a room its players left drops it everywhere, once
+    manager.remove_room(public)
+    manager.remove_room(locked)
+    manager.remove_room(public)
+    manager.remove_room(None)
+    assert manager.get_room(public.get_id()) is None
+    assert not manager.join_room(public, guest), "Joined a removed room"
+    assert manager.get_open_rooms() == [later]
+    assert manager.get_room_count() == 2 and manager.get_open_room_count() == 1
+    print("✅ Room manager OK")
+except Exception as e:
+    print(f"❌ Room manager FAILED: {e}")
+    sys.exit(1)
+
+# Test 5: Room list paging and subscriptions
+print("\n[5/9] Testing room list paging...")
+try:
+    manager = RoomManager()
+
+    def open_room(client_number, wins, password=ROOM_PASSWORD_PLACEHOLDER):
+        """Open a room whose creator has a mark of 10 per win"""
+        host = FakeHandler(None, client_number, FakeUser(client_number, wins=wins))
+        return manager.create_room(host, password)
+
+    def read_pages(page_size, **filters):
+        """Follow next-page cursors to the end"""
+        rooms, cursor = manager.get_room_page(0, page_size, **filters)
+        while cursor:
+            page, cursor = manager.get_room_page(cursor, page_size, **filters)
+            assert page, "Cursor past the last room"
+            rooms.extend(page)
+        return rooms
+
+    # Public and locked rooms interleaved, with marks 0, 10, ... 90
+    rooms = [open_room(n, n, "pw" if n % 3 == 0 else ROOM_PASSWORD_PLACEHOLDER) for n in range(10)]
+    public = [room for n, room in enumerate(rooms) if n % 3]
+    locked = [room for n, room in enumerate(rooms) if n % 3 == 0]
+
+    # Pages cover each index, and both merged, in creation order
+    assert read_pages(3) == rooms
+    assert read_pages(2, locked=False) == public
+    assert read_pages(2, locked=True) == locked
+    assert read_pages(4, min_mark=50) == rooms[5:]
+    assert read_pages(1, locked=True, min_mark=50) == [rooms[6], rooms[9]]
+    page, cursor = manager.get_room_page(0, 10)
+    assert page == rooms and cursor == 0, "Extra page after the last room"
+
+    # A cursor stays valid when rooms around it close
+    page, cursor = manager.get_room_page(0, 4)
+    assert cursor == rooms[3].get_id()
+    manager.remove_room(rooms[3])
+    manager.join_room(rooms[4], FakeHandler(None, 99))
+    assert manager.get_room_page(cursor, 4)[0] == rooms[5:9]
+
+    # Removed IDs are compacted away, and paging skips those still kept
+    churn = RoomManager()
+    opened = [churn.create_room(FakeHandler(None, 100 + n)) for n in range(200)]
+    for room in opened[:190]:
+        churn.remove_room(room)
+    assert len(churn.open_public.ids) <= 2 * 10 + 16, "Removed IDs not compacted"
+    for room in opened[192:198]:
+        churn.remove_room(room)
+    page, cursor = churn.get_room_page(opened[185].get_id(), 2)
+    assert page == [opened[190], opened[191]] and cursor == opened[191].get_id()
+    assert churn.get_room_page(cursor, 2) == ([opened[198], opened[199]], 0)
+
+    # Subscribers get the first page, then only the events they filter for
+    events = {}
+
+    def subscribe(key, **filters):
+        """Subscribe, recording the first page and the events"""
+        events[key] = []
+        manager.subscribe(key, lambda event, room: events[key].append((event, room.get_id())),
+                          lambda rooms, cursor: events[key].append(("page", [room.get_id() for room in rooms])),
+                          page_size=2, **filters)
+
+    subscribe("all")
+    subscribe("public", locked=False)
+    subscribe("locked", locked=True)
+    subscribe("strong", min_mark=80)
+    assert events["all"] == [("page", [rooms[0].get_id(), rooms[1].get_id()])]
+    assert events["locked"] == [("page", [rooms[0].get_id(), rooms[6].get_id()])]
+    assert events["strong"] == [("page", [rooms[8].get_id(), rooms[9].get_id()])]
+    assert manager.get_subscriber_count() == 4
+
+    weak_public = open_room(20, 0)
+    strong_locked = open_room(21, 9, "pw")
+    manager.remove_room(weak_public)
+    assert events["all"][1:] == [("add", weak_public.get_id()), ("add", strong_locked.get_id()),
+                                 ("remove", weak_public.get_id())]
+    assert events["public"][1:] == [("add", weak_public.get_id()), ("remove", weak_public.get_id())]
+    assert events["locked"][1:] == [("add", strong_locked.get_id())]
+    assert events["strong"][1:] == [("add", strong_locked.get_id())]
+
+    # A failing subscriber is dropped, and unsubscribing stops events
+    def broken(event, room):
+        raise RuntimeError("gone")
+
+    manager.subscribe("broken", broken, lambda rooms, cursor: None)
+    manager.unsubscribe("all")
+    manager.remove_room(strong_locked)
+    assert manager.get_subscriber_count() == 3, "Failing subscriber kept"
+    assert events["all"][-1] == ("remove", weak_public.get_id())
+    assert events["strong"][-1] == ("remove", strong_locked.get_id())
+    print("✅ Room list paging OK")
+except Exception as e:
+    print(f"❌ Room list paging FAILED: {e}")
+    sys.exit(1)
+
+# Test 6: Matchmaker
+print("\n[6/9] Testing matchmaker...")
+try:
+    manager = RoomManager()
+    matchmaker = Matchmaker(manager, base_band=50, band_doubling=5)
+    now = time.monotonic()
+
+    def wait_in_queue(client_number, mark, waited):
+        """Queue a player of a given mark who has waited some seconds"""
+        player = FakeHandler(None, client_number, FakeUser(client_number))
+        player.set_room(manager.create_room(player))
+        ticket = MatchTicket(player, player.get_room(), mark)
+        ticket.enqueued_at = now - waited
+        matchmaker.waiting[client_number] = ticket
+        return ticket
+
+    # The longest waiting player is seated with the nearest mark
+    first = wait_in_queue(1, 1000, 3)
+    far = wait_in_queue(2, 1030, 0)
+    near = wait_in_queue(3, 1010, 1)
+    matchmaker.pair_waiting()
+    assert first.room.get_user2() is near.thread, "Not paired with the nearest mark"
+    assert near.thread.get_room() is first.room
+    assert manager.get_room(near.room.get_id()) is None, "Guest room left behind"
+    assert near.thread.messages == [PROTOCOL_GO_TO_ROOM]
+    assert list(matchmaker.waiting) == [2]
+
+    # The band doubles every band_doubling seconds of waiting
+    assert matchmaker.get_band(far, now) == 50
+    assert abs(matchmaker.get_band(far, now + 10) - 200) < 1e-9
+    high = wait_in_queue(4, 1200, 0)
+    matchmaker.pair_waiting()
+    assert sorted(matchmaker.waiting) == [2, 4], "Paired outside the band"
+    far.enqueued_at = now - 10
+    matchmaker.pair_waiting()
+    assert not matchmaker.waiting, "Band did not widen"
+    assert far.room.get_user2() is high.thread
+
+    # A player joined through the room list is no longer matched
+    host = wait_in_queue(5, 1000, 0)
+    guest = wait_in_queue(6, 1000, 0)
+    assert manager.join_room(host.room, FakeHandler(None, 7))
+    matchmaker.pair_waiting()
+    assert list(matchmaker.waiting) == [6] and guest.thread.get_room() is guest.room
+    del matchmaker.waiting[6]
+
+    # Pairing races a join and a cancel; each room gets one outcome only
+    for round_number in range(20):
+        host = wait_in_queue(10, 1000, 1)
+        guest = wait_in_queue(11, 1000, 0)
+        joiner = FakeHandler(None, 12)
+        start = threading.Barrier(3)
+        results = {}
+
+        def join():
+            start.wait()
+            results["joined"] = manager.join_room(host.room, joiner)
+
+        def cancel():
+            start.wait()
+            results["cancelled"] = manager.cancel_room(guest.room, guest.thread)
+
+        racers = [threading.Thread(target=join), threading.Thread(target=cancel)]
+        for racer in racers:
+            racer.start()
+        start.wait()
+        matchmaker.pair_waiting()
+        matchmaker.pair_waiting()
+        for racer in racers:
+            racer.join()
+
+        seated = host.room.get_user2()
+        if seated is guest.thread:
+            assert not results["joined"] and not results["cancelled"]
+            assert guest.thread.get_room() is host.room
+        else:
+            assert seated is joiner and results["joined"]
+            if results["cancelled"]:
+                assert guest.thread.get_room() is None
+                assert manager.get_room(guest.room.get_id()) is None
+            else:
+                assert guest.thread.get_room() is guest.room
+        matchmaker.waiting.clear()
+
+    # Metrics, and cancelling through the owner thread
+    stats = matchmaker.get_stats()
+    assert stats["matches"] >= 2 and stats["queue_depth"] == 0
+    assert stats["max_time_to_match"] >= 10
+    assert 0 < stats["avg_time_to_match"] <= stats["max_time_to_match"]
+    waiting = FakeHandler(None, 20, FakeUser(20))
+    waiting.set_room(manager.create_room(waiting))
+    matchmaker.enqueue(waiting, waiting.get_room())
+    assert wait_until(lambda: matchmaker.get_stats()["queue_depth"] == 1)
+    matchmaker.cancel(20)
+    assert wait_until(lambda: matchmaker.get_stats()["cancelled"] == 1), "Cancel not applied"
+    assert matchmaker.get_stats()["queue_depth"] == 0
+    matchmaker.stop()
+    print("✅ Matchmaker OK")
+except Exception as e:
+    print(f"❌ Matchmaker FAILED: {e}")
+    sys.exit(1)
+
+# Test 7: Stats writer
+print("\n[7/9] Testing stats writer...")
+try:
+    class CountingDatabase(Database):
+        """Database recording the size of each batch written"""
+
+        def __init__(self, db_path):
+            super().__init__(db_path)
+            self.batches = []
+
+        def execute_many(self, query, params_list):
+            self.batches.append(len(params_list))
+            return super().execute_many(query, params_list)
+
+    db = CountingDatabase(os.path.join(tempfile.mkdtemp(), "stats.db"))
+    assert db.init_database(), "Schema not created"
+    for n in range(4):
+        db.execute_query("INSERT INTO user (Username, Password, Nickname) VALUES (?, ?, ?)",
+                         (f"stats{n}", "pw", f"Stats {n}"))
+    ids = [row["ID"] for row in db.fetch_all("SELECT ID FROM user WHERE Username LIKE 'stats%' ORDER BY ID")]
+
+    def get_counts(user_id):
+        row = db.fetch_one("SELECT NumberOfGame, NumberOfWin, NumberOfDraw FROM user WHERE ID = ?", (user_id,))
+        return tuple(row)
+
+    # Increments per user are summed and written in one transaction
+    writer = StatsWriter(db, flush_interval=60, max_pending=100)
+    for _ in range(3):
+        writer.add(ids[0], games=1, wins=1)
+    writer.add(ids[1], games=1)
+    writer.add(ids[1], draws=1)
+    assert writer.get_pending_count() == 2
+    assert get_counts(ids[0]) == (0, 0, 0), "Written before a flush"
+    assert writer.flush()
+    assert db.batches == [2] and writer.flushes == 1 and writer.rows_written == 2
+    assert get_counts(ids[0]) == (3, 3, 0) and get_counts(ids[1]) == (1, 0, 1)
+    writer.stop()
+
+    # max_pending users with changes flush at once
+    db.batches.clear()
+    writer = StatsWriter(db, flush_interval=60, max_pending=3)
+    for user_id in ids[:3]:
+        writer.add(user_id, games=1)
+    assert wait_until(lambda: writer.flushes == 1), "Size threshold did not flush"
+    assert db.batches == [3] and get_counts(ids[2]) == (1, 0, 0)
+    writer.stop()
+
+    # A lone change is written flush_interval seconds later
+    writer = StatsWriter(db, flush_interval=0.2, max_pending=100)
+    started = time.monotonic()
+    writer.add(ids[3], wins=1)
+    assert wait_until(lambda: writer.flushes == 1), "Timer did not flush"
+    assert time.monotonic() - started >= 0.15, "Flushed before the interval"
+    assert get_counts(ids[3]) == (0, 1, 0)
+    writer.stop()
+
+    # stop() writes what is pending, and later changes are written at once
+    writer = StatsWriter(db, flush_interval=60, max_pending=100)
+    writer.add(ids[3], games=2)
+    writer.stop()
+    assert writer.get_pending_count() == 0 and get_counts(ids[3]) == (2, 1, 0)
+    writer.add(ids[3], draws=1)
+    assert get_counts(ids[3]) == (2, 1, 1), "Change after stop() not written"
+
+    # start() after stop() writes behind again
+    writer.start()
+    writer.add(ids[3], games=1)
+    assert get_counts(ids[3]) == (2, 1, 1), "Written at once after start()"
+    assert writer.thread is not None and writer.thread.is_alive(), "Flusher not restarted"
+    assert writer.flush() and get_counts(ids[3]) == (3, 1, 1)
+
+    # Reads add the changes not yet written instead of flushing them
+    writer.flushes = 0
+    dao = UserDAO()
+    dao.db, dao.stats_writer = db, writer
+    writer.add(ids[3], games=3, wins=3)
+    writer.add(ids[2], games=-5)
+    assert writer.get_pending([ids[3], ids[1]]) == {ids[3]: [3, 3, 0]}
+    user = dao.get_user_by_id(ids[3])
+    assert (user.get_number_of_game(), user.get_number_of_win()) == (6, 4)
+    assert dao.get_user_by_id(ids[2]).get_number_of_game() == 0, "Games not clamped at 0"
+    ranks = dao.get_rank(ids[3]), dao.get_rank(ids[0])
+    assert ranks[0] < ranks[1], "Unwritten wins not ranked"
+    top = [u.get_id() for u in dao.get_user_static_rank()]
+    assert top.index(ids[3]) < top.index(ids[0])
+    assert writer.flushes == 0 and get_counts(ids[3]) == (3, 1, 1), "Read flushed"
+    writer.stop()
+    assert get_counts(ids[3]) == (6, 4, 1)
+    assert (dao.get_rank(ids[3]), dao.get_rank(ids[0])) == ranks, "Ranks changed once written"
+    db.disconnect()
+    print("✅ Stats writer OK")
+except Exception as e:
+    print(f"❌ Stats writer FAILED: {e}")
+    sys.exit(1)
+
+# Test 8: Bot player
+print("\n[8/9] Testing bot player...")
+try:
+    from concurrent.futures import Future
+
+    class FakePool:
+        """Bot pool whose searches all end the same way"""
+
+        def __init__(self, outcome):
+            self.outcome = outcome
+            self.released = 0
+
+        def submit(self, moves, player, level):
+            future = Future()
+            if self.outcome == "error":
+                future.set_exception(RuntimeError("worker died"))
+            elif self.outcome == "cancelled":
+                future.cancel()
+            else:
+                future.set_result(None)
+            return future
+
+        def release(self):
+            self.released += 1
+
+    def seat_bot(pool):
+        """Open a bot game against a fake human"""
+        human = FakeHandler(None, 30)
+        bot = BotPlayer(None, pool)
+        human.set_room(get_room_manager().create_room(human, user2_thread=bot))
+        bot.set_room(human.get_room())
+        return human, bot
+
+    # A failed, cancelled or empty search still answers the human
+    for outcome in ("error", "cancelled", "none"):
+        human, bot = seat_bot(FakePool(outcome))
+        bot.write(create_message(PROTOCOL_CARO, 7, 7))
+        replies = [message for message in human.messages if message.startswith(PROTOCOL_CARO)]
+        assert len(replies) == 1, f"No move after {outcome}: {human.messages}"
+        x, y = map(int, replies[0].split(',')[1:])
+        assert (x, y) != (7, 7) and bot.state.get_move_count() == 2
+        bot.close()
+
+    # With no fallback either, the bot leaves and the human is told
+    pool = FakePool("error")
+    human, bot = seat_bot(pool)
+    room = human.get_room()
+    bot.get_fallback_move = lambda: None
+    bot.write(create_message(PROTOCOL_CARO, 7, 7))
+    assert human.messages == [PROTOCOL_LEFT_ROOM], human.messages
+    assert human.get_room() is None and bot.is_closed and pool.released == 1
+    assert get_room_manager().get_room(room.get_id()) is None, "Room left behind"
+    print("✅ Bot player OK")
+except Exception as e:
+    print(f"❌ Bot player FAILED: {e}")
+    sys.exit(1)
+
+# Test 9: Asyncio server
+print("\n[9/9] Testing asyncio server...")
+try:
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    server = AsyncServer("127.0.0.1", port, handler_threads=2)
+    threading.Thread(target=server.start, daemon=True).start()
+    assert wait_until(lambda: server.running), "Server did not start"
+
+    client = socket.create_connection(("127.0.0.1", port))
+    decoder = FrameDecoder()
+    assert receive(client, decoder, PROTOCOL_SERVER_SEND_ID) == f"{PROTOCOL_SERVER_SEND_ID},0"
+
+    # Two messages in one packet, the second split across two
+    login = encode_frame(f"{PROTOCOL_CLIENT_VERIFY},admin,admin123")
+    view = encode_frame(PROTOCOL_VIEW_ROOM_LIST)
+    client.sendall(login + view[:4])
+    assert receive(client, decoder, PROTOCOL_LOGIN_SUCCESS), "Login failed"
+    client.sendall(view[4:])
+    assert receive(client, decoder, PROTOCOL_ROOM_LIST) == PROTOCOL_ROOM_LIST, "No room list"
+    assert server.get_active_connections() == 1
+
+    client.close()
+    assert wait_until(lambda: server.get_active_connections() == 0), "Connection not cleaned up"
+    server.stop()
+    print("✅ Asyncio server OK")
+except Exception as e:
+    print(f"❌ Asyncio server FAILED: {e}")
+    sys.exit(1)
+
+print("\n" + "=" * 60)
+print("🎉 ALL TESTS PASSED!")
+print("=" * 60)
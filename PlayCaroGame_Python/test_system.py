@@ -133,7 +133,18 @@ try:
     else:
         print(f"❌ Protocol FAILED - Parsing error")
         sys.exit(1)
-        
+    
+    # Test framing of coalesced and split messages
+    from shared.framing import FrameDecoder
+    decoder = FrameDecoder()
+    data = "caro,7,7\nchat,xin chào\n".encode(ENCODING)
+    messages = decoder.feed(data[:21]) + decoder.feed(data[21:])
+    if messages == ["caro,7,7", "chat,xin chào"] and decoder.get_pending() == 0:
+        print("✅ Protocol OK - Message framing works")
+    else:
+        print(f"❌ Protocol FAILED - Framing error: {messages}")
+        sys.exit(1)
+    
 except Exception as e:
     print(f"❌ Protocol FAILED: {e}")
     sys.exit(1)